@@ -1,9 +1,13 @@
 from flask import Flask, request, jsonify
-from robot_service_refactored_for_large_inputs import (
+from engine_registry import (
+    MODES,
+    EXACT_MODE,
     parse_body_instruct_robot_generate_response,
 )
 from custom_types import ExecutionResult
-from record_service import save_result
+from command_parsing import InvalidCommandError
+from record_service import record_spool, record_writer, save_result, storage
+from walk_cache import walk_cache
 
 app = Flask(__name__)
 
@@ -13,13 +17,42 @@ def hello_world():
     return "Hello, Docker!"
 
 
+@app.get("/tibber-developer-test/walk-cache")
+def walk_cache_info():
+    return jsonify(walk_cache.info()), 200
+
+
+@app.get("/tibber-developer-test/storage")
+def storage_info():
+    return jsonify(storage.info()), 200
+
+
+@app.get("/tibber-developer-test/record-writer")
+def record_writer_info():
+    if record_writer is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **record_writer.info()}), 200
+
+
+@app.get("/tibber-developer-test/record-spool")
+def record_spool_info():
+    if record_spool is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **record_spool.info()}), 200
+
+
 @app.post("/tibber-developer-test/enter-path")
 def main():
     data = request.get_json()
+    mode = request.args.get("mode", EXACT_MODE)
+    if mode not in MODES:
+        return jsonify({"error": f"Unknown mode: {mode}"}), 400
     try:
-        result: ExecutionResult = parse_body_instruct_robot_generate_response(data)
+        result: ExecutionResult = parse_body_instruct_robot_generate_response(
+            data, mode=mode
+        )
         try:
-            response = save_result(result)
+            response, status = save_result(result)
         except Exception as e:
             message = {
                 "error": "There was a problem inserting the record into the database: "
@@ -29,6 +62,12 @@ def main():
                 message,
                 500,
             )
-        return jsonify(response), 201
+        if "relative_error" in result:
+            # The bound is not stored with the record, the response is the only
+            # place it is reported.
+            response["relative_error"] = result["relative_error"]
+        return jsonify(response), status
+    except InvalidCommandError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Internal Server Error"}), 500
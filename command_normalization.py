@@ -0,0 +1,131 @@
+from typing import List
+from custom_types import DIRECTION_CODES, Commands, ParsedCommands
+from command_parsing import parse_commands
+
+
+"""
+This Python code reduces a list of commands to a shorter one visiting exactly the same locations and ending at the same position.
+Consecutive commands moving along the same axis (east and west, or north and south) can only cover one interval of their line, so any run of them can be replaced by at most three commands.
+"""
+
+# The axis of every direction code.
+AXES = ("horizontal", "horizontal", "vertical", "vertical")
+
+POSITIVE_DIRECTIONS = {
+    "horizontal": DIRECTION_CODES["east"],
+    "vertical": DIRECTION_CODES["north"],
+}
+NEGATIVE_DIRECTIONS = {
+    "horizontal": DIRECTION_CODES["west"],
+    "vertical": DIRECTION_CODES["south"],
+}
+
+
+def normalize_commands(commands: Commands) -> ParsedCommands:
+    """
+    Merges runs of commands along the same axis, folds their reversals and drops the
+    commands without steps.
+
+    Args:
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        ParsedCommands: A list of commands visiting the same locations and ending
+            at the same position, never longer than the original one.
+
+    Example:
+    >>> normalize_commands([
+    ...     {"direction": "east", "steps": 5},
+    ...     {"direction": "west", "steps": 3},
+    ...     {"direction": "east", "steps": 1},
+    ...     {"direction": "north", "steps": 0},
+    ...     {"direction": "north", "steps": 2},
+    ...     {"direction": "north", "steps": 4},
+    ... ])
+    ParsedCommands([{'direction': 'east', 'steps': 5}, {'direction': 'west', 'steps': 2}, {'direction': 'north', 'steps': 6}])
+
+
+    Explanation:
+    - Commands without steps do not move the robot, so they are dropped.
+    - The remaining commands are grouped in runs moving along the same axis, tracking the lowest and highest offset reached and the final offset of the run.
+    - The run visits every location between its lowest and highest offset and nothing else, so it is replaced by going to one end, then to the other one and then back to the final offset, skipping whatever move is not needed.
+    - When every command is dropped, a single command without steps is kept so the starting location is still counted as visited.
+    """
+
+    commands = parse_commands(commands)
+    normalized = ParsedCommands()
+    axis = None
+    offset = lowest = highest = 0
+    for direction, steps in zip(commands.directions, commands.steps):
+        if steps == 0:
+            continue
+        command_axis = AXES[direction]
+        if command_axis != axis:
+            if axis is not None:
+                normalized.extend(fold_run(axis, lowest, highest, offset))
+            axis = command_axis
+            offset = lowest = highest = 0
+
+        if direction == POSITIVE_DIRECTIONS[axis]:
+            offset += steps
+            if offset > highest:
+                highest = offset
+        else:
+            offset -= steps
+            if offset < lowest:
+                lowest = offset
+
+    if axis is not None:
+        normalized.extend(fold_run(axis, lowest, highest, offset))
+    elif len(commands) > 0:
+        normalized.append(commands.directions[0], 0)
+
+    return normalized
+
+
+def fold_run(axis: str, lowest: int, highest: int, offset: int) -> ParsedCommands:
+    """
+    Generates the shortest list of commands along an axis visiting every offset
+    from lowest to highest and ending at the given offset.
+
+    Args:
+        axis (str): "horizontal" or "vertical".
+        lowest (int): The lowest offset to visit, zero or lower.
+        highest (int): The highest offset to visit, zero or higher.
+        offset (int): The offset to end at.
+
+    Returns:
+        ParsedCommands: Up to three commands.
+
+    Example:
+    >>> fold_run("horizontal", -2, 4, 1)
+    ParsedCommands([{'direction': 'west', 'steps': 2}, {'direction': 'east', 'steps': 6}, {'direction': 'west', 'steps': 3}])
+    """
+
+    # Runs moving in a single direction, the most common ones, are kept as they are.
+    if lowest == 0 and offset == highest:
+        return commands_to_targets(axis, [highest])
+    if highest == 0 and offset == lowest:
+        return commands_to_targets(axis, [lowest])
+
+    # Whichever end is visited first, the run needs at most three moves, and
+    # fewer when the final offset or the origin is already one of the ends.
+    return min(
+        commands_to_targets(axis, [lowest, highest, offset]),
+        commands_to_targets(axis, [highest, lowest, offset]),
+        key=len,
+    )
+
+
+def commands_to_targets(axis: str, targets: List[int]) -> ParsedCommands:
+    commands = ParsedCommands()
+    position = 0
+    for target in targets:
+        move = target - position
+        if move > 0:
+            commands.append(POSITIVE_DIRECTIONS[axis], move)
+        elif move < 0:
+            commands.append(NEGATIVE_DIRECTIONS[axis], -move)
+        position = target
+
+    return commands
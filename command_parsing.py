@@ -0,0 +1,88 @@
+from typing import Tuple, Union
+from custom_types import Command, CommandsList, DIRECTION_CODES, ParsedCommands
+
+
+"""
+This Python code validates the commands of a request and turns them into ParsedCommands in a single pass.
+The engines read the direction codes and steps of ParsedCommands directly, so their loops do not look up dictionaries or compare direction strings.
+"""
+
+
+class InvalidCommandError(ValueError):
+    pass
+
+
+def parse_commands(commands: Union[CommandsList, ParsedCommands]) -> ParsedCommands:
+    """
+    Validates a list of commands and turns it into ParsedCommands.
+
+    Args:
+        commands (Union[CommandsList, ParsedCommands]): A list of commands for the
+            robot, returned as they are when already parsed.
+
+    Returns:
+        ParsedCommands: The direction code and steps of every command.
+
+    Raises:
+        InvalidCommandError: If a command has an unknown direction or its steps
+            are not a non-negative integer.
+
+    Example:
+    >>> parse_commands([{"direction": "east", "steps": 2}, {"direction": "north", "steps": 1}])
+    ParsedCommands([{'direction': 'east', 'steps': 2}, {'direction': 'north', 'steps': 1}])
+    >>> parse_commands([{"direction": "up", "steps": 2}])
+    Traceback (most recent call last):
+    ...
+    command_parsing.InvalidCommandError: Command 0 has an invalid direction: 'up'
+    """
+
+    if isinstance(commands, ParsedCommands):
+        return commands
+
+    parsed = ParsedCommands()
+    for index, command in enumerate(commands):
+        direction, steps = parse_command(command, index)
+        parsed.append(direction, steps)
+
+    return parsed
+
+
+def parse_command(command: Command, index: int = 0) -> Tuple[int, int]:
+    """
+    Validates a single command.
+
+    Args:
+        command (Command): The command, with a direction and a number of steps.
+        index (int): The position of the command, only used in error messages.
+
+    Returns:
+        Tuple[int, int]: The direction code and the steps of the command.
+
+    Raises:
+        InvalidCommandError: If the command has an unknown direction or its steps
+            are not a non-negative integer.
+
+    Example:
+    >>> parse_command({"direction": "south", "steps": 4})
+    (3, 4)
+    """
+
+    try:
+        direction = DIRECTION_CODES[command["direction"]]
+        steps = command["steps"]
+    except (KeyError, TypeError):
+        if not isinstance(command, dict) or "steps" not in command:
+            raise InvalidCommandError(
+                f"Command {index} must have a direction and steps"
+            ) from None
+        raise InvalidCommandError(
+            f"Command {index} has an invalid direction: {command.get('direction')!r}"
+        ) from None
+
+    # bool is a subclass of int, but true is not a number of steps.
+    if type(steps) is not int or steps < 0:
+        raise InvalidCommandError(
+            f"Command {index} must have a non-negative integer number of steps"
+        )
+
+    return direction, steps
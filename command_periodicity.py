@@ -0,0 +1,200 @@
+from typing import Callable, List, Optional, Tuple
+from array import array
+from custom_types import CODE_CHANGES, Coordinates, Commands, ParsedCommands
+from command_parsing import parse_commands
+
+
+"""
+This Python code detects walks made of one block of commands repeated many times and counts their visited locations without walking every repetition.
+Every repetition of the block walks the same path translated by the displacement of the block, so once a repetition can no longer reach the paths of the repetitions long before it, each new repetition adds the same number of new locations.
+"""
+
+# The walk is only extrapolated when the repetitions walked to do it are at most
+# this fraction of the commands.
+MIN_SPEEDUP = 4
+
+# Number of leading commands looked for to find where the walk may repeat.
+PERIOD_PREFIX_LENGTH = 64
+
+# Places the leading commands come back at that are checked before giving up,
+# which keeps walks that almost repeat from being compared over and over.
+MAX_PERIOD_CANDIDATES = 8
+
+
+def find_period(commands: Commands, max_period: Optional[int] = None) -> int:
+    """
+    Finds the length of the shortest block of commands the list is made of, allowing
+    the last repetition of the block to be incomplete.
+
+    Args:
+        commands (Commands): A list of commands for the robot, parsed or not.
+        max_period (Optional[int]): The longest block looked for, half the list
+            when not given.
+
+    Returns:
+        int: The length of the block, the length of the list when no block repeats
+            or none is found among the first MAX_PERIOD_CANDIDATES places the
+            leading commands come back at.
+
+    Example:
+    >>> find_period([
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "east", "steps": 2},
+    ... ])
+    2
+    """
+
+    commands = parse_commands(commands)
+    length = len(commands)
+    if length == 0:
+        return 0
+    if not isinstance(commands.steps, array):
+        # Steps beyond int64 are too rare to be worth looking for blocks in.
+        return length
+    if max_period is None:
+        max_period = length // 2
+
+    # A block of p commands repeats when the list shifted by p matches itself,
+    # which the comparisons of the byte arrays check without a Python loop. The
+    # shift must bring the leading commands back first, so only the places they
+    # come back at are checked.
+    direction_bytes = commands.directions.tobytes()
+    directions = memoryview(direction_bytes)
+    steps = memoryview(commands.steps.tobytes())
+    item_size = commands.steps.itemsize
+    prefix = direction_bytes[: min(PERIOD_PREFIX_LENGTH, length - max_period)]
+    period = 0
+    for _ in range(MAX_PERIOD_CANDIDATES):
+        period = direction_bytes.find(prefix, period + 1, max_period + len(prefix))
+        if period < 0:
+            break
+        if (
+            directions[period:] == directions[: length - period]
+            and steps[period * item_size :] == steps[: (length - period) * item_size]
+        ):
+            return period
+
+    return length
+
+
+def get_block_displacement_and_extent(
+    block: Commands,
+) -> Tuple[List[int], List[int]]:
+    """
+    Walks a block of commands from the origin and returns where it ends and how
+    wide and high its path is.
+
+    Args:
+        block (Commands): The block of commands, parsed or not.
+
+    Returns:
+        Tuple[List[int], List[int]]: The displacement of the block and the extent
+            (maximum minus minimum coordinate) of its path on each axis.
+
+    Example:
+    >>> get_block_displacement_and_extent([
+    ...     {"direction": "east", "steps": 5},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "west", "steps": 2},
+    ... ])
+    ([3, 1], [5, 1])
+    """
+
+    block = parse_commands(block)
+    position = [0, 0]
+    lowest = [0, 0]
+    highest = [0, 0]
+    for direction, steps in zip(block.directions, block.steps):
+        change = CODE_CHANGES[direction]
+        for axis in (0, 1):
+            position[axis] += change[axis] * steps
+            lowest[axis] = min(lowest[axis], position[axis])
+            highest[axis] = max(highest[axis], position[axis])
+
+    return position, [highest[0] - lowest[0], highest[1] - lowest[1]]
+
+
+def get_overlap_distance(displacement: List[int], extent: List[int]) -> int:
+    """
+    Returns the largest number of repetitions two copies of a block can be apart
+    and still share a location.
+
+    Args:
+        displacement (List[int]): The displacement of the block.
+        extent (List[int]): The extent of the path of the block on each axis.
+
+    Returns:
+        int: The overlap distance, 0 for blocks ending where they started.
+
+    Example:
+    >>> get_overlap_distance([3, 1], [5, 1])
+    1
+    """
+
+    distances = [
+        extent[axis] // abs(displacement[axis])
+        for axis in (0, 1)
+        if displacement[axis] != 0
+    ]
+    return min(distances) if distances else 0
+
+
+def execute_periodic_walk(
+    start_position: Coordinates,
+    commands: Commands,
+    execute: Callable[[Coordinates, ParsedCommands], int],
+) -> Optional[int]:
+    """
+    Counts the visited locations of a walk made of a repeated block of commands,
+    walking only a few repetitions of the block with the given engine.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        execute (Callable[[Coordinates, ParsedCommands], int]): The engine used to
+            walk the repetitions that are needed.
+
+    Returns:
+        Optional[int]: The total number of visited locations, or None when the walk
+            is not periodic enough to save any work.
+
+    Example:
+    >>> from robot_service_sweep_line import execute_robot_instructions
+    >>> execute_periodic_walk([0, 0], [
+    ...     {"direction": "east", "steps": 3},
+    ...     {"direction": "north", "steps": 1},
+    ... ] * 1000, execute_robot_instructions)
+    4001
+
+
+    Explanation:
+    - The repetition i of the block walks the path of the first one translated by i times the displacement of the block.
+    - Two repetitions d apart cannot share a location once d times the displacement exceeds the extent of the path on any axis, so a repetition only meets the overlap_distance repetitions right before it.
+    - From repetition overlap_distance + 1 on, every repetition sees exactly the same neighbourhood, so all of them add the same number of new locations, and so does the incomplete repetition at the end, if any, wherever it comes.
+    - With k = overlap_distance + 1, the walk of k repetitions followed by the incomplete one and the walk of k + 1 repetitions followed by it differ by one repetition, which is what every further repetition adds, and the first one is where the extrapolation starts from.
+    - Blocks that end where they started (no displacement) are covered by the same reasoning, as every repetition after the first one adds nothing.
+    - The two walks are only made when they are at most 1 / MIN_SPEEDUP of the commands, so the extrapolation is clearly cheaper than walking every command.
+    """
+
+    commands = parse_commands(commands)
+    period = find_period(commands, len(commands) // (3 * MIN_SPEEDUP))
+    if period == 0:
+        return None
+    repetitions = len(commands) // period
+    block = commands[:period]
+    tail = commands[repetitions * period :]
+
+    displacement, extent = get_block_displacement_and_extent(block)
+    walked_repetitions = get_overlap_distance(displacement, extent) + 1
+    walked_commands = (2 * walked_repetitions + 1) * period + 2 * len(tail)
+    if walked_commands * MIN_SPEEDUP > len(commands):
+        return None
+
+    visited = execute(start_position[:], block * walked_repetitions + tail)
+    visited_next = execute(start_position[:], block * (walked_repetitions + 1) + tail)
+    new_per_repetition = visited_next - visited
+
+    return visited + (repetitions - walked_repetitions) * new_per_repetition
@@ -0,0 +1,213 @@
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import os
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+
+
+"""
+This Python code keeps a pool of database connections shared by the threads of the application.
+Every request checks a connection out and gives it back when done, so concurrent requests write through different connections and a broken connection is replaced instead of breaking every later write.
+"""
+
+DEFAULT_MIN_CONNECTIONS = int(os.getenv("DATABASE_POOL_MIN_CONNECTIONS", "1"))
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("DATABASE_POOL_MAX_CONNECTIONS", "10"))
+
+# Seconds a checkout waits for a connection to be given back when the pool is
+# at its maximum size.
+DEFAULT_CHECKOUT_TIMEOUT = float(os.getenv("DATABASE_POOL_CHECKOUT_TIMEOUT", "30"))
+
+# Connections idle for longer than this many seconds are checked with a query
+# before being handed out, recently used ones only have their state checked.
+DEFAULT_HEALTH_CHECK_IDLE = float(os.getenv("DATABASE_POOL_HEALTH_CHECK_IDLE", "30"))
+
+HEALTH_CHECK_QUERY = "SELECT 1;"
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection is given back to a full pool in time.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of database connections.
+
+    Between min_connections and max_connections connections are kept open.
+    Connections are handed out last in, first out, so the ones left idle for
+    long are the ones the pool can close first. A checkout finding the pool at
+    its maximum size waits for a connection to be given back, up to timeout
+    seconds.
+
+    Every connection is checked before being handed out and replaced when it is
+    closed or does not answer a health check. A connection that breaks while
+    checked out is closed when given back.
+
+    Example:
+    >>> pool = ConnectionPool(lambda: psycopg2.connect(url), 1, 10)
+    >>> with pool.connection() as connection:
+    ...     with connection:
+    ...         with connection.cursor() as cursor:
+    ...             cursor.execute("SELECT 1;")
+    >>> pool.info()["checkouts"]
+    1
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_connections: int = DEFAULT_MIN_CONNECTIONS,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+        health_check_idle: float = DEFAULT_HEALTH_CHECK_IDLE,
+    ):
+        if not 0 <= min_connections <= max_connections or max_connections < 1:
+            raise ValueError(
+                "The pool needs 0 <= min_connections <= max_connections and at "
+                "least one connection"
+            )
+        self.connect = connect
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.health_check_idle = health_check_idle
+        self.condition = threading.Condition()
+        self.idle: List[Tuple[Any, float]] = []
+        self.size = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.timeouts = 0
+        self.reconnects = 0
+
+        for _ in range(min_connections):
+            self.idle.append((connect(), time.monotonic()))
+            self.size += 1
+
+    def getconn(self) -> Any:
+        start_time = time.monotonic()
+        deadline = start_time + self.timeout
+        waited = False
+        with self.condition:
+            while True:
+                if self.idle:
+                    connection, last_used = self.idle.pop()
+                    break
+                if self.size < self.max_connections:
+                    # The slot is taken before connecting, so connections are
+                    # opened outside the lock without going over the maximum.
+                    self.size += 1
+                    connection = last_used = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection was available after {self.timeout}s"
+                    )
+                waited = True
+                self.condition.wait(remaining)
+
+            wait_time = time.monotonic() - start_time
+            self.checkouts += 1
+            self.waits += waited
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        try:
+            if connection is None:
+                return self.connect()
+            if is_connection_healthy(
+                connection, time.monotonic() - last_used, self.health_check_idle
+            ):
+                return connection
+            close_connection(connection)
+            connection = self.connect()
+            with self.condition:
+                self.reconnects += 1
+            return connection
+        except Exception:
+            self.release_slot()
+            raise
+
+    def putconn(self, connection: Any, broken: bool = False) -> None:
+        if broken or connection.closed:
+            close_connection(connection)
+            self.release_slot()
+            return
+
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def release_slot(self) -> None:
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        connection = self.getconn()
+        try:
+            yield connection
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The server closed the connection or the network went down, the
+            # connection cannot be trusted anymore.
+            self.putconn(connection, broken=True)
+            raise
+        except BaseException:
+            self.putconn(connection)
+            raise
+        else:
+            self.putconn(connection)
+
+    def close_all(self) -> None:
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection, _ in idle:
+            close_connection(connection)
+
+    def info(self) -> Dict[str, float]:
+        with self.condition:
+            return {
+                "size": self.size,
+                "idle": len(self.idle),
+                "in_use": self.size - len(self.idle),
+                "min_connections": self.min_connections,
+                "max_connections": self.max_connections,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "max_wait_time": self.max_wait_time,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+            }
+
+
+def is_connection_healthy(
+    connection: Any, idle_time: float, health_check_idle: float
+) -> bool:
+    if connection.closed:
+        return False
+    if idle_time < health_check_idle:
+        return True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(HEALTH_CHECK_QUERY)
+        # The check opened a transaction, which must not be left behind.
+        connection.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def close_connection(connection: Any) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
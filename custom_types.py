@@ -1,8 +1,99 @@
-from typing import Dict, List, Tuple, Union
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 
 Coordinates = List[int]
 Command = Dict[str, Union[str, int]]
 CommandsList = List[Command]
-ExecutionResult = Dict[str, Union[float, int, int]]
-Trajectory = List[Union[List[int], int, str]]
+ExecutionResult = Dict[str, Union[float, int, int, str]]
+Segment = Tuple[int, int, int, int]
+LineIntervals = Dict[int, List[List[int]]]
+LineIndex = Dict[int, List[List[int]]]
+Engine = Callable[[Coordinates, CommandsList], int]
+WalkStatistics = Dict[str, int]
+WalkState = Dict[str, Union[Coordinates, int, LineIndex, List[int]]]
+
+
+# The direction of a parsed command is stored as its index in DIRECTIONS, and
+# CODE_CHANGES holds the change of x and y of one step in every direction.
+DIRECTIONS = ("east", "west", "north", "south")
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+CODE_CHANGES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class ParsedCommands:
+    """
+    A list of commands kept as a direction code per command in an array('b') and
+    the steps of every command in an array('q').
+
+    Iterating or indexing it still gives commands as dictionaries, so code written
+    for a CommandsList keeps working, while the engines read both arrays directly.
+
+    Example:
+    >>> commands = ParsedCommands(array("b", [0, 2]), array("q", [2, 1]))
+    >>> len(commands), commands[1]
+    (2, {'direction': 'north', 'steps': 1})
+    >>> commands[:1] * 2
+    ParsedCommands([{'direction': 'east', 'steps': 2}, {'direction': 'east', 'steps': 2}])
+    """
+
+    __slots__ = ("directions", "steps")
+
+    def __init__(
+        self,
+        directions: Optional[array] = None,
+        steps: Optional[Union[array, List[int]]] = None,
+    ):
+        self.directions = array("b") if directions is None else directions
+        self.steps = array("q") if steps is None else steps
+
+    def append(self, direction: int, steps: int) -> None:
+        try:
+            self.steps.append(steps)
+        except OverflowError:
+            # Steps beyond int64 are still valid commands, they just turn the
+            # steps into a plain list from then on.
+            self.steps = list(self.steps)
+            self.steps.append(steps)
+        self.directions.append(direction)
+
+    def extend(self, other: "ParsedCommands") -> None:
+        self.directions.extend(other.directions)
+        if isinstance(self.steps, array) and isinstance(other.steps, array):
+            self.steps.extend(other.steps)
+        else:
+            self.steps = list(self.steps) + list(other.steps)
+
+    def __len__(self) -> int:
+        return len(self.directions)
+
+    def __iter__(self) -> Iterator[Command]:
+        for direction, steps in zip(self.directions, self.steps):
+            yield {"direction": DIRECTIONS[direction], "steps": steps}
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Command, "ParsedCommands"]:
+        if isinstance(index, slice):
+            return ParsedCommands(self.directions[index], self.steps[index])
+        return {
+            "direction": DIRECTIONS[self.directions[index]],
+            "steps": self.steps[index],
+        }
+
+    def __add__(self, other: "ParsedCommands") -> "ParsedCommands":
+        result = self[:]
+        result.extend(other)
+        return result
+
+    def __mul__(self, times: int) -> "ParsedCommands":
+        return ParsedCommands(self.directions * times, self.steps * times)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ParsedCommands, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ParsedCommands({list(self)})"
+
+
+Commands = Union[CommandsList, ParsedCommands]
@@ -0,0 +1,385 @@
+from typing import Dict, Optional, Tuple, Union
+import time
+from datetime import datetime
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Commands,
+    CommandsList,
+    Engine,
+    ExecutionResult,
+    WalkStatistics,
+)
+import robot_service
+import robot_service_refactored_for_large_inputs
+import robot_service_sweep_line
+import robot_service_numpy
+import robot_service_numpy_cells
+import robot_service_streaming
+import robot_service_parallel
+import robot_service_hybrid
+import robot_service_bitmap
+import robot_service_roaring
+import robot_service_approximate
+from walk_cache import hash_commands, walk_cache
+from command_parsing import parse_commands
+from command_normalization import normalize_commands
+from command_periodicity import execute_periodic_walk
+
+
+"""
+This Python code keeps the engines able to execute the robot instructions and picks the fastest one for every request.
+An engine is any function with the signature of execute_robot_instructions: it receives the starting position and the parsed commands and returns the number of visited locations.
+"""
+
+ENGINES: Dict[str, Engine] = {}
+
+# Walks this small are executed faster by a plain set than by any engine that
+# has to prepare arrays or trajectories first.
+SMALL_WALK_COMMANDS = 20
+SMALL_WALK_STEPS = 2000
+
+# Rough cost, in seconds, of the work done by the engines picked automatically,
+# measured on random walks.
+CELLS_COST_PER_STEP = 15e-9
+CELLS_COST_PER_COMMAND = 0.8e-6
+SWEEP_LINE_COST_PER_COMMAND = 3e-6
+BITMAP_COST_PER_COMMAND = 1e-6
+# Steps across the rows of the bitmap set one bit each, and every operation
+# copies its row, so it also costs in proportion to the length of the rows.
+BITMAP_COST_PER_CROSS_STEP = 0.15e-6
+BITMAP_COST_PER_BIT = 2e-11
+
+# Largest bounding box, in locations, kept as a bitmap: 128 MB of rows.
+MAX_BITMAP_AREA = 2**30
+
+# Name reported when the result comes from the walk cache.
+CACHE_ENGINE = "cache"
+
+# Name reported when the walk is a repeated block of commands and only a few
+# repetitions of it were executed.
+PERIODIC_ENGINE = "periodic"
+
+# Modes of a request: the exact number of visited locations, or an estimate from
+# a sample of rows, with the bound of its relative error, for walks too large to
+# wait for.
+EXACT_MODE = "exact"
+APPROXIMATE_MODE = "approximate"
+MODES = (EXACT_MODE, APPROXIMATE_MODE)
+
+# Name reported when the result is an estimate.
+APPROXIMATE_ENGINE = "approximate"
+
+# Largest encoded position robot_service_numpy_cells can work with.
+MAX_ENCODED_AREA = robot_service_numpy_cells.MAX_ENCODED_POSITION
+
+# The NumPy engines keep coordinates in int64, so walks reaching this far from
+# the origin, steps included, are left to the engines using Python integers.
+MAX_NUMPY_COORDINATE = 2**62
+
+
+def register_engine(name: str, engine: Engine) -> None:
+    """
+    Registers an engine so it can be selected by name.
+
+    Args:
+        name (str): The name the engine is reported with.
+        engine (Engine): A function receiving the starting position and the list of
+            commands and returning the number of visited locations.
+
+    Example:
+    >>> register_engine("set", robot_service.execute_robot_instructions)
+    """
+
+    ENGINES[name] = engine
+
+
+def get_engine(name: str) -> Engine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine: {name}") from None
+
+
+register_engine("set", robot_service.execute_robot_instructions)
+register_engine("encoded_set", robot_service.execute_robot_instructions_encoded)
+register_engine(
+    "trajectories", robot_service_refactored_for_large_inputs.execute_robot_instructions
+)
+register_engine("sweep_line", robot_service_sweep_line.execute_robot_instructions)
+register_engine("numpy_segments", robot_service_numpy.execute_robot_instructions)
+register_engine("numpy_cells", robot_service_numpy_cells.execute_robot_instructions)
+register_engine("streaming", robot_service_streaming.execute_robot_instructions)
+register_engine("parallel_stripes", robot_service_parallel.execute_robot_instructions)
+register_engine("hybrid", robot_service_hybrid.execute_robot_instructions)
+register_engine("bitmap", robot_service_bitmap.execute_robot_instructions)
+register_engine("roaring", robot_service_roaring.execute_robot_instructions)
+
+
+def parse_body_instruct_robot_generate_response(
+    body: Dict[str, Union[Coordinates, CommandsList]],
+    engine: Optional[str] = None,
+    mode: str = EXACT_MODE,
+) -> ExecutionResult:
+    """
+    Parses the input body, instructs a robot with commands using the fastest engine
+    for the walk, and generates a response.
+
+    Args:
+        body (Dict[str, Union[Coordinates, CommandsList]]): The input body containing
+            the starting position and a list of commands for the robot.
+        engine (Optional[str]): The name of the engine to use, selected from the
+            statistics of the walk when not given.
+        mode (str): EXACT_MODE to count the visited locations, APPROXIMATE_MODE to
+            estimate them, in which case the engine is ignored.
+
+    Returns:
+        ExecutionResult: A dictionary containing the timestamp, duration of execution,
+            result (total number of visited locations), the number of commands and
+            the name of the engine that executed them. Estimates are also marked as
+            approximate, with the bound of their relative error.
+
+    Raises:
+        ValueError: If the mode is not one of MODES.
+
+    Example:
+    >>> parse_body_instruct_robot_generate_response({
+    ...     "start": {"x": 0, "y": 0},
+    ...     "commands": [
+    ...         {"direction": "east", "steps": 2},
+    ...         {"direction": "north", "steps": 1},
+    ...     ],
+    ... })
+    {'timestamp': '2024-01-05T00:00:00', 'duration': 0.0, 'result': 4, 'commands': 2, 'engine': 'encoded_set'}
+    """
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+
+    commands, start_position = robot_service_refactored_for_large_inputs.parse_body(
+        body
+    )
+    if mode == APPROXIMATE_MODE:
+        start_time = time.perf_counter()
+        result, relative_error = robot_service_approximate.estimate_robot_instructions(
+            start_position, commands
+        )
+        elapsed_time = time.perf_counter() - start_time
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "duration": elapsed_time,
+            "result": result,
+            "commands": len(commands),
+            "engine": APPROXIMATE_ENGINE,
+            "approximate": True,
+            "relative_error": relative_error,
+        }
+
+    result, elapsed_time, engine = instruct_robot_and_time_it(
+        start_position, commands, engine
+    )
+
+    response = {
+        "timestamp": datetime.now().isoformat(),
+        "duration": elapsed_time,
+        "result": result,
+        "commands": len(commands),
+        "engine": engine,
+    }
+    return response
+
+
+def instruct_robot_and_time_it(
+    start_position: Coordinates, commands: Commands, engine: Optional[str] = None
+) -> Tuple[int, float, str]:
+    start_time = time.perf_counter()
+    result, engine = instruct_robot(start_position, commands, engine)
+    end_time = time.perf_counter()
+    elapsed_time = end_time - start_time
+
+    return result, elapsed_time, engine
+
+
+def instruct_robot(
+    start_position: Coordinates, commands: Commands, engine: Optional[str] = None
+) -> Tuple[int, str]:
+    """
+    Normalizes the commands and executes them with the given engine or, when no
+    engine is given, looks the walk up in the walk cache, then tries to
+    extrapolate it from a few repetitions of its repeated block and falls back to
+    the fastest engine for it.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        engine (Optional[str]): The name of the engine to use.
+
+    Returns:
+        Tuple[int, str]: The total number of visited locations and the name of the
+            engine that produced it, CACHE_ENGINE for cache hits and PERIODIC_ENGINE
+            for extrapolated walks.
+    """
+
+    commands = parse_commands(commands)
+    normalized_commands = normalize_commands(commands)
+    if engine is not None:
+        return execute_with_engine(start_position, normalized_commands, engine), engine
+
+    key = hash_commands(normalized_commands)
+    result = walk_cache.get(key)
+    if result is not None:
+        return result, CACHE_ENGINE
+
+    # Repeated blocks are looked for before normalizing, as merging commands
+    # across the end of a block would hide the repetition.
+    result = execute_periodic_walk(
+        start_position, commands, execute_with_selected_engine
+    )
+    if result is not None:
+        engine = PERIODIC_ENGINE
+    else:
+        engine = select_engine(
+            compute_walk_statistics(start_position, normalized_commands)
+        )
+        result = execute_with_engine(start_position, normalized_commands, engine)
+    walk_cache.put(key, result)
+    return result, engine
+
+
+def execute_with_selected_engine(
+    start_position: Coordinates, commands: Commands
+) -> int:
+    commands = normalize_commands(commands)
+    engine = select_engine(compute_walk_statistics(start_position, commands))
+    return execute_with_engine(start_position, commands, engine)
+
+
+def execute_with_engine(
+    start_position: Coordinates, commands: Commands, engine: str
+) -> int:
+    # Without commands the robot has not walked any trajectory, which every
+    # engine has to report the same way.
+    if len(commands) == 0:
+        return 0
+    return get_engine(engine)(start_position, commands)
+
+
+def compute_walk_statistics(
+    start_position: Coordinates, commands: Commands
+) -> WalkStatistics:
+    """
+    Computes the cheap statistics of a walk used to select an engine.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        WalkStatistics: The number of commands, the total, vertical and maximum
+            steps of a command, the width and height of the bounding box of the
+            walk and its smallest and largest coordinates.
+
+    Example:
+    >>> compute_walk_statistics([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 5},
+    ... ])
+    {'commands': 2, 'total_steps': 7, 'vertical_steps': 5, 'max_steps': 5, 'width': 3, 'height': 6, 'min_coordinate': 0, 'max_coordinate': 5}
+    """
+
+    total_steps = 0
+    vertical_steps = 0
+    max_steps = 0
+    min_x, min_y, max_x, max_y = robot_service.get_bounding_box(
+        start_position, commands
+    )
+    commands = parse_commands(commands)
+    for direction, steps in zip(commands.directions, commands.steps):
+        total_steps += steps
+        if CODE_CHANGES[direction][0] == 0:
+            vertical_steps += steps
+        if steps > max_steps:
+            max_steps = steps
+
+    return {
+        "commands": len(commands),
+        "total_steps": total_steps,
+        "vertical_steps": vertical_steps,
+        "max_steps": max_steps,
+        "width": max_x - min_x + 1,
+        "height": max_y - min_y + 1,
+        "min_coordinate": min(min_x, min_y),
+        "max_coordinate": max(max_x, max_y),
+    }
+
+
+def select_engine(statistics: WalkStatistics) -> str:
+    """
+    Selects the engine expected to execute a walk the fastest.
+
+    Args:
+        statistics (WalkStatistics): The statistics of the walk.
+
+    Returns:
+        str: The name of the selected engine.
+
+    Example:
+    >>> select_engine({"commands": 10000, "total_steps": 993737501, "vertical_steps": 496868750, "max_steps": 99999, "width": 102500, "height": 102500, "min_coordinate": -100000, "max_coordinate": 2500})
+    'sweep_line'
+
+
+    Explanation:
+    - Small walks go to the encoded set, everything else pays some preparation that only pays off on longer walks.
+    - Enumerating every cell with NumPy costs a few nanoseconds per step, the sweep line a few microseconds per command regardless of the steps, so the cheapest of both is picked.
+    - Walks whose steps do not fit the memory budget of the cell enumeration, whose area cannot be encoded in int64, or whose coordinates, steps included, reach MAX_NUMPY_COORDINATE, are left to the sweep line or the bitmap.
+    - The bitmap costs about a microsecond per command plus a fraction of that per step across its rows, growing with the length of the rows, so it wins on many short moves in a small area, where the steps are many compared with the area.
+    - The stripes of parallel_stripes are never picked, as their speedup over the sweep line has not been measured, and are only used when asked for by name.
+    """
+
+    if (
+        statistics["commands"] <= SMALL_WALK_COMMANDS
+        and statistics["total_steps"] <= SMALL_WALK_STEPS
+    ):
+        return "encoded_set"
+
+    sweep_line_cost = statistics["commands"] * SWEEP_LINE_COST_PER_COMMAND
+    if (
+        fits_numpy_coordinates(statistics)
+        and statistics["total_steps"] < robot_service_numpy_cells.DEFAULT_MEMORY_BUDGET
+        and statistics["width"] * statistics["height"] <= MAX_ENCODED_AREA
+    ):
+        cells_cost = (
+            statistics["total_steps"] * CELLS_COST_PER_STEP
+            + statistics["commands"] * CELLS_COST_PER_COMMAND
+        )
+        if cells_cost < sweep_line_cost:
+            return "numpy_cells"
+
+    if statistics["width"] * statistics["height"] <= MAX_BITMAP_AREA:
+        if estimate_bitmap_cost(statistics) < sweep_line_cost:
+            return "bitmap"
+
+    return "sweep_line"
+
+
+def fits_numpy_coordinates(statistics: WalkStatistics) -> bool:
+    farthest = max(abs(statistics["min_coordinate"]), abs(statistics["max_coordinate"]))
+    return farthest + statistics["total_steps"] < MAX_NUMPY_COORDINATE
+
+
+def estimate_bitmap_cost(statistics: WalkStatistics) -> float:
+    # The bitmap keeps its rows along the axis with most steps, as
+    # robot_service_bitmap does.
+    vertical_steps = statistics["vertical_steps"]
+    horizontal_steps = statistics["total_steps"] - vertical_steps
+    if vertical_steps > horizontal_steps:
+        cross_steps, row_length = horizontal_steps, statistics["height"]
+    else:
+        cross_steps, row_length = vertical_steps, statistics["width"]
+
+    operations = statistics["commands"] + cross_steps
+    return (
+        statistics["commands"] * BITMAP_COST_PER_COMMAND
+        + cross_steps * BITMAP_COST_PER_CROSS_STEP
+        + operations * row_length * BITMAP_COST_PER_BIT
+    )
@@ -0,0 +1,209 @@
+from typing import Dict, List, Tuple
+from connection_pool import ConnectionPool
+
+
+"""
+This Python code keeps the schema of the database up to date with versioned migrations.
+Every migration is applied once, in order, and recorded in the schema_migrations table, so the schema is set up when the application starts or from the command line instead of on every insert.
+"""
+
+# Key of the advisory lock held while migrating, so several processes starting
+# at once apply every migration only once.
+MIGRATION_LOCK_ID = 815_042_017
+
+CREATE_SCHEMA_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT now()
+);
+"""
+
+LOCK_MIGRATIONS = "SELECT pg_advisory_xact_lock(%s);"
+
+SELECT_APPLIED_VERSIONS = "SELECT version FROM schema_migrations;"
+
+INSERT_APPLIED_VERSION = """
+INSERT INTO schema_migrations (version, name) VALUES (%s, %s);
+"""
+
+# Migrations as (version, name, statement), in the order they are applied. The
+# first ones use IF NOT EXISTS, as they describe tables created before the
+# migrations existed.
+MIGRATIONS: Tuple[Tuple[int, str, str], ...] = (
+    (
+        1,
+        "create records",
+        """
+        CREATE TABLE IF NOT EXISTS records (
+            id SERIAL PRIMARY KEY,
+            "Timestamp" TIMESTAMP,
+            "Commands" INTEGER,
+            "Result" INTEGER,
+            "Duration" FLOAT
+        );
+        """,
+    ),
+    (
+        2,
+        "add engine to records",
+        """
+        ALTER TABLE records ADD COLUMN IF NOT EXISTS "Engine" TEXT;
+        """,
+    ),
+    (
+        3,
+        "add approximate to records",
+        """
+        ALTER TABLE records ADD COLUMN IF NOT EXISTS "Approximate" BOOLEAN DEFAULT FALSE;
+        """,
+    ),
+    # Rewrites the table under an ACCESS EXCLUSIVE lock, so it is applied from
+    # the command line before deploying rather than on the first request.
+    (
+        4,
+        "widen result of records",
+        """
+        ALTER TABLE records ALTER COLUMN "Result" TYPE BIGINT;
+        """,
+    ),
+)
+
+
+# The statement of every migration for SQLite, whose version is kept in PRAGMA
+# user_version. An empty statement leaves the schema as it is.
+SQLITE_STATEMENTS: Dict[int, str] = {
+    1: """
+    CREATE TABLE IF NOT EXISTS records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Timestamp" TEXT,
+        "Commands" INTEGER,
+        "Result" INTEGER,
+        "Duration" REAL
+    );
+    """,
+    2: """
+    ALTER TABLE records ADD COLUMN "Engine" TEXT;
+    """,
+    3: """
+    ALTER TABLE records ADD COLUMN "Approximate" BOOLEAN DEFAULT FALSE;
+    """,
+    # SQLite integers already have 64 bits.
+    4: "",
+}
+
+# Taken from MIGRATIONS, so both databases go through the same versions, and a
+# migration missing its SQLite statement fails on import.
+SQLITE_MIGRATIONS: Tuple[Tuple[int, str, str], ...] = tuple(
+    (version, name, SQLITE_STATEMENTS[version]) for version, name, _ in MIGRATIONS
+)
+
+
+def apply_migrations(cursor) -> List[int]:
+    """
+    Applies the migrations missing from the database, within the transaction of
+    the cursor.
+
+    Args:
+        cursor: A cursor of a connection in a transaction.
+
+    Returns:
+        List[int]: The versions applied, in order.
+
+    Example:
+    >>> with connection:
+    ...     with connection.cursor() as cursor:
+    ...         apply_migrations(cursor)
+    [1, 2, 3, 4]
+    """
+
+    cursor.execute(LOCK_MIGRATIONS, (MIGRATION_LOCK_ID,))
+    cursor.execute(CREATE_SCHEMA_MIGRATIONS_TABLE)
+    cursor.execute(SELECT_APPLIED_VERSIONS)
+    applied_versions = {version for version, in cursor.fetchall()}
+
+    applied = []
+    for version, name, statement in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        cursor.execute(statement)
+        cursor.execute(INSERT_APPLIED_VERSION, (version, name))
+        applied.append(version)
+
+    return applied
+
+
+def migrate(connection_pool: ConnectionPool) -> List[int]:
+    """
+    Applies the missing migrations in a single transaction, so a failing one
+    leaves the schema as it was.
+
+    Args:
+        connection_pool (ConnectionPool): The pool to check a connection out of.
+
+    Returns:
+        List[int]: The versions applied, in order.
+    """
+
+    with connection_pool.connection() as connection:
+        # Connections of the pool commit every statement on its own, which
+        # migrations must not do.
+        autocommit = connection.autocommit
+        connection.autocommit = False
+        try:
+            with connection:
+                with connection.cursor() as cursor:
+                    return apply_migrations(cursor)
+        finally:
+            connection.autocommit = autocommit
+
+
+def apply_sqlite_migrations(connection) -> List[int]:
+    """
+    Applies the SQLite migrations missing from the database in a single
+    transaction.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database.
+
+    Returns:
+        List[int]: The versions applied, in order.
+
+    Example:
+    >>> apply_sqlite_migrations(sqlite3.connect(":memory:"))
+    [1, 2, 3, 4]
+    """
+
+    # The sqlite3 module does not open transactions for schema statements, so it
+    # is opened explicitly, locking out other processes migrating at once.
+    connection.execute("BEGIN IMMEDIATE;")
+    try:
+        (current_version,) = connection.execute("PRAGMA user_version;").fetchone()
+        applied = []
+        for version, _, statement in SQLITE_MIGRATIONS:
+            if version <= current_version:
+                continue
+            if statement:
+                connection.execute(statement)
+            applied.append(version)
+        if applied:
+            connection.execute(f"PRAGMA user_version = {applied[-1]};")
+        connection.execute("COMMIT;")
+    except BaseException:
+        connection.execute("ROLLBACK;")
+        raise
+
+    return applied
+
+
+if __name__ == "__main__":
+    # The storage is created on its own, as importing record_service would also
+    # start the spool or the write-behind threads.
+    from storage import create_storage
+
+    storage = create_storage()
+    applied = storage.migrate()
+    if applied:
+        print("Applied migrations: " + ", ".join(map(str, applied)))
+    else:
+        print("The schema is up to date.")
@@ -1,38 +1,44 @@
-import psycopg2
+from typing import List
+import atexit
 import os
+import signal
+import sys
+import threading
 from custom_types import ExecutionResult
-from utils import parse_env_variable
+from record_writer import BatchedRecordWriter
+from record_spool import DEFAULT_SPOOL_PATH, RecordSpool
+from storage import INSERT_RECORD, RecordRow, RecordValues, create_storage
 
 
-url = os.getenv("DATABASE_URL")
-url = parse_env_variable(url)
+# The backend is picked with RECORD_STORAGE and only connects on the first write.
+storage = create_storage()
 
-connection = psycopg2.connect(url)
+# With write-behind the results are queued and written in batches by a
+# background thread, so requests do not wait for the database.
+WRITE_BEHIND = os.getenv("RECORD_WRITE_BEHIND", "0") == "1"
 
+# With the spool the results are appended to a local file and replayed into the
+# storage in the background, so they survive the database being down. It takes
+# precedence over write-behind, which it makes unnecessary.
+SPOOL = os.getenv("RECORD_SPOOL", "0") == "1"
 
-CREATE_RECORD_TABLE = """
-CREATE TABLE IF NOT EXISTS records (
-    id SERIAL PRIMARY KEY,
-    "Timestamp" TIMESTAMP,
-    "Commands" INTEGER,
-    "Result" INTEGER,
-    "Duration" FLOAT
-);
-"""
-
-INSERT_RECORD = """
-INSERT INTO records ("Timestamp", "Commands", "Result", "Duration")
-VALUES (%s, %s, %s, %s) RETURNING id, "Timestamp", "Commands", "Result", "Duration";
-"""
+# Seconds given to the spool to replay what is left when the process exits, the
+# rest is replayed on the next start.
+SPOOL_CLOSE_TIMEOUT = 5
 
 
 def save_result(record: ExecutionResult):
     """
-    Saves the execution result to the PostgreSQL database.
+    Saves the execution result to the storage backend, with a single INSERT for
+    PostgreSQL.
+
+    With the spool or write-behind the result is only spooled or queued, and the
+    response has no id yet and a 202 status code.
 
     Args:
         record (ExecutionResult): A dictionary containing timestamp, commands,
-            result, and duration of execution.
+            result, duration of execution and, optionally, the engine used and
+            whether the result is an estimate.
 
     Returns:
         tuple: A tuple containing a response dictionary and an HTTP status code.
@@ -43,30 +49,25 @@ def save_result(record: ExecutionResult):
     ...     "commands": 10,
     ...     "result": 42,
     ...     "duration": 1.5,
+    ...     "engine": "sweep_line",
     ... })
-    ({'id': 101, 'Timestamp': '2024-01-05T12:34:56', 'Commands': 10, 'Result': 42, 'Duration': 1.5, 'message': 'Record inserted successfully.'}, 201)
+    ({'id': 101, 'Timestamp': '2024-01-05T12:34:56', 'Commands': 10, 'Result': 42, 'Duration': 1.5, 'Engine': 'sweep_line', 'Approximate': False, 'message': 'Record inserted successfully.'}, 201)
     """
 
     try:
-        with connection:
-            with connection.cursor() as cursor:
-                try_create_record_table(cursor)
-                try_insert_record(cursor, record)
-
-                response = verify_insertion(cursor)
-                return response
-
-    except Exception as e:
-        raise Exception(e) from None
+        if record_spool is not None:
+            get_record_values(record)
+            record_spool.append(record)
+            return get_queued_response(record, "Record spooled for insertion.")
 
+        if record_writer is not None:
+            # Records missing a value are rejected now, not when written.
+            get_record_values(record)
+            record_writer.submit(record)
+            return get_queued_response(record)
 
-def create_record_table(cursor):
-    cursor.execute(CREATE_RECORD_TABLE)
+        return get_inserted_response(storage.insert_record(get_record_values(record)))
 
-
-def try_create_record_table(cursor):
-    try:
-        create_record_table(cursor)
     except Exception as e:
         raise Exception(e) from None
 
@@ -79,28 +80,80 @@ def try_insert_record(cursor, record: ExecutionResult):
 
 
 def insert_record(cursor, record: ExecutionResult):
-    cursor.execute(
-        INSERT_RECORD,
-        (
-            record["timestamp"],
-            record["commands"],
-            record["result"],
-            record["duration"],
-        ),
+    cursor.execute(INSERT_RECORD, get_record_values(record))
+
+
+def insert_records(records: List[ExecutionResult]):
+    storage.insert_records([get_record_values(record) for record in records])
+
+
+def get_record_values(record: ExecutionResult) -> RecordValues:
+    return (
+        record["timestamp"],
+        record["commands"],
+        record["result"],
+        record["duration"],
+        record.get("engine"),
+        record.get("approximate", False),
     )
 
 
+def get_queued_response(
+    record: ExecutionResult, message: str = "Record queued for insertion."
+):
+    return {
+        "id": None,
+        "Timestamp": record["timestamp"],
+        "Commands": record["commands"],
+        "Result": record["result"],
+        "Duration": record["duration"],
+        "Engine": record.get("engine"),
+        "Approximate": record.get("approximate", False),
+        "message": message,
+    }, 202
+
+
 def verify_insertion(cursor):
-    inserted_row = cursor.fetchone()
+    return get_inserted_response(cursor.fetchone())
+
+
+def get_inserted_response(inserted_row: RecordRow):
     if inserted_row:
-        id, timestamp, commands, result, duration = inserted_row
+        id, timestamp, commands, result, duration, engine, approximate = inserted_row
         return {
             "id": id,
             "Timestamp": timestamp,
             "Commands": commands,
             "Result": result,
             "Duration": duration,
+            "Engine": engine,
+            "Approximate": approximate,
             "message": "Record inserted successfully.",
         }, 201
     else:
         raise Exception("Oops! Something went wrong during insertion.") from None
+
+
+record_spool = RecordSpool(DEFAULT_SPOOL_PATH, insert_records) if SPOOL else None
+if record_spool is not None:
+    atexit.register(record_spool.close, SPOOL_CLOSE_TIMEOUT)
+
+record_writer = (
+    BatchedRecordWriter(insert_records) if WRITE_BEHIND and not SPOOL else None
+)
+if record_writer is not None:
+    # Queued records are written before the process exits.
+    atexit.register(record_writer.close)
+
+
+def exit_on_sigterm(signum, frame):
+    # SIGTERM, as sent by docker stop, ends the process without running the
+    # atexit handlers, while exiting runs them and flushes the records.
+    sys.exit(128 + signum)
+
+
+# Signal handlers can only be installed from the main thread.
+if (
+    record_spool is not None or record_writer is not None
+) and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGTERM, exit_on_sigterm)
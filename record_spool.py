@@ -0,0 +1,359 @@
+from typing import Callable, Dict, List, Optional, Tuple, Type
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from custom_types import ExecutionResult
+from storage import REJECTED_RECORD_ERRORS
+
+
+"""
+This Python code keeps the execution results in an append-only local file before they reach the database.
+A result is acknowledged once it is on disk, and a background thread replays the file into the database, remembering in a second file how far it got, so results survive database outages and restarts.
+Results the database rejects are moved to a dead-letter file, so they cannot hold back the ones spooled after them.
+"""
+
+DEFAULT_SPOOL_PATH = os.getenv("RECORD_SPOOL_PATH", "records.spool")
+
+# Appends arriving within this many seconds of each other share a single fsync.
+DEFAULT_FSYNC_INTERVAL = float(os.getenv("RECORD_SPOOL_FSYNC_INTERVAL_MS", "2")) / 1000
+
+DEFAULT_REPLAY_BATCH_SIZE = int(os.getenv("RECORD_SPOOL_BATCH_SIZE", "500"))
+
+# Seconds between attempts to replay a batch while the database is unreachable.
+DEFAULT_RETRY_INTERVAL = float(os.getenv("RECORD_SPOOL_RETRY_INTERVAL", "1"))
+
+# Once everything is replayed, a spool larger than this many bytes is emptied.
+DEFAULT_COMPACT_SIZE = int(os.getenv("RECORD_SPOOL_COMPACT_SIZE", str(2**20)))
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolLockedError(Exception):
+    """
+    Raised when another spool, in this process or another one, uses the file.
+    """
+
+
+class RecordSpool:
+    """
+    Durable queue of execution results in a newline delimited JSON file.
+
+    append only returns once the record is synced to disk. Concurrent appends are
+    synced together by a background thread, so the cost of an fsync is shared by
+    every request waiting for it.
+
+    Another thread reads the synced records from the committed offset on, writes
+    them with write_batch and commits the offset past them in the offset file.
+    A failing batch is retried until the database takes it, and a crash between
+    writing a batch and committing its offset replays that batch again, so
+    records are written at least once.
+
+    A batch failing with one of rejected_errors is split in halves until the
+    records the database rejects are alone, and those are appended to the
+    dead-letter file next to the spool instead of being written.
+
+    The spool holds an exclusive lock on a file next to it until closed, so a
+    second spool on the same file fails with SpoolLockedError instead of
+    replaying the same records.
+
+    Example:
+    >>> batches = []
+    >>> spool = RecordSpool("records.spool", batches.append)
+    >>> spool.append({"result": 4})
+    >>> spool.close()
+    >>> batches
+    [[{'result': 4}]]
+    """
+
+    def __init__(
+        self,
+        path: str,
+        write_batch: Callable[[List[ExecutionResult]], None],
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+        batch_size: int = DEFAULT_REPLAY_BATCH_SIZE,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        compact_size: int = DEFAULT_COMPACT_SIZE,
+        rejected_errors: Tuple[Type[BaseException], ...] = REJECTED_RECORD_ERRORS,
+    ):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.dead_letter_path = path + ".dead"
+        self.lock_file = lock_spool(path + ".lock")
+        self.write_batch = write_batch
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.compact_size = compact_size
+        self.rejected_errors = rejected_errors
+
+        self.file = open(path, "ab")
+        self.committed_offset = self.recover()
+        self.written_offset = self.synced_offset = self.file.tell()
+
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.closed = threading.Event()
+        self.appended = 0
+        self.fsyncs = 0
+        self.replayed = 0
+        self.replay_failures = 0
+        self.dead_letters = 0
+        self.compactions = 0
+
+        self.sync_thread = threading.Thread(
+            target=self.run_sync, name="record-spool-sync", daemon=True
+        )
+        self.replay_thread = threading.Thread(
+            target=self.run_replay, name="record-spool-replay", daemon=True
+        )
+        self.sync_thread.start()
+        self.replay_thread.start()
+
+    def recover(self) -> int:
+        # A crash while appending can leave a partial last line, which was never
+        # acknowledged and is cut off.
+        size = self.file.seek(0, os.SEEK_END)
+        content_end = find_content_end(self.path, size)
+        if content_end < size:
+            self.file.truncate(content_end)
+            self.file.seek(content_end)
+
+        committed_offset = read_offset(self.offset_path)
+        # The spool is emptied before its offset is reset, so an offset past the
+        # end means the spool was emptied right before a crash.
+        if committed_offset > content_end:
+            committed_offset = 0
+            write_offset(self.offset_path, 0)
+        return committed_offset
+
+    def append(self, record: ExecutionResult) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("The record spool is closed")
+            self.file.write(line)
+            self.written_offset += len(line)
+            self.appended += 1
+            target = self.written_offset
+            self.condition.notify_all()
+            while self.synced_offset < target:
+                self.condition.wait()
+
+    def run_sync(self) -> None:
+        while True:
+            with self.condition:
+                while self.synced_offset == self.written_offset and not self.stopping:
+                    self.condition.wait()
+                if self.synced_offset == self.written_offset:
+                    return
+            # Appends arriving meanwhile join this fsync.
+            time.sleep(self.fsync_interval)
+            with self.condition:
+                self.file.flush()
+                target = self.written_offset
+            os.fsync(self.file.fileno())
+            with self.condition:
+                self.synced_offset = target
+                self.fsyncs += 1
+                self.condition.notify_all()
+
+    def run_replay(self) -> None:
+        with open(self.path, "rb") as spool:
+            while True:
+                with self.condition:
+                    while (
+                        self.committed_offset == self.synced_offset
+                        and not self.stopping
+                    ):
+                        self.condition.wait()
+                    if self.committed_offset == self.synced_offset:
+                        return
+                    start, end = self.committed_offset, self.synced_offset
+
+                records, offsets = read_records(spool, start, end, self.batch_size)
+                dead_letters = self.dead_letters
+                done = self.replay(records)
+                if done:
+                    write_offset(self.offset_path, offsets[done - 1])
+                    with self.condition:
+                        self.committed_offset = offsets[done - 1]
+                        self.replayed += done - (self.dead_letters - dead_letters)
+                        self.compact()
+                        self.condition.notify_all()
+
+                if done < len(records):
+                    # Appends wake the condition up, so the retry waits on an
+                    # event only set when closing instead.
+                    if self.closed.wait(self.retry_interval):
+                        return
+
+    def replay(self, records: List[ExecutionResult]) -> int:
+        """
+        Writes the records, or dead-letters the ones the database rejects.
+
+        Returns:
+            int: How many of the first records are written or dead-lettered,
+                fewer than all of them when writing failed on the way.
+        """
+        try:
+            self.write_batch(records)
+            return len(records)
+        except self.rejected_errors:
+            if len(records) == 1:
+                logger.exception("The database rejected a spooled record")
+                self.dead_letter(records[0])
+                return 1
+        except Exception:
+            logger.exception("Replaying %d spooled records failed", len(records))
+            with self.condition:
+                self.replay_failures += 1
+            return 0
+
+        middle = len(records) // 2
+        replayed = self.replay(records[:middle])
+        if replayed < middle:
+            return replayed
+        return middle + self.replay(records[middle:])
+
+    def dead_letter(self, record: ExecutionResult) -> None:
+        # Only the replay thread writes the dead-letter file.
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with open(self.dead_letter_path, "ab") as dead_letter_file:
+            dead_letter_file.write(line)
+            dead_letter_file.flush()
+            os.fsync(dead_letter_file.fileno())
+        with self.condition:
+            self.dead_letters += 1
+
+    def compact(self) -> None:
+        # Called with the condition held, so no append can be in between.
+        if (
+            not self.stopping
+            and self.committed_offset == self.written_offset
+            and self.written_offset >= self.compact_size
+        ):
+            self.file.truncate(0)
+            self.file.seek(0)
+            os.fsync(self.file.fileno())
+            write_offset(self.offset_path, 0)
+            self.committed_offset = self.written_offset = self.synced_offset = 0
+            self.compactions += 1
+
+    def wait_until_replayed(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every record appended so far is in the database.
+        """
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.committed_offset == self.written_offset, timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops accepting records and syncs the spool. Records the database does
+        not take within the timeout stay in the spool for the next start.
+        """
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.closed.set()
+        self.sync_thread.join()
+        self.replay_thread.join(timeout)
+        self.file.close()
+        # Closing the lock file releases the lock.
+        self.lock_file.close()
+
+    def info(self) -> Dict[str, float]:
+        with self.condition:
+            return {
+                "appended": self.appended,
+                "fsyncs": self.fsyncs,
+                "records_per_fsync": (
+                    self.appended / self.fsyncs if self.fsyncs else 0.0
+                ),
+                "replayed": self.replayed,
+                "replay_failures": self.replay_failures,
+                "dead_letters": self.dead_letters,
+                "pending_bytes": self.written_offset - self.committed_offset,
+                "compactions": self.compactions,
+            }
+
+
+def lock_spool(path: str):
+    """
+    Opens the lock file of a spool and takes its exclusive lock, without waiting
+    for it.
+
+    Raises:
+        SpoolLockedError: If another spool holds the lock.
+    """
+
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        raise SpoolLockedError(f"The spool locked by {path} is in use") from None
+    return lock_file
+
+
+def read_records(
+    spool, start: int, end: int, batch_size: int
+) -> Tuple[List[ExecutionResult], List[int]]:
+    """
+    Reads up to batch_size records of the spool from the start offset, without
+    going past the end offset.
+
+    Returns:
+        Tuple[List[ExecutionResult], List[int]]: The records and the offset after
+            every one of them.
+    """
+
+    spool.seek(start)
+    records = []
+    offsets = []
+    offset = start
+    while offset < end and len(records) < batch_size:
+        line = spool.readline()
+        offset += len(line)
+        records.append(json.loads(line))
+        offsets.append(offset)
+    return records, offsets
+
+
+def find_content_end(path: str, size: int, chunk_size: int = 2**16) -> int:
+    """
+    Returns the offset right after the last complete line of the spool.
+    """
+
+    with open(path, "rb") as spool:
+        end = size
+        while end > 0:
+            start = max(0, end - chunk_size)
+            spool.seek(start)
+            newline = spool.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def read_offset(path: str) -> int:
+    try:
+        with open(path) as offset_file:
+            return int(offset_file.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def write_offset(path: str, offset: int) -> None:
+    # The offset is replaced atomically, so a crash leaves the old or the new one.
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as offset_file:
+        offset_file.write(str(offset))
+        offset_file.flush()
+        os.fsync(offset_file.fileno())
+    os.replace(temporary_path, path)
@@ -0,0 +1,222 @@
+from typing import Callable, Dict, List, Tuple, Type
+import logging
+import os
+import queue
+import threading
+import time
+from custom_types import ExecutionResult
+from storage import REJECTED_RECORD_ERRORS
+
+
+"""
+This Python code writes the execution results to the database behind the requests, in batches.
+Requests hand their result to a bounded queue and return, and a background thread writes whatever is queued with a single statement every batch_size records or flush_interval seconds.
+"""
+
+DEFAULT_BATCH_SIZE = int(os.getenv("RECORD_BATCH_SIZE", "500"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("RECORD_FLUSH_INTERVAL_MS", "50")) / 1000
+DEFAULT_QUEUE_SIZE = int(os.getenv("RECORD_QUEUE_SIZE", "10000"))
+
+# Seconds a request waits for room in a full queue before giving up, which slows
+# requests down to the pace of the database instead of growing without bound.
+DEFAULT_SUBMIT_TIMEOUT = float(os.getenv("RECORD_SUBMIT_TIMEOUT", "5"))
+
+# A batch is dropped after failing this many times in a row for any reason but a
+# record the database rejects, waiting DEFAULT_RETRY_BACKOFF seconds, doubled
+# every time, in between, so a short outage loses nothing.
+MAX_WRITE_ATTEMPTS = 5
+DEFAULT_RETRY_BACKOFF = float(os.getenv("RECORD_RETRY_BACKOFF_MS", "100")) / 1000
+
+logger = logging.getLogger(__name__)
+
+
+class RecordQueueFullError(Exception):
+    """
+    Raised when a result cannot be queued because the database falls behind.
+    """
+
+
+class BatchedRecordWriter:
+    """
+    Writes execution results in batches from a background thread.
+
+    Example:
+    >>> batches = []
+    >>> writer = BatchedRecordWriter(batches.append, batch_size=2)
+    >>> for result in range(3):
+    ...     writer.submit({"result": result})
+    >>> writer.close()
+    >>> [len(batch) for batch in batches]
+    [2, 1]
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[ExecutionResult]], None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        submit_timeout: float = DEFAULT_SUBMIT_TIMEOUT,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        rejected_errors: Tuple[Type[BaseException], ...] = REJECTED_RECORD_ERRORS,
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.submit_timeout = submit_timeout
+        self.retry_backoff = retry_backoff
+        self.rejected_errors = rejected_errors
+        self.queue: "queue.Queue[ExecutionResult]" = queue.Queue(queue_size)
+        self.lock = threading.Lock()
+        self.submitting = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_records = 0
+        self.flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.failed_flushes = 0
+        self.dropped_records = 0
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name="record-writer", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, record: ExecutionResult) -> None:
+        # Submissions in progress are counted, so the writer does not stop
+        # before the records they are queuing.
+        with self.lock:
+            if self.stopping.is_set():
+                raise RuntimeError("The record writer is closed")
+            self.submitting += 1
+        try:
+            self.queue.put(record, timeout=self.submit_timeout)
+        except queue.Full:
+            with self.lock:
+                self.rejected += 1
+            raise RecordQueueFullError(
+                f"The record queue stayed full for {self.submit_timeout}s"
+            ) from None
+        finally:
+            with self.lock:
+                self.submitting -= 1
+        with self.lock:
+            self.submitted += 1
+
+    def run(self) -> None:
+        while True:
+            batch = self.take_batch()
+            if batch:
+                self.write(batch)
+                for _ in batch:
+                    self.queue.task_done()
+            elif self.is_drained():
+                return
+
+    def is_drained(self) -> bool:
+        with self.lock:
+            return (
+                self.stopping.is_set() and self.submitting == 0 and self.queue.empty()
+            )
+
+    def take_batch(self) -> List[ExecutionResult]:
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        # The first record waits at most flush_interval for others to join it,
+        # and none once the writer is closing.
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0 and not self.stopping.is_set():
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, batch: List[ExecutionResult]) -> None:
+        """
+        Writes the batch, retrying when it fails. When the database rejects it
+        with one of rejected_errors, its records are written one by one, so only
+        the ones it rejects are dropped.
+        """
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            start_time = time.perf_counter()
+            try:
+                self.write_batch(batch)
+            except self.rejected_errors:
+                with self.lock:
+                    self.failed_flushes += 1
+                if len(batch) > 1:
+                    logger.exception(
+                        "Writing %d records failed, writing them one by one",
+                        len(batch),
+                    )
+                    for record in batch:
+                        self.write([record])
+                    return
+                logger.exception("The database rejected a record, dropping it")
+                with self.lock:
+                    self.dropped_records += 1
+                return
+            except Exception:
+                logger.exception(
+                    "Writing %d records failed, attempt %d of %d",
+                    len(batch),
+                    attempt,
+                    MAX_WRITE_ATTEMPTS,
+                )
+                with self.lock:
+                    self.failed_flushes += 1
+                    if attempt == MAX_WRITE_ATTEMPTS:
+                        self.dropped_records += len(batch)
+                        return
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                continue
+
+            flush_time = time.perf_counter() - start_time
+            with self.lock:
+                self.flushes += 1
+                self.flushed_records += len(batch)
+                self.flush_time += flush_time
+                self.max_flush_time = max(self.max_flush_time, flush_time)
+            return
+
+    def flush(self) -> None:
+        """
+        Waits until every record submitted so far is written or dropped.
+        """
+        self.queue.join()
+
+    def close(self, timeout: float = None) -> None:
+        """
+        Stops accepting records and waits for the queued ones to be written.
+        """
+        with self.lock:
+            self.stopping.set()
+        self.thread.join(timeout)
+
+    def info(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "queued": self.queue.qsize(),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flushed_records": self.flushed_records,
+                "mean_flush_size": (
+                    self.flushed_records / self.flushes if self.flushes else 0.0
+                ),
+                "mean_flush_time": (
+                    self.flush_time / self.flushes if self.flushes else 0.0
+                ),
+                "max_flush_time": self.max_flush_time,
+                "failed_flushes": self.failed_flushes,
+                "dropped_records": self.dropped_records,
+            }
@@ -0,0 +1,432 @@
+from typing import Dict, List, Tuple, Union
+from array import array
+from bisect import bisect_left, bisect_right
+from robot_service_bitmap import count_bits
+
+
+"""
+This Python code keeps a set of visited locations as compressed rows, in the spirit of roaring bitmaps.
+Every row is split in chunks of 2^16 locations and every chunk is kept as the smallest of three containers: a sorted array of offsets, a bitmap or a list of runs.
+Runs across the rows are kept the same way in columns, so a long one is a single run as well.
+"""
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+
+# Size, in bytes, of every container in the roaring format: 2 bytes per value of
+# an array, 4 bytes per run and a fixed 8 KB per bitmap.
+ARRAY_BYTES_PER_VALUE = 2
+RUN_BYTES = 4
+BITMAP_BYTES = CHUNK_SIZE // 8
+
+# Above this many values an array is larger than a bitmap.
+ARRAY_MAX_VALUES = BITMAP_BYTES // ARRAY_BYTES_PER_VALUE
+
+
+class ArrayContainer:
+    """
+    The offsets set in a chunk, as a sorted array of 16-bit values.
+
+    Example:
+    >>> container = ArrayContainer()
+    >>> container.add_range(3, 5), container.add_range(4, 8), list(container.values)
+    (3, 3, [3, 4, 5, 6, 7, 8])
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: array = None):
+        self.values = array("H") if values is None else values
+
+    @property
+    def cardinality(self) -> int:
+        return len(self.values)
+
+    def add_range(self, start: int, end: int) -> int:
+        values = self.values
+        first = bisect_left(values, start)
+        last = bisect_right(values, end)
+        new_values = end - start + 1 - (last - first)
+        if new_values > 0:
+            values[first:last] = array("H", range(start, end + 1))
+        return new_values
+
+    def contains(self, value: int) -> bool:
+        index = bisect_left(self.values, value)
+        return index < len(self.values) and self.values[index] == value
+
+    def count_runs(self) -> int:
+        values = self.values
+        return sum(
+            1
+            for index in range(len(values))
+            if index == 0 or values[index] != values[index - 1] + 1
+        )
+
+    def to_bitmap(self) -> "BitmapContainer":
+        bits = 0
+        for value in self.values:
+            bits |= 1 << value
+        return BitmapContainer(bits, len(self.values))
+
+    def to_runs(self) -> "RunContainer":
+        runs = RunContainer()
+        for value in self.values:
+            if runs.ends and runs.ends[-1] == value - 1:
+                runs.ends[-1] = value
+            else:
+                runs.starts.append(value)
+                runs.ends.append(value)
+        runs.cardinality = len(self.values)
+        return runs
+
+
+class BitmapContainer:
+    """
+    The offsets set in a chunk, as the bits of a Python int.
+
+    Example:
+    >>> container = BitmapContainer()
+    >>> container.add_range(0, 9), container.add_range(5, 14), container.count_runs()
+    (10, 5, 1)
+    """
+
+    __slots__ = ("bits", "cardinality")
+
+    def __init__(self, bits: int = 0, cardinality: int = 0):
+        self.bits = bits
+        self.cardinality = cardinality
+
+    def add_range(self, start: int, end: int) -> int:
+        mask = ((1 << (end - start + 1)) - 1) << start
+        new_values = end - start + 1 - count_bits(self.bits & mask)
+        self.bits |= mask
+        self.cardinality += new_values
+        return new_values
+
+    def contains(self, value: int) -> bool:
+        return self.bits >> value & 1 == 1
+
+    def count_runs(self) -> int:
+        # A run starts at every bit set whose lower neighbour is not.
+        return count_bits(self.bits & ~(self.bits << 1))
+
+    def to_runs(self) -> "RunContainer":
+        runs = RunContainer()
+        bits = self.bits
+        while bits:
+            start = (bits & -bits).bit_length() - 1
+            shifted = bits >> start
+            # The number of trailing ones is the length of the run.
+            length = (~shifted & (shifted + 1)).bit_length() - 1
+            runs.starts.append(start)
+            runs.ends.append(start + length - 1)
+            bits ^= ((1 << length) - 1) << start
+        runs.cardinality = self.cardinality
+        return runs
+
+
+class RunContainer:
+    """
+    The offsets set in a chunk, as sorted and disjoint runs of consecutive values.
+
+    Example:
+    >>> container = RunContainer()
+    >>> container.add_range(10, 20), container.add_range(0, 4), container.add_range(5, 12)
+    (11, 5, 5)
+    >>> list(container.starts), list(container.ends), container.cardinality
+    ([0], [20], 21)
+    """
+
+    __slots__ = ("starts", "ends", "cardinality")
+
+    def __init__(self):
+        self.starts = array("H")
+        self.ends = array("H")
+        self.cardinality = 0
+
+    def add_range(self, start: int, end: int) -> int:
+        starts, ends = self.starts, self.ends
+        # Runs touching [start, end] are merged as well to keep them disjoint.
+        first = bisect_left(ends, start - 1)
+        last = bisect_right(starts, end + 1)
+
+        already_set = 0
+        for index in range(first, last):
+            overlap = min(ends[index], end) - max(starts[index], start) + 1
+            if overlap > 0:
+                already_set += overlap
+
+        new_values = end - start + 1 - already_set
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        starts[first:last] = array("H", [start])
+        ends[first:last] = array("H", [end])
+        self.cardinality += new_values
+        return new_values
+
+    def contains(self, value: int) -> bool:
+        index = bisect_right(self.starts, value) - 1
+        return index >= 0 and self.ends[index] >= value
+
+    def count_runs(self) -> int:
+        return len(self.starts)
+
+    def to_array(self) -> ArrayContainer:
+        values = array("H")
+        for start, end in zip(self.starts, self.ends):
+            values.extend(range(start, end + 1))
+        return ArrayContainer(values)
+
+    def to_bitmap(self) -> BitmapContainer:
+        bits = 0
+        for start, end in zip(self.starts, self.ends):
+            bits |= ((1 << (end - start + 1)) - 1) << start
+        return BitmapContainer(bits, self.cardinality)
+
+
+Container = Union[ArrayContainer, BitmapContainer, RunContainer]
+
+
+def get_container_size(container: Container) -> int:
+    """
+    Returns the size, in bytes, of a container in the roaring format.
+
+    Example:
+    >>> get_container_size(ArrayContainer(array("H", [1, 5, 9])))
+    6
+    """
+
+    if isinstance(container, BitmapContainer):
+        return BITMAP_BYTES
+    if isinstance(container, RunContainer):
+        return container.count_runs() * RUN_BYTES
+    return container.cardinality * ARRAY_BYTES_PER_VALUE
+
+
+def optimize_container(container: Container) -> Container:
+    """
+    Converts a container into the smallest one holding the same offsets.
+
+    Args:
+        container (Container): The container of a chunk.
+
+    Returns:
+        Container: The same container when it is already the smallest one, a
+            converted copy otherwise.
+
+    Example:
+    >>> container = ArrayContainer(array("H", range(100)))
+    >>> type(optimize_container(container)).__name__
+    'RunContainer'
+    """
+
+    cardinality = container.cardinality
+    run_size = container.count_runs() * RUN_BYTES
+    array_size = (
+        cardinality * ARRAY_BYTES_PER_VALUE
+        if cardinality <= ARRAY_MAX_VALUES
+        else BITMAP_BYTES + 1
+    )
+
+    if run_size < array_size and run_size < BITMAP_BYTES:
+        if isinstance(container, RunContainer):
+            return container
+        return container.to_runs()
+    if array_size <= BITMAP_BYTES:
+        if isinstance(container, ArrayContainer):
+            return container
+        # Bitmaps never shrink below ARRAY_MAX_VALUES values, so only runs
+        # become arrays.
+        return container.to_array()
+    if isinstance(container, BitmapContainer):
+        return container
+    return container.to_bitmap()
+
+
+class RoaringRows:
+    """
+    A set of locations kept as compressed rows. Rows and chunks are only created
+    when a location in them is added, so memory grows with the compressed
+    coverage instead of the bounding box.
+
+    Runs of locations are added along a row with add_horizontal_run, and across
+    the rows with add_vertical_run, which keeps them in columns split in chunks
+    the same way, so a long run across the rows takes a few bytes instead of a
+    container in every row. A location can be both in a row and in a column,
+    so those crossings are counted, once, when the number of locations is asked
+    for.
+
+    Example:
+    >>> rows = RoaringRows()
+    >>> rows.add_horizontal_run(0, -10, 70000)
+    >>> rows.add_vertical_run(5, -2, 2)
+    >>> len(rows), rows.get_size()
+    (70015, 20)
+    """
+
+    __slots__ = (
+        "rows",
+        "columns",
+        "row_cardinality",
+        "column_cardinality",
+        "crossings",
+    )
+
+    def __init__(self):
+        self.rows: Dict[int, Dict[int, Container]] = {}
+        self.columns: Dict[int, Dict[int, Container]] = {}
+        self.row_cardinality = 0
+        self.column_cardinality = 0
+        self.crossings = 0
+
+    def __len__(self) -> int:
+        if self.crossings is None:
+            self.crossings = self.count_crossings()
+        return self.row_cardinality + self.column_cardinality - self.crossings
+
+    def add_horizontal_run(self, row: int, start: int, end: int) -> None:
+        self.row_cardinality += add_run(self.rows, row, start, end)
+        if self.columns:
+            self.crossings = None
+
+    def add_vertical_run(self, column: int, start: int, end: int) -> None:
+        # A single location is a run along its row as well, where it shares
+        # the containers of the moves along the row.
+        if start == end:
+            self.add_horizontal_run(start, column, column)
+            return
+        self.column_cardinality += add_run(self.columns, column, start, end)
+        self.crossings = None
+
+    def count_crossings(self) -> int:
+        """
+        Returns the number of locations both in a row and in a column.
+
+        Explanation:
+        - The rows are sorted once, and every run of a column only looks at the rows it goes through, so crossings cost at most the steps across the rows, and usually much less.
+        """
+        rows = self.rows
+        sorted_rows = sorted(rows)
+        crossings = 0
+        for column, column_chunks in self.columns.items():
+            chunk = column >> CHUNK_BITS
+            offset = column & CHUNK_MASK
+            for row_chunk, container in column_chunks.items():
+                base = row_chunk << CHUNK_BITS
+                for start, end in get_container_runs(container):
+                    first = bisect_left(sorted_rows, base + start)
+                    last = bisect_right(sorted_rows, base + end)
+                    for index in range(first, last):
+                        row_container = rows[sorted_rows[index]].get(chunk)
+                        if row_container is not None and row_container.contains(offset):
+                            crossings += 1
+        return crossings
+
+    def optimize(self) -> None:
+        """
+        Converts every container into the smallest one, including the ones that
+        are only checked when a chunk grows past its current container.
+        """
+        for lines in (self.rows, self.columns):
+            for chunks in lines.values():
+                for chunk, container in chunks.items():
+                    chunks[chunk] = optimize_container(container)
+
+    def get_size(self) -> int:
+        """
+        Returns the size, in bytes, of all the containers in the roaring format.
+        """
+        return sum(
+            get_container_size(container)
+            for lines in (self.rows, self.columns)
+            for chunks in lines.values()
+            for container in chunks.values()
+        )
+
+
+def add_run(
+    lines: Dict[int, Dict[int, Container]], line: int, start: int, end: int
+) -> int:
+    """
+    Adds the locations [start, end] to a row, or a column, chunk by chunk.
+
+    Returns:
+        int: The number of locations newly set in the line.
+    """
+
+    chunks = lines.get(line)
+    if chunks is None:
+        chunks = lines[line] = {}
+
+    new_locations = 0
+    for chunk in range(start >> CHUNK_BITS, (end >> CHUNK_BITS) + 1):
+        base = chunk << CHUNK_BITS
+        new_locations += add_to_chunk(
+            chunks,
+            chunk,
+            max(start, base) - base,
+            min(end, base + CHUNK_MASK) - base,
+        )
+    return new_locations
+
+
+def get_container_runs(container: Container) -> List[Tuple[int, int]]:
+    """
+    Returns the runs of consecutive offsets of a container.
+
+    Example:
+    >>> get_container_runs(ArrayContainer(array("H", [1, 2, 3, 7])))
+    [(1, 3), (7, 7)]
+    """
+
+    if not isinstance(container, RunContainer):
+        container = container.to_runs()
+    return list(zip(container.starts, container.ends))
+
+
+def add_to_chunk(chunks: Dict[int, Container], chunk: int, start: int, end: int) -> int:
+    """
+    Adds the offsets [start, end] to a chunk of a row, converting its container
+    when it stops being the smallest one.
+
+    Args:
+        chunks (Dict[int, Container]): The containers of the row, by chunk.
+        chunk (int): The index of the chunk.
+        start (int): The first offset, within the chunk.
+        end (int): The last offset, within the chunk.
+
+    Returns:
+        int: The number of offsets newly set.
+
+    Explanation:
+    - New chunks start as runs, which is what a move along the row adds.
+    - Checking whether runs or arrays are still the smallest container only needs their cardinality and number of runs, so they are checked on every insertion.
+    - An array is only converted once it outgrows a bitmap.
+    - Counting the runs of a bitmap reads all of it, so it is only done for ranges of more than one offset, which are the ones that usually merge runs. A bitmap goes back to runs when they take half its size, so a chunk does not go back and forth between both.
+    """
+
+    container = chunks.get(chunk)
+    if container is None:
+        container = chunks[chunk] = RunContainer()
+
+    new_values = container.add_range(start, end)
+    if new_values == 0:
+        return 0
+
+    if isinstance(container, RunContainer):
+        run_size = container.count_runs() * RUN_BYTES
+        if (
+            run_size > container.cardinality * ARRAY_BYTES_PER_VALUE
+            or run_size > BITMAP_BYTES
+        ):
+            chunks[chunk] = optimize_container(container)
+    elif isinstance(container, ArrayContainer):
+        if container.cardinality > ARRAY_MAX_VALUES:
+            chunks[chunk] = optimize_container(container)
+    elif end > start and container.count_runs() * RUN_BYTES <= BITMAP_BYTES // 2:
+        chunks[chunk] = container.to_runs()
+
+    return new_values
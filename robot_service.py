@@ -1,7 +1,16 @@
 from typing import Dict, Tuple, Union
 import time
 from datetime import datetime
-from custom_types import Coordinates, Command, CommandsList, ExecutionResult
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Command,
+    Commands,
+    CommandsList,
+    ExecutionResult,
+    ParsedCommands,
+)
+from command_parsing import parse_commands
 import sys
 
 
@@ -56,8 +65,8 @@ def parse_body_instruct_robot_generate_response(
 
 def parse_body(
     body: Dict[str, Union[Coordinates, CommandsList]]
-) -> Tuple[CommandsList, Coordinates]:
-    commands = body["commands"]
+) -> Tuple[ParsedCommands, Coordinates]:
+    commands = parse_commands(body["commands"])
     start = body["start"]
     start_position = [start["x"], start["y"]]
 
@@ -134,6 +143,93 @@ def update_position(
     return current_position
 
 
+def execute_robot_instructions_encoded(
+    start_position: Coordinates, commands: Commands
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations using a set of encoded positions.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions_encoded([0, 0], [{"direction": "east", "steps": 2}])
+    3
+
+
+    Explanation:
+    - Every position is stored as a single int instead of a tuple: (x - min_x) * row_length + (y - min_y), where the minimums and row_length come from the bounding box of the walk.
+    - Moving north or south changes the encoded position by 1 and moving east or west by row_length, so the positions walked by a command are an arithmetic progression.
+    - Each command is then added to the set with a single update over a range, which runs in C without creating a tuple per visited position.
+    """
+    commands = parse_commands(commands)
+    min_x, min_y, max_x, max_y = get_bounding_box(start_position, commands)
+    row_length = max_y - min_y + 1
+    # One stride per direction code: east, west, north and south.
+    strides = (row_length, -row_length, 1, -1)
+
+    current_position = (start_position[0] - min_x) * row_length + (
+        start_position[1] - min_y
+    )
+    visited_vertices = set()
+    visited_vertices.add(current_position)
+    for direction, steps in zip(commands.directions, commands.steps):
+        current_position = move_robot_encoded(
+            visited_vertices, current_position, strides[direction], steps
+        )
+    return len(visited_vertices)
+
+
+def move_robot_encoded(
+    visited_vertices: set, current_position: int, stride: int, steps: int
+) -> int:
+    next_position = current_position + stride * steps
+    visited_vertices.update(range(current_position, next_position + stride, stride))
+    return next_position
+
+
+def get_bounding_box(
+    start_position: Coordinates, commands: Commands
+) -> Tuple[int, int, int, int]:
+    """
+    Walks the commands without recording anything and returns the box that contains the whole walk.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        Tuple[int, int, int, int]: The minimum x, minimum y, maximum x and maximum y.
+
+    Example:
+    >>> get_bounding_box([0, 0], [{"direction": "west", "steps": 2}, {"direction": "north", "steps": 3}])
+    (-2, 0, 0, 3)
+    """
+
+    commands = parse_commands(commands)
+    x, y = start_position
+    min_x = max_x = x
+    min_y = max_y = y
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = CODE_CHANGES[direction]
+        x += change_x * steps
+        y += change_y * steps
+        if x < min_x:
+            min_x = x
+        elif x > max_x:
+            max_x = x
+        if y < min_y:
+            min_y = y
+        elif y > max_y:
+            max_y = y
+
+    return min_x, min_y, max_x, max_y
+
+
 def move_robot_2(
     visited_vertices: set, current_position: Coordinates, command: Command
 ) -> None:
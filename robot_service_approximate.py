@@ -0,0 +1,224 @@
+from typing import Tuple
+import numpy as np
+from custom_types import Coordinates, Commands
+from robot_service_numpy import generate_trajectory_arrays, merge_trajectories
+
+
+"""
+This Python code estimates the number of locations visited by a robot from a sample of the rows it goes through, without going through every visited location.
+The rows are split in strata of consecutive rows and a single row of every stratum is counted exactly, so the estimate comes with a relative error bound computed from the sampled rows themselves.
+"""
+
+# Number of strata the height of the walk is split into. Walks with fewer rows
+# are counted exactly.
+DEFAULT_SAMPLED_ROWS = 4096
+
+# Maximum number of crossings between vertical trajectories and sampled rows,
+# which bounds the memory and the time of the estimate for walks going up and
+# down many times.
+MAX_SAMPLED_CROSSINGS = 2**22
+
+# Standard errors in the stated bound, for a confidence of about 95%.
+CONFIDENCE_STANDARD_ERRORS = 2
+
+# Multiplier mixing the index of a stratum into the choice of its sampled row.
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def estimate_robot_instructions(
+    start_position: Coordinates,
+    commands: Commands,
+    sampled_rows: int = DEFAULT_SAMPLED_ROWS,
+) -> Tuple[int, float]:
+    """
+    Estimates the total number of visited locations of the given commands.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        sampled_rows (int): The number of strata the rows of the walk are split
+            into, one row of each being counted.
+
+    Returns:
+        Tuple[int, float]: The estimated number of visited locations and the bound
+            of its relative error, 0.0 when every row was counted.
+
+    Raises:
+        ValueError: If the coordinates of the walk do not fit safely in int64.
+
+    Example:
+    >>> estimate_robot_instructions([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ... ])
+    (4, 0.0)
+
+
+    Explanation:
+    - The trajectories come from the same int64 arrays as the NumPy engine.
+    - The rows of the bounding box are split in strata of stride consecutive rows from its lowest row, the last stratum keeping whatever rows are left. One row of every stratum, chosen by hashing the index of the stratum, is sampled. The stride grows with the height of the walk and with its vertical steps, so the work stays bounded however large the walk is, but never leaves fewer than two strata.
+    - Horizontal trajectories are kept when they lay on a sampled row, and every vertical trajectory is cut into the locations where it crosses a sampled row, one per stratum it goes through.
+    - The locations of every sampled row are counted exactly merging its intervals, and the estimate is the count of every sampled row times the number of rows of its stratum.
+    - The variance is estimated collapsing neighbouring strata in pairs, the usual estimator for a single unit sampled per stratum, which errs on the conservative side. The bound is CONFIDENCE_STANDARD_ERRORS standard errors relative to the estimate.
+    - With a stride of one every row is counted, so the result is exact and the bound is zero.
+    """
+    if len(commands) == 0:
+        return 0, 0.0
+
+    start_x, start_y, end_x, end_y, is_vertical = generate_trajectory_arrays(
+        start_position, commands
+    )
+    # Rows are counted from the lowest one, so strata start at the bounding box.
+    low_y = np.minimum(start_y, end_y)
+    high_y = np.maximum(start_y, end_y)
+    min_y = np.min(low_y)
+    low_y -= min_y
+    high_y -= min_y
+    height = int(np.max(high_y)) + 1
+    vertical_steps = int(np.sum((high_y - low_y)[is_vertical]))
+    stride = max(
+        1,
+        -(-height // sampled_rows),
+        -(-vertical_steps // MAX_SAMPLED_CROSSINGS),
+    )
+    # The variance needs at least two strata. Vertical trajectories then cross
+    # at most three sampled rows each, which bounds the work as well.
+    stride = min(stride, max(1, height // 2))
+
+    is_horizontal = ~is_vertical
+    rows = low_y[is_horizontal]
+    keep = rows == choose_sampled_rows(rows // stride, stride, height)
+    rows = rows[keep]
+    horizontal_starts = np.minimum(start_x, end_x)[is_horizontal][keep]
+    horizontal_ends = np.maximum(start_x, end_x)[is_horizontal][keep]
+
+    crossing_rows, crossing_columns = cut_vertical_trajectories(
+        start_x[is_vertical], low_y[is_vertical], high_y[is_vertical], stride, height
+    )
+
+    rows, starts, ends = merge_trajectories(
+        np.concatenate((rows, crossing_rows)),
+        np.concatenate((horizontal_starts, crossing_columns)),
+        np.concatenate((horizontal_ends, crossing_columns)),
+    )
+
+    # Merged intervals are sorted by row, and every sampled row is the only one
+    # of its stratum.
+    strata_count = -(-height // stride)
+    row_counts = np.zeros(strata_count, dtype=np.int64)
+    np.add.at(row_counts, rows // stride, ends - starts + 1)
+    weights = get_stratum_heights(np.arange(strata_count), stride, height)
+
+    estimate = int(np.sum(row_counts * weights))
+    if stride == 1:
+        return estimate, 0.0
+    return estimate, estimate_relative_error(row_counts, weights, estimate)
+
+
+def get_stratum_heights(strata: np.ndarray, stride: int, height: int) -> np.ndarray:
+    """
+    Returns the number of rows of every stratum inside a bounding box of the given
+    height.
+
+    Example:
+    >>> get_stratum_heights(np.array([0, 1, 2]), 4, 10)
+    array([4, 4, 2])
+    """
+
+    return np.minimum(stride, height - strata * stride)
+
+
+def choose_sampled_rows(strata: np.ndarray, stride: int, height: int) -> np.ndarray:
+    """
+    Returns the row sampled in every stratum, the same one every time the stratum
+    is looked at, and always inside the bounding box.
+
+    Example:
+    >>> choose_sampled_rows(np.array([0, 1, 2]), 1, 3)
+    array([0, 1, 2])
+    """
+
+    hashed = strata.astype(np.int64).view(np.uint64) * HASH_MULTIPLIER
+    heights = get_stratum_heights(strata, stride, height).astype(np.uint64)
+    offsets = (hashed >> np.uint64(32)) % heights
+    return strata * stride + offsets.astype(np.int64)
+
+
+def cut_vertical_trajectories(
+    columns: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    stride: int,
+    height: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds where every vertical trajectory crosses a sampled row.
+
+    Args:
+        columns (np.ndarray): The column of every vertical trajectory.
+        starts (np.ndarray): The lowest row of every vertical trajectory, counted
+            from the lowest row of the bounding box.
+        ends (np.ndarray): The highest row of every vertical trajectory, counted
+            the same way.
+        stride (int): The number of rows of every stratum.
+        height (int): The number of rows of the bounding box.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The row and the column of every crossing.
+
+    Example:
+    >>> cut_vertical_trajectories(np.array([7, 9]), np.array([0, 4]), np.array([2, 4]), 1, 5)
+    (array([0, 1, 2, 4]), array([7, 7, 7, 9]))
+    """
+
+    first_strata = starts // stride
+    strata_per_trajectory = ends // stride - first_strata + 1
+    trajectory = np.repeat(
+        np.arange(len(columns)), strata_per_trajectory.astype(np.intp)
+    )
+    first_crossing = np.cumsum(strata_per_trajectory) - strata_per_trajectory
+    strata = first_strata[trajectory] + (
+        np.arange(len(trajectory)) - first_crossing[trajectory]
+    )
+    rows = choose_sampled_rows(strata, stride, height)
+
+    # The first and last strata of a trajectory may have their sampled row out
+    # of it.
+    inside = (starts[trajectory] <= rows) & (rows <= ends[trajectory])
+    return rows[inside], columns[trajectory][inside]
+
+
+def estimate_relative_error(
+    row_counts: np.ndarray, weights: np.ndarray, estimate: int
+) -> float:
+    """
+    Bounds the relative error of an estimate collapsing neighbouring strata in
+    pairs, the last one joining the pair before it when the strata are odd.
+
+    Args:
+        row_counts (np.ndarray): The visited locations of the sampled row of every
+            stratum, at least two.
+        weights (np.ndarray): The number of rows of every stratum.
+        estimate (int): The estimated number of visited locations.
+
+    Returns:
+        float: CONFIDENCE_STANDARD_ERRORS standard errors relative to the estimate.
+
+    Example:
+    >>> estimate_relative_error(np.array([10, 12]), np.array([4, 4]), 88)
+    0.18181818181818182
+    """
+
+    strata_count = len(row_counts)
+    groups = np.minimum(np.arange(strata_count) // 2, (strata_count - 2) // 2)
+    group_sizes = np.bincount(groups)
+    group_heights = np.bincount(groups, weights=weights)
+    counts = row_counts.astype(np.float64)
+    means = np.bincount(groups, weights=counts) / group_sizes
+    squares = np.bincount(groups, weights=(counts - means[groups]) ** 2)
+    # Counts are whole numbers, so strata agreeing exactly are still taken to
+    # differ by one location per row, the least the sampled rows can tell apart.
+    sample_variances = np.maximum(squares / (group_sizes - 1), 0.5)
+    variance = float(np.sum(group_heights**2 * sample_variances / group_sizes))
+
+    return CONFIDENCE_STANDARD_ERRORS * variance**0.5 / estimate
@@ -0,0 +1,103 @@
+from custom_types import CODE_CHANGES, Coordinates, Commands, ParsedCommands
+from command_parsing import parse_commands
+from robot_service import get_bounding_box
+
+
+"""
+This Python code directs a robot to explore a grid keeping every row of the bounding box of the walk as the bits of a single Python int.
+A move along a row sets all its bits with one OR, and the visited locations are the bits set once the walk is over.
+"""
+
+# CODE_CHANGES with x and y swapped, to keep columns instead of rows.
+TRANSPOSED_CODE_CHANGES = tuple(
+    (change_y, change_x) for change_x, change_y in CODE_CHANGES
+)
+
+if hasattr(int, "bit_count"):
+
+    def count_bits(value: int) -> int:
+        return value.bit_count()
+
+else:
+    # int.bit_count only exists from Python 3.10 on.
+    def count_bits(value: int) -> int:
+        return bin(value).count("1")
+
+
+def execute_robot_instructions(start_position: Coordinates, commands: Commands) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "west", "steps": 5},
+    ... ])
+    9
+
+
+    Explanation:
+    - Every row of the bounding box is an int whose bit i is the location min_x + i of the row.
+    - A move along a row is a single OR with a mask of steps + 1 bits shifted to its leftmost location, which runs in C however long the move is.
+    - A move across the rows sets one bit in every row it goes through.
+    - When the walk moves more steps vertically than horizontally the grid is transposed, keeping one int per column instead, so the longest moves are the cheap ones.
+    - The result is the number of bits set over all the rows.
+    """
+    commands = parse_commands(commands)
+    min_x, min_y, max_x, max_y = get_bounding_box(start_position, commands)
+    x, y = start_position
+    changes = CODE_CHANGES
+
+    if is_mostly_vertical(commands):
+        changes = TRANSPOSED_CODE_CHANGES
+        min_x, min_y, max_x, max_y = min_y, min_x, max_y, max_x
+        x, y = y, x
+
+    rows = [0] * (max_y - min_y + 1)
+    rows[y - min_y] = 1 << (x - min_x)
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = changes[direction]
+        if change_y == 0:
+            next_x = x + change_x * steps
+            first = (x if x <= next_x else next_x) - min_x
+            rows[y - min_y] |= ((1 << (steps + 1)) - 1) << first
+            x = next_x
+        else:
+            next_y = y + change_y * steps
+            bit = 1 << (x - min_x)
+            first = (y if y <= next_y else next_y) - min_y
+            for row in range(first, first + steps + 1):
+                rows[row] |= bit
+            y = next_y
+
+    return sum(count_bits(row) for row in rows)
+
+
+def is_mostly_vertical(commands: ParsedCommands) -> bool:
+    """
+    Tells whether the commands move more steps vertically than horizontally, in
+    which case keeping the grid by columns makes the longest moves the cheap ones.
+
+    Example:
+    >>> is_mostly_vertical(parse_commands([
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "south", "steps": 3},
+    ... ]))
+    True
+    """
+
+    horizontal_steps = vertical_steps = 0
+    for direction, steps in zip(commands.directions, commands.steps):
+        if CODE_CHANGES[direction][0] == 0:
+            vertical_steps += steps
+        else:
+            horizontal_steps += steps
+    return vertical_steps > horizontal_steps
@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from array import array
+from custom_types import CODE_CHANGES, Coordinates, Commands, LineIntervals
+from command_parsing import parse_commands
+from robot_service import get_bounding_box
+from robot_service_sweep_line import count_visited_vertices, merge_lines
+
+
+"""
+This Python code directs a robot to explore a grid keeping short moves as visited cells and long moves as trajectories.
+Cells are cheap for moves of a few steps and trajectories are cheap for moves of many steps, so every move is stored the cheapest way and both are reconciled at the end.
+"""
+
+# Rough cost, in seconds, of storing and reconciling one step of a short move
+# as a cell, and of storing, merging and sweeping one long move as a trajectory.
+RASTER_COST_PER_STEP = 0.4e-6
+INTERVAL_COST_PER_MOVE = 3e-6
+
+LineStarts = Dict[int, Tuple[List[int], List[int]]]
+
+
+def execute_robot_instructions(
+    start_position: Coordinates,
+    commands: Commands,
+    threshold: Optional[int] = None,
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        threshold (Optional[int]): Moves of up to this many steps are stored as
+            cells, chosen from the steps of the commands when not given.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [
+    ...     {"direction": "east", "steps": 1000},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "west", "steps": 1},
+    ...     {"direction": "south", "steps": 2},
+    ... ])
+    1004
+
+
+    Explanation:
+    - The threshold between short and long moves minimizes the estimated cost of the walk given how its steps are distributed.
+    - Short moves are added to a set of encoded positions, (x - min_x) * row_length + (y - min_y), one range update per move as the encoded set engine does.
+    - Long moves are kept as trajectories per line, merged into disjoint intervals and counted with the sweep line.
+    - Cells covered by a long trajectory were already counted by the sweep line, so only the cells that no merged interval of their row or column covers are added, each checked with a bisect.
+    """
+    commands = parse_commands(commands)
+    if threshold is None:
+        threshold = choose_step_threshold(commands.steps)
+
+    min_x, min_y, max_x, max_y = get_bounding_box(start_position, commands)
+    row_length = max_y - min_y + 1
+    # One stride per direction code: east, west, north and south.
+    strides = (row_length, -row_length, 1, -1)
+
+    x, y = start_position
+    code = (x - min_x) * row_length + (y - min_y)
+    cells = {code}
+    horizontal_lines = {}
+    vertical_lines = {}
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = CODE_CHANGES[direction]
+        next_x = x + change_x * steps
+        next_y = y + change_y * steps
+        next_code = code + strides[direction] * steps
+        if steps <= threshold:
+            cells.update(
+                range(code, next_code + strides[direction], strides[direction])
+            )
+        elif change_x == 0:
+            vertical_lines.setdefault(x, []).append(
+                [y, next_y] if y <= next_y else [next_y, y]
+            )
+        else:
+            horizontal_lines.setdefault(y, []).append(
+                [x, next_x] if x <= next_x else [next_x, x]
+            )
+        x, y, code = next_x, next_y, next_code
+
+    if not horizontal_lines and not vertical_lines:
+        return len(cells)
+
+    horizontal_lines = merge_lines(horizontal_lines)
+    vertical_lines = merge_lines(vertical_lines)
+    return count_visited_vertices(horizontal_lines, vertical_lines) + count_uncovered(
+        cells,
+        row_length,
+        min_x,
+        min_y,
+        index_line_starts(horizontal_lines),
+        index_line_starts(vertical_lines),
+    )
+
+
+def choose_step_threshold(steps: array) -> int:
+    """
+    Chooses the largest number of steps of a move stored as cells, minimizing
+    the estimated cost of storing every short move as cells and every long one as
+    a trajectory.
+
+    Args:
+        steps (array): The steps of every command.
+
+    Returns:
+        int: The threshold, -1 when every move is cheaper as a trajectory.
+
+    Example:
+    >>> choose_step_threshold([1, 2, 1, 3, 100000, 2, 150000])
+    3
+    """
+
+    sorted_steps = sorted(steps)
+    best_threshold = -1
+    best_cost = len(sorted_steps) * INTERVAL_COST_PER_MOVE
+    raster_cost = 0.0
+    for index, step in enumerate(sorted_steps):
+        raster_cost += (step + 1) * RASTER_COST_PER_STEP
+        if index + 1 < len(sorted_steps) and sorted_steps[index + 1] == step:
+            continue
+        cost = raster_cost + (len(sorted_steps) - index - 1) * INTERVAL_COST_PER_MOVE
+        if cost < best_cost:
+            best_cost = cost
+            best_threshold = step
+
+    return best_threshold
+
+
+def index_line_starts(lines: LineIntervals) -> LineStarts:
+    return {
+        value: ([start for start, _ in intervals], [end for _, end in intervals])
+        for value, intervals in lines.items()
+    }
+
+
+def count_uncovered(
+    cells: set,
+    row_length: int,
+    min_x: int,
+    min_y: int,
+    horizontal_lines: LineStarts,
+    vertical_lines: LineStarts,
+) -> int:
+    """
+    Counts the encoded cells not covered by any merged interval.
+
+    Args:
+        cells (set): The encoded positions visited by short moves.
+        row_length (int): The number of values of y in the bounding box.
+        min_x (int): The minimum x of the bounding box.
+        min_y (int): The minimum y of the bounding box.
+        horizontal_lines (LineStarts): The starts and ends of the merged intervals
+            of every row.
+        vertical_lines (LineStarts): The starts and ends of the merged intervals of
+            every column.
+
+    Returns:
+        int: The number of cells outside every interval.
+
+    Example:
+    >>> count_uncovered({0, 1, 2}, 3, 0, 0, {1: ([0], [5])}, {0: ([2], [2])})
+    1
+    """
+
+    uncovered = 0
+    for code in cells:
+        x, y = divmod(code, row_length)
+        x += min_x
+        y += min_y
+        line = horizontal_lines.get(y)
+        if line is not None:
+            index = bisect_right(line[0], x) - 1
+            if index >= 0 and x <= line[1][index]:
+                continue
+        line = vertical_lines.get(x)
+        if line is not None:
+            index = bisect_right(line[0], y) - 1
+            if index >= 0 and y <= line[1][index]:
+                continue
+        uncovered += 1
+
+    return uncovered
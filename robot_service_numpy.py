@@ -0,0 +1,315 @@
+from typing import Dict, Tuple, Union
+import time
+from datetime import datetime
+import numpy as np
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Commands,
+    CommandsList,
+    ExecutionResult,
+)
+from command_parsing import parse_commands
+from robot_service_refactored_for_large_inputs import parse_body
+
+
+"""
+This Python code directs a robot to explore a grid counting the visited locations with NumPy arrays of trajectories instead of Python lists.
+The trajectories are merged per line with a lexsort and the perpendicular crossings are found comparing blocks of horizontal and vertical trajectories at once.
+"""
+
+# Every coordinate, and every value derived from them, must stay below this
+# limit so the int64 arithmetic can never wrap around.
+MAX_ABSOLUTE_VALUE = 2**62
+
+# Maximum number of horizontal/vertical pairs compared at once, it bounds the
+# size of the temporary boolean matrices to a few megabytes.
+DEFAULT_BLOCK_SIZE = 2**21
+
+CODE_ARRAY_CHANGES = np.array(CODE_CHANGES, dtype=np.int64)
+
+
+def parse_body_instruct_robot_generate_response(
+    body: Dict[str, Union[Coordinates, CommandsList]]
+) -> ExecutionResult:
+    """
+    Parses the input body, instructs a robot with commands, and generates a response.
+
+    Args:
+        body (Dict[str, Union[Coordinates, CommandsList]]): The input body containing
+            the starting position and a list of commands for the robot.
+
+    Returns:
+        ExecutionResult: A dictionary containing the timestamp, duration of execution,
+            result (total number of visited locations), and the number of commands.
+
+    Example:
+    >>> parse_body_instruct_robot_generate_response({
+    ...     "start": {"x": 0, "y": 0},
+    ...     "commands": [
+    ...         {"direction": "east", "steps": 2},
+    ...         {"direction": "north", "steps": 1},
+    ...     ],
+    ... })
+    {'timestamp': '2024-01-05T00:00:00', 'duration': 0.0, 'result': 4, 'commands': 2}
+    """
+
+    commands, start_position = parse_body(body)
+    result, elapsed_time = instruct_robot_and_time_it(start_position, commands)
+
+    response = {
+        "timestamp": datetime.now().isoformat(),
+        "duration": elapsed_time,
+        "result": result,
+        "commands": len(commands),
+    }
+    return response
+
+
+def instruct_robot_and_time_it(
+    start_position: Coordinates, commands: CommandsList
+) -> Tuple[int, float]:
+    start_time = time.perf_counter()
+    result = execute_robot_instructions(start_position, commands)
+    end_time = time.perf_counter()
+    elapsed_time = end_time - start_time
+
+    return result, elapsed_time
+
+
+def execute_robot_instructions(
+    start_position: Coordinates,
+    commands: Commands,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        block_size (int): Maximum number of trajectory pairs compared at once.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Raises:
+        ValueError: If the coordinates of the walk do not fit safely in int64.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [{"direction": "east", "steps": 2}])
+    3
+
+
+    Explanation:
+    - The parsed commands are read as int64 arrays without copying them element by element: the start and end of every trajectory come from a cumulative sum of the moves.
+    - Trajectories are split by orientation and described by the value of the fixed axis and the first and last values of the moving axis.
+    - The trajectories of every line are merged with a lexsort and a running maximum, which leaves sorted and disjoint intervals per line.
+    - As merged intervals are disjoint, every vertex covered by both a horizontal and a vertical interval is a single crossing, so no crossing can be counted twice.
+    - Crossings are counted comparing blocks of vertical intervals against the horizontal intervals whose rows fall in the block's range, keeping the boolean matrices below block_size elements.
+    - The final result is the length of every merged interval minus the crossings.
+    """
+    if len(commands) == 0:
+        return 0
+
+    start_x, start_y, end_x, end_y, is_vertical = generate_trajectory_arrays(
+        start_position, commands
+    )
+
+    columns, vertical_starts, vertical_ends = merge_trajectories(
+        start_x[is_vertical],
+        np.minimum(start_y, end_y)[is_vertical],
+        np.maximum(start_y, end_y)[is_vertical],
+    )
+    is_horizontal = ~is_vertical
+    rows, horizontal_starts, horizontal_ends = merge_trajectories(
+        start_y[is_horizontal],
+        np.minimum(start_x, end_x)[is_horizontal],
+        np.maximum(start_x, end_x)[is_horizontal],
+    )
+
+    total_visited_spots = int(np.sum(vertical_ends - vertical_starts + 1)) + int(
+        np.sum(horizontal_ends - horizontal_starts + 1)
+    )
+    crossings = count_crossings(
+        rows,
+        horizontal_starts,
+        horizontal_ends,
+        columns,
+        vertical_starts,
+        vertical_ends,
+        block_size,
+    )
+
+    return total_visited_spots - crossings
+
+
+def generate_trajectory_arrays(
+    start_position: Coordinates, commands: Commands
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    commands = parse_commands(commands)
+    check_int64_range(start_position, commands.steps)
+
+    codes = np.frombuffer(commands.directions, dtype=np.int8)
+    steps = np.frombuffer(commands.steps, dtype=np.int64)
+    changes = CODE_ARRAY_CHANGES[codes]
+    moves = changes * steps[:, None]
+    positions = np.cumsum(moves, axis=0) + np.array(start_position, dtype=np.int64)
+
+    end_x = positions[:, 0]
+    end_y = positions[:, 1]
+    start_x = np.concatenate(([start_position[0]], end_x[:-1]))
+    start_y = np.concatenate(([start_position[1]], end_y[:-1]))
+    is_vertical = changes[:, 0] == 0
+
+    return start_x, start_y, end_x, end_y, is_vertical
+
+
+def check_int64_range(start_position: Coordinates, steps) -> None:
+    """
+    Makes sure every coordinate the walk can reach fits safely in int64.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        steps (list): The steps of every command.
+
+    Raises:
+        ValueError: If a coordinate could go beyond MAX_ABSOLUTE_VALUE.
+
+    Example:
+    >>> check_int64_range([0, 0], [2**62])
+    Traceback (most recent call last):
+    ...
+    ValueError: The walk reaches coordinates too large to be computed with int64
+    """
+
+    # The farthest the robot can go is walking every step in the same direction.
+    farthest = max(abs(start_position[0]), abs(start_position[1])) + sum(steps)
+    if farthest >= MAX_ABSOLUTE_VALUE:
+        raise ValueError(
+            "The walk reaches coordinates too large to be computed with int64"
+        )
+
+
+def merge_trajectories(
+    fixed_values: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merges the trajectories of every line into sorted, disjoint intervals.
+
+    Args:
+        fixed_values (np.ndarray): The value of the fixed axis of every trajectory.
+        starts (np.ndarray): The first value of the moving axis of every trajectory.
+        ends (np.ndarray): The last value of the moving axis of every trajectory.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The fixed value, start and end of
+            the merged intervals, sorted by line and start.
+
+    Example:
+    >>> merge_trajectories(np.array([5, 5, 1]), np.array([4, 0, 0]), np.array([6, 4, 1]))
+    (array([1, 5]), array([0, 0]), array([1, 6]))
+    """
+
+    if len(fixed_values) == 0:
+        return fixed_values, starts, ends
+
+    order = np.lexsort((starts, fixed_values))
+    fixed_values = fixed_values[order]
+    starts = starts[order]
+    ends = ends[order]
+
+    # Every line is moved to its own window of the number line, so a running
+    # maximum over the whole array never leaks from one line into the next.
+    lowest = int(np.min(starts))
+    window = int(np.max(ends)) - lowest + 2
+    new_line = np.empty(len(fixed_values), dtype=bool)
+    new_line[0] = True
+    new_line[1:] = fixed_values[1:] != fixed_values[:-1]
+    line_numbers = np.cumsum(new_line) - 1
+    if (int(line_numbers[-1]) + 1) * window >= MAX_ABSOLUTE_VALUE:
+        raise ValueError(
+            "The walk reaches coordinates too large to be computed with int64"
+        )
+
+    offsets = line_numbers * window - lowest
+    shifted_starts = starts + offsets
+    shifted_ends = np.maximum.accumulate(ends + offsets)
+
+    new_interval = np.empty(len(fixed_values), dtype=bool)
+    new_interval[0] = True
+    new_interval[1:] = shifted_starts[1:] > shifted_ends[:-1] + 1
+    interval_starts = np.flatnonzero(new_interval)
+    interval_ends = np.append(interval_starts[1:], len(fixed_values)) - 1
+
+    return (
+        fixed_values[interval_starts],
+        starts[interval_starts],
+        shifted_ends[interval_ends] - offsets[interval_starts],
+    )
+
+
+def count_crossings(
+    rows: np.ndarray,
+    horizontal_starts: np.ndarray,
+    horizontal_ends: np.ndarray,
+    columns: np.ndarray,
+    vertical_starts: np.ndarray,
+    vertical_ends: np.ndarray,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> int:
+    """
+    Counts the vertices covered by both a horizontal and a vertical interval.
+
+    Args:
+        rows (np.ndarray): The sorted rows of the merged horizontal intervals.
+        horizontal_starts (np.ndarray): The first column of every horizontal interval.
+        horizontal_ends (np.ndarray): The last column of every horizontal interval.
+        columns (np.ndarray): The columns of the merged vertical intervals.
+        vertical_starts (np.ndarray): The first row of every vertical interval.
+        vertical_ends (np.ndarray): The last row of every vertical interval.
+        block_size (int): Maximum number of interval pairs compared at once.
+
+    Returns:
+        int: The number of crossings.
+
+    Example:
+    >>> count_crossings(
+    ...     np.array([0, 2]), np.array([0, 0]), np.array([4, 4]),
+    ...     np.array([1, 9]), np.array([0, 0]), np.array([2, 2]),
+    ... )
+    2
+    """
+
+    if len(rows) == 0 or len(columns) == 0:
+        return 0
+
+    # Vertical intervals are grouped by their lowest row, so the rows each block
+    # has to look at stay close together.
+    order = np.argsort(vertical_starts, kind="stable")
+    columns = columns[order]
+    vertical_starts = vertical_starts[order]
+    vertical_ends = vertical_ends[order]
+
+    vertical_block = max(1, int(block_size**0.5))
+    crossings = 0
+    for block_start in range(0, len(columns), vertical_block):
+        block = slice(block_start, block_start + vertical_block)
+        block_columns = columns[block][:, None]
+        block_starts = vertical_starts[block][:, None]
+        block_ends = vertical_ends[block][:, None]
+
+        first_row = np.searchsorted(rows, block_starts.min(), side="left")
+        last_row = np.searchsorted(rows, block_ends.max(), side="right")
+        horizontal_block = max(1, block_size // len(block_columns))
+        for row_start in range(first_row, last_row, horizontal_block):
+            candidates = slice(row_start, min(row_start + horizontal_block, last_row))
+            crossing = (
+                (horizontal_starts[candidates] <= block_columns)
+                & (block_columns <= horizontal_ends[candidates])
+                & (block_starts <= rows[candidates])
+                & (rows[candidates] <= block_ends)
+            )
+            crossings += int(np.count_nonzero(crossing))
+
+    return crossings
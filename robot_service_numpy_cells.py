@@ -0,0 +1,283 @@
+from typing import Dict, List, Tuple, Union
+import os
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+from custom_types import Coordinates, Commands, CommandsList, ExecutionResult
+from command_parsing import parse_commands
+from robot_service import parse_body
+from robot_service_numpy import CODE_ARRAY_CHANGES
+
+
+"""
+This Python code directs a robot to explore a grid, generating every visited position at once with NumPy and counting the unique ones.
+Walks longer than the memory budget are deduplicated in sorted chunks spilled to temporary files and merged back.
+"""
+
+# Encoded positions must stay below this limit so the int64 arithmetic can
+# never wrap around.
+MAX_ENCODED_POSITION = 2**63 - 1
+
+# Maximum number of positions held in memory at once, 8 bytes each.
+DEFAULT_MEMORY_BUDGET = 2**23
+
+
+def parse_body_instruct_robot_generate_response(
+    body: Dict[str, Union[Coordinates, CommandsList]]
+) -> ExecutionResult:
+    """
+    Parses the input body, instructs a robot with commands, and generates a response.
+
+    Args:
+        body (Dict[str, Union[Coordinates, CommandsList]]): The input body containing
+            the starting position and a list of commands for the robot.
+
+    Returns:
+        ExecutionResult: A dictionary containing the timestamp, duration of execution,
+            result (total number of visited locations), and the number of commands.
+
+    Example:
+    >>> parse_body_instruct_robot_generate_response({
+    ...     "start": {"x": 0, "y": 0},
+    ...     "commands": [
+    ...         {"direction": "east", "steps": 2},
+    ...         {"direction": "north", "steps": 1},
+    ...     ],
+    ... })
+    {'timestamp': '2024-01-05T00:00:00', 'duration': 0.0, 'result': 4, 'commands': 2}
+    """
+
+    commands, start_position = parse_body(body)
+    result, elapsed_time = instruct_robot_and_time_it(start_position, commands)
+
+    response = {
+        "timestamp": datetime.now().isoformat(),
+        "duration": elapsed_time,
+        "result": result,
+        "commands": len(commands),
+    }
+    return response
+
+
+def instruct_robot_and_time_it(
+    start_position: Coordinates, commands: CommandsList
+) -> Tuple[int, float]:
+    start_time = time.perf_counter()
+    result = execute_robot_instructions(start_position, commands)
+    end_time = time.perf_counter()
+    elapsed_time = end_time - start_time
+
+    return result, elapsed_time
+
+
+def execute_robot_instructions(
+    start_position: Coordinates,
+    commands: Commands,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        memory_budget (int): Maximum number of positions held in memory at once.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Raises:
+        ValueError: If the bounding box of the walk is too large to encode its
+            positions in int64.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [{"direction": "east", "steps": 2}])
+    3
+
+
+    Explanation:
+    - Every position is encoded as a single int64, (x - min_x) * row_length + (y - min_y), using the bounding box of the walk.
+    - One step of a command changes the encoded position by a constant stride (1 north, row_length east), so np.repeat expands the strides of the commands into one stride per step and a cumulative sum turns them into every visited position.
+    - When the whole walk fits in the memory budget the positions are sorted and counted at once.
+    - Otherwise the steps are generated in chunks of the budget's size, every chunk is sorted, deduplicated and spilled to a temporary file, and the sorted files are merged back block by block counting every position only once.
+    """
+    strides, steps, start_code = encode_walk(start_position, commands)
+    total_steps = int(steps.sum())
+
+    if total_steps + 1 <= memory_budget:
+        codes = generate_encoded_positions(strides, steps, start_code, 0, total_steps)
+        return len(sorted_unique(codes))
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = spill_sorted_runs(
+            strides, steps, start_code, total_steps, memory_budget, directory
+        )
+        return count_unique_in_sorted_runs(runs, memory_budget)
+
+
+def encode_walk(
+    start_position: Coordinates, commands: Commands
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    commands = parse_commands(commands)
+    directions = CODE_ARRAY_CHANGES[np.frombuffer(commands.directions, dtype=np.int8)]
+    steps = np.array(commands.steps, dtype=np.int64)
+
+    moves = directions * steps[:, None]
+    positions = np.cumsum(moves, axis=0) + np.array(start_position, dtype=np.int64)
+    min_x = int(positions[:, 0].min(initial=start_position[0]))
+    max_x = int(positions[:, 0].max(initial=start_position[0]))
+    min_y = int(positions[:, 1].min(initial=start_position[1]))
+    max_y = int(positions[:, 1].max(initial=start_position[1]))
+
+    row_length = max_y - min_y + 1
+    if (max_x - min_x + 1) * row_length > MAX_ENCODED_POSITION:
+        raise ValueError("The walk covers an area too large to be encoded in int64")
+
+    strides = directions[:, 0] * row_length + directions[:, 1]
+    start_code = (start_position[0] - min_x) * row_length + (start_position[1] - min_y)
+
+    return strides, steps, start_code
+
+
+def generate_encoded_positions(
+    strides: np.ndarray, steps: np.ndarray, start_code: int, first: int, last: int
+) -> np.ndarray:
+    """
+    Generates the encoded positions reached after steps first to last, both included,
+    step 0 being the starting position.
+
+    Args:
+        strides (np.ndarray): The change of the encoded position of one step of every command.
+        steps (np.ndarray): The steps of every command.
+        start_code (int): The encoded starting position.
+        first (int): The first step to generate.
+        last (int): The last step to generate.
+
+    Returns:
+        np.ndarray: The encoded positions, in walking order.
+
+    Example:
+    >>> generate_encoded_positions(np.array([10, 1]), np.array([2, 3]), 0, 0, 5)
+    array([ 0, 10, 20, 21, 22, 23])
+    >>> generate_encoded_positions(np.array([10, 1]), np.array([2, 3]), 0, 2, 4)
+    array([20, 21, 22])
+    """
+
+    if first == 0 and last == int(steps.sum()):
+        step_strides = np.repeat(strides, steps)
+        codes = np.empty(len(step_strides) + 1, dtype=np.int64)
+        codes[0] = start_code
+        np.cumsum(step_strides, out=codes[1:])
+        codes[1:] += start_code
+        return codes
+
+    # Step i (i >= 1) belongs to the command whose cumulative steps reach it first.
+    cumulative_steps = np.cumsum(steps)
+    commands_before = np.searchsorted(cumulative_steps, first, side="left")
+    position_at_first = start_code + int(
+        np.dot(strides[:commands_before], steps[:commands_before])
+    )
+    if commands_before < len(steps) and first > 0:
+        already_walked = first - (
+            int(cumulative_steps[commands_before - 1]) if commands_before > 0 else 0
+        )
+        position_at_first += int(strides[commands_before]) * already_walked
+
+    step_numbers = np.arange(first + 1, last + 1, dtype=np.int64)
+    step_strides = strides[np.searchsorted(cumulative_steps, step_numbers, side="left")]
+    codes = np.empty(len(step_strides) + 1, dtype=np.int64)
+    codes[0] = position_at_first
+    np.cumsum(step_strides, out=codes[1:])
+    codes[1:] += position_at_first
+    return codes
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    # Sorting in place and dropping repeated neighbours is noticeably faster
+    # than np.unique, which hashes int64 values on recent NumPy versions.
+    if len(values) == 0:
+        return values
+    values.sort()
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def spill_sorted_runs(
+    strides: np.ndarray,
+    steps: np.ndarray,
+    start_code: int,
+    total_steps: int,
+    memory_budget: int,
+    directory: str,
+) -> List[Tuple[str, int]]:
+    runs = []
+    for first in range(0, total_steps + 1, memory_budget):
+        last = min(first + memory_budget - 1, total_steps)
+        run = sorted_unique(
+            generate_encoded_positions(strides, steps, start_code, first, last)
+        )
+        path = os.path.join(directory, f"run_{len(runs)}.bin")
+        run.tofile(path)
+        runs.append((path, len(run)))
+        del run
+
+    return runs
+
+
+def count_unique_in_sorted_runs(runs: List[Tuple[str, int]], memory_budget: int) -> int:
+    """
+    Counts the unique values of several sorted, deduplicated int64 files reading
+    them block by block.
+
+    Args:
+        runs (List[Tuple[str, int]]): The path and number of values of every file.
+        memory_budget (int): Maximum number of values held in memory at once.
+
+    Returns:
+        int: The number of unique values across every file.
+
+
+    Explanation:
+    - Each round reads the next block of every file and takes the smallest last value among the blocks that did not reach the end of their file as threshold.
+    - Every value lower or equal to the threshold of every file is in the blocks read, so those values are counted and dropped, and whatever is left is greater than anything counted before.
+    - The block holding the threshold is always consumed completely, so every round makes progress.
+    """
+
+    arrays = [
+        np.memmap(path, dtype=np.int64, mode="r", shape=(length,))
+        for path, length in runs
+        if length > 0
+    ]
+    block_size = max(1, memory_budget // (2 * max(1, len(arrays))))
+    cursors = [0] * len(arrays)
+    unique_values = 0
+
+    while True:
+        blocks = []
+        threshold = None
+        for array, cursor in zip(arrays, cursors):
+            block = np.asarray(array[cursor : cursor + block_size])
+            blocks.append(block)
+            if cursor + len(block) < len(array):
+                if threshold is None or block[-1] < threshold:
+                    threshold = block[-1]
+
+        taken = []
+        for index, block in enumerate(blocks):
+            if threshold is None:
+                length = len(block)
+            else:
+                length = int(np.searchsorted(block, threshold, side="right"))
+            taken.append(block[:length])
+            cursors[index] += length
+
+        values = np.concatenate(taken) if taken else np.empty(0, dtype=np.int64)
+        unique_values += len(sorted_unique(values))
+        if threshold is None:
+            break
+
+    del arrays
+    return unique_values
@@ -0,0 +1,272 @@
+from typing import Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from custom_types import Coordinates, CommandsList, LineIntervals
+from robot_service_sweep_line import count_visited_vertices, generate_lines, merge_lines
+from robot_service_numpy import generate_trajectory_arrays
+from shared_segments import (
+    SharedTableDescriptor,
+    attach_shared_table,
+    create_shared_table,
+    release_shared_table,
+)
+
+
+"""
+This Python code splits the grid in stripes and counts the visited locations of every stripe in its own process.
+Each stripe is a range of rows (or columns), so every location belongs to exactly one stripe and the counts of the stripes just add up.
+The trajectories are shared with the workers as a table of int64 columns in shared memory, and every worker writes its count in a shared output array, so nothing but a small descriptor is pickled.
+"""
+
+DEFAULT_WORKERS = int(os.getenv("PARALLEL_WORKERS", str(os.cpu_count() or 1)))
+
+# Every worker gets a few stripes so a slow one does not hold the whole walk.
+STRIPES_PER_WORKER = 4
+
+Stripe = Tuple[LineIntervals, LineIntervals]
+StripeTask = Tuple[
+    SharedTableDescriptor, SharedTableDescriptor, int, Optional[int], Optional[int]
+]
+
+executor: Optional[ProcessPoolExecutor] = None
+executor_workers = 0
+executor_lock = threading.Lock()
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    global executor, executor_workers
+    with executor_lock:
+        if executor is None or executor_workers != workers:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor_workers = workers
+            # Flask serves requests from threads, and forking a threaded process
+            # can leave locks held in the children.
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return executor
+
+
+def execute_robot_instructions(
+    start_position: Coordinates,
+    commands: CommandsList,
+    workers: int = DEFAULT_WORKERS,
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (CommandsList): A list of commands for the robot.
+        workers (int): The number of processes counting stripes at the same time.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [{"direction": "east", "steps": 2}], workers=1)
+    3
+
+
+    Explanation:
+    - The walk is turned into int64 arrays of trajectories, as the NumPy engine does.
+    - The grid is split in stripes of consecutive rows, or of consecutive columns when that spreads the trajectories more evenly, with boundaries taken from the quantiles of the trajectories.
+    - The trajectories are copied once to a shared memory table, and every worker receives only its descriptor and the rows of its stripe.
+    - Every worker selects the trajectories parallel to its stripe and clips the perpendicular ones to it; as the stripes do not share rows, no location is counted twice.
+    - Every stripe is merged and counted with the sweep line, the count is written in the shared output array and the counts are added up.
+    - Walks too large for int64 are counted by the sweep line in this process.
+    """
+    if workers <= 1:
+        return count_stripe(generate_lines(start_position, commands))
+    try:
+        start_x, start_y, end_x, end_y, is_vertical = generate_trajectory_arrays(
+            start_position, commands
+        )
+    except ValueError:
+        return count_stripe(generate_lines(start_position, commands))
+
+    columns = {
+        "line": np.where(is_vertical, start_x, start_y),
+        "start": np.where(
+            is_vertical, np.minimum(start_y, end_y), np.minimum(start_x, end_x)
+        ),
+        "end": np.where(
+            is_vertical, np.maximum(start_y, end_y), np.maximum(start_x, end_x)
+        ),
+        # 1 for trajectories parallel to the stripes, horizontal ones for stripes
+        # of rows.
+        "parallel": (~is_vertical).astype(np.int64),
+    }
+
+    stripes = workers * STRIPES_PER_WORKER
+    row_boundaries = choose_stripe_boundaries(columns, stripes)
+    transposed = dict(columns, parallel=1 - columns["parallel"])
+    column_boundaries = choose_stripe_boundaries(transposed, stripes)
+    boundaries = row_boundaries
+    if measure_imbalance(transposed, column_boundaries) < measure_imbalance(
+        columns, row_boundaries
+    ):
+        # Columns are split exactly like rows once the roles of both orientations
+        # are swapped, which transposes the grid without changing the count.
+        columns = transposed
+        boundaries = column_boundaries
+
+    table_block, table = create_shared_table(columns, len(commands))
+    stripe_count = len(boundaries) + 1
+    output_block, output = create_shared_table({"count": None}, stripe_count)
+    try:
+        tasks = [
+            (
+                table,
+                output,
+                stripe,
+                boundaries[stripe - 1] if stripe > 0 else None,
+                boundaries[stripe] - 1 if stripe < len(boundaries) else None,
+            )
+            for stripe in range(stripe_count)
+        ]
+        # The workers return nothing, the map only waits for all of them.
+        list(get_executor(workers).map(count_shared_stripe, tasks))
+
+        attached, counts = attach_shared_table(output)
+        total = int(counts["count"].sum())
+        del counts
+        attached.close()
+    finally:
+        release_shared_table(table_block)
+        release_shared_table(output_block)
+
+    return total
+
+
+def count_stripe(stripe: Stripe) -> int:
+    horizontal_lines, vertical_lines = stripe
+    return count_visited_vertices(
+        merge_lines(horizontal_lines), merge_lines(vertical_lines)
+    )
+
+
+def count_shared_stripe(task: StripeTask) -> None:
+    table_descriptor, output_descriptor, stripe, first_row, last_row = task
+    table_block, table = attach_shared_table(table_descriptor)
+    count = count_stripe(select_stripe(table, first_row, last_row))
+    del table
+    table_block.close()
+
+    output_block, output = attach_shared_table(output_descriptor)
+    output["count"][stripe] = count
+    del output
+    output_block.close()
+
+
+def select_stripe(
+    table: Dict[str, np.ndarray], first_row: Optional[int], last_row: Optional[int]
+) -> Stripe:
+    """
+    Selects the trajectories of a stripe of rows, clipping the perpendicular ones.
+
+    Args:
+        table (Dict[str, np.ndarray]): The line, start, end and parallel columns of
+            the trajectories.
+        first_row (Optional[int]): The first row of the stripe, None if unbounded.
+        last_row (Optional[int]): The last row of the stripe, None if unbounded.
+
+    Returns:
+        Stripe: The horizontal and vertical trajectories of the stripe.
+
+    Example:
+    >>> select_stripe({
+    ...     "line": np.array([0, 5, 2]),
+    ...     "start": np.array([0, 0, 0]),
+    ...     "end": np.array([4, 4, 5]),
+    ...     "parallel": np.array([1, 1, 0]),
+    ... }, 3, None)
+    ({5: [[0, 4]]}, {2: [[3, 5]]})
+    """
+
+    lower = np.iinfo(np.int64).min if first_row is None else first_row
+    upper = np.iinfo(np.int64).max if last_row is None else last_row
+    parallel = table["parallel"] == 1
+    line, start, end = table["line"], table["start"], table["end"]
+
+    selected = parallel & (line >= lower) & (line <= upper)
+    horizontal_lines = {}
+    for row, piece_start, piece_end in zip(
+        line[selected].tolist(), start[selected].tolist(), end[selected].tolist()
+    ):
+        horizontal_lines.setdefault(row, []).append([piece_start, piece_end])
+
+    selected = ~parallel & (start <= upper) & (end >= lower)
+    vertical_lines = {}
+    for column, piece_start, piece_end in zip(
+        line[selected].tolist(),
+        np.maximum(start[selected], lower).tolist(),
+        np.minimum(end[selected], upper).tolist(),
+    ):
+        vertical_lines.setdefault(column, []).append([piece_start, piece_end])
+
+    return horizontal_lines, vertical_lines
+
+
+def choose_stripe_boundaries(table: Dict[str, np.ndarray], stripes: int) -> List[int]:
+    """
+    Chooses the first row of every stripe but the first one, so every stripe
+    receives about the same number of trajectories.
+
+    Args:
+        table (Dict[str, np.ndarray]): The line, start, end and parallel columns of
+            the trajectories.
+        stripes (int): The number of stripes wanted.
+
+    Returns:
+        List[int]: The sorted, distinct boundaries, at most stripes - 1 of them.
+
+    Example:
+    >>> choose_stripe_boundaries({
+    ...     "line": np.arange(4),
+    ...     "start": np.zeros(4, dtype=np.int64),
+    ...     "end": np.ones(4, dtype=np.int64),
+    ...     "parallel": np.ones(4, dtype=np.int64),
+    ... }, 2)
+    [2]
+    """
+
+    parallel = table["parallel"] == 1
+    rows = np.sort(
+        np.where(parallel, table["line"], (table["start"] + table["end"]) // 2)
+    ).tolist()
+
+    boundaries = []
+    for stripe in range(1, stripes):
+        boundary = rows[len(rows) * stripe // stripes] if rows else 0
+        if not boundaries or boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    if boundaries and rows and boundaries[0] <= rows[0]:
+        boundaries.pop(0)
+
+    return boundaries
+
+
+def measure_imbalance(table: Dict[str, np.ndarray], boundaries: List[int]) -> float:
+    parallel = table["parallel"] == 1
+    edges = np.array(boundaries, dtype=np.int64)
+    loads = np.bincount(
+        np.searchsorted(edges, table["line"][parallel], side="right"),
+        minlength=len(boundaries) + 2,
+    )
+    # Perpendicular trajectories load every stripe from the one of their start
+    # to the one of their end, added with a difference array.
+    first = np.searchsorted(edges, table["start"][~parallel], side="right")
+    last = np.searchsorted(edges, table["end"][~parallel], side="right")
+    loads += np.cumsum(
+        np.bincount(first, minlength=len(boundaries) + 2)
+        - np.bincount(last + 1, minlength=len(boundaries) + 2)
+    )
+    loads = loads[: len(boundaries) + 1]
+
+    total = int(loads.sum())
+    return int(loads.max()) * len(loads) / total if total else 0.0
@@ -1,10 +1,27 @@
 from typing import Dict, Tuple, Union
 import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from custom_types import Coordinates, Command, CommandsList, ExecutionResult, Trajectory
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Commands,
+    CommandsList,
+    ExecutionResult,
+    LineIndex,
+    ParsedCommands,
+    Segment,
+)
+from command_parsing import parse_commands
+from segment_store import HORIZONTAL, VERTICAL, SegmentStore
+import os
 import sys
 
 
+# The bucket grid pays off on every walk but the shortest ones, it can be turned
+# off to compare both ways of finding the perpendicular intersections.
+SPATIAL_INDEX = os.getenv("ONLINE_SPATIAL_INDEX", "1") == "1"
+
 DIRECTION_CHANGES: Dict[str, Coordinates] = {
     "east": [1, 0],
     "west": [-1, 0],
@@ -56,8 +73,8 @@ def parse_body_instruct_robot_generate_response(
 
 def parse_body(
     body: Dict[str, Union[Coordinates, CommandsList]]
-) -> Tuple[CommandsList, Coordinates]:
-    commands = body["commands"]
+) -> Tuple[ParsedCommands, Coordinates]:
+    commands = parse_commands(body["commands"])
     start = body["start"]
     start_position = [start["x"], start["y"]]
 
@@ -76,14 +93,18 @@ def instruct_robot_and_time_it(
 
 
 def execute_robot_instructions(
-    start_position: Coordinates, commands: CommandsList
+    start_position: Coordinates,
+    commands: Commands,
+    spatial_index: bool = SPATIAL_INDEX,
 ) -> int:
     """
     Executes the given commands and returns the total number of visited locations.
 
     Args:
         start_position (Coordinates): The starting position of the robot.
-        commands (CommandsList): A list of commands for the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        spatial_index (bool): Whether the trajectories are indexed in a bucket grid
+            to find the perpendicular intersections.
 
     Returns:
         int: The total number of visited locations.
@@ -97,58 +118,72 @@ def execute_robot_instructions(
     - As storing all visited vertices proves memory intensive and time consuming the aim of this program is to add all the robot's steps and substract all the previously visited vertices.
     - The challenging part is doing so without storing visited vertices, for that two types of intersections have been defined: perpendicular and colinear.
     - The next part consists in calculating all the resulting points of executing a command without the intermediate vertices.
+    - The commands are parsed first, so every command is a direction code and a number of steps.
     - The function iterates through each command in the list, updating the robot's position and storing the trajectory.
-    - Given that the robot moves only verticaly or horizontaly a trajectory is defined with 3 values:
-        -vector around the axis
+    - Given that the robot moves only verticaly or horizontaly a trajectory is defined with 4 values:
+        -first and last value of the axis the robot moves along
         -value of the axis than remains the same
-        -the type of trajectory, "horizontal" or "vertical"
-    -an example of trajectory from (0,5) to (1000,5) would be [[0,1000],5,"horizontal"]
-    -an example of trajectory from (10,5) to (10,50) would be [[5,50],10,"vertical"]
+        -the type of trajectory, HORIZONTAL or VERTICAL
+    -an example of trajectory from (0,5) to (1000,5) would be (0, 1000, 5, HORIZONTAL)
+    -an example of trajectory from (10,5) to (10,50) would be (5, 50, 10, VERTICAL)
     - To sum up for each command, a trajectory is going to be generated, the current position is going to be updated and a new set is going to be created with all
     the intersections happening with the previous trajectories.
-    - The trajectories are stored in two different arrays, vertical_trajectories and horizontal_trajectories.
+    - The trajectories are stored in two different segment stores, vertical_trajectories and horizontal_trajectories, which keep them as columns of machine integers.
     - The main idea being trying to find perpendicular intersections with the oposite type of trajectories and colinear intersections with the same type of trajectories.
+    - With the spatial index, every store also keeps its trajectories in a bucket grid whose cells grow with the mean length of the trajectories, so a new trajectory is only compared with the ones sharing its cells instead of with every previous one.
+    - Colinear intersections are not materialized: every line (row or column) keeps the union of its trajectories as sorted, disjoint intervals, so adding a trajectory returns how many of its vertices were already covered with arithmetic only.
+    - Perpendicular intersections are only counted when the line of the new trajectory did not cover them already.
     - The number of intersections is going to be stored for each command.
     - The final result is the difference between the total walked spots and the total number of intersections.
 
     """
-    vertical_trajectories = []
-    horizontal_trajectories = []
+    vertical_trajectories = SegmentStore(VERTICAL, spatial_index)
+    horizontal_trajectories = SegmentStore(HORIZONTAL, spatial_index)
+    vertical_lines = {}
+    horizontal_lines = {}
     total_already_visited = 0
     total_visited_spots = 0
     current_position = start_position
-    for command in commands:
+    commands = parse_commands(commands)
+    for direction, steps in zip(commands.directions, commands.steps):
         number_of_intersections = move_robot(
             vertical_trajectories,
             horizontal_trajectories,
+            vertical_lines,
+            horizontal_lines,
             current_position,
-            command,
+            direction,
+            steps,
         )
         # the extra +1 counting steps aims to take in considaration the vertex where the robot is situated before executing a command, it balances out as it counts as an intersection exept for the first command.
-        total_visited_spots += command["steps"] + 1
+        total_visited_spots += steps + 1
         total_already_visited += number_of_intersections
 
     return total_visited_spots - total_already_visited
 
 
 def move_robot(
-    vertical_trajectories,
-    horizontal_trajectories,
+    vertical_trajectories: SegmentStore,
+    horizontal_trajectories: SegmentStore,
+    vertical_lines: LineIndex,
+    horizontal_lines: LineIndex,
     current_position: Coordinates,
-    command: Command,
+    direction: int,
+    steps: int,
 ) -> int:
     intersections = set()
-    next_position = get_next_position(current_position, command)
+    next_position = get_next_position(current_position, direction, steps)
 
-    if command["direction"] == "north" or command["direction"] == "south":
+    if CODE_CHANGES[direction][0] == 0:
         trajectory = create_vertical_trajectory(current_position, next_position)
         if len(horizontal_trajectories) > 0:
             get_perpendicular_intersections(
                 trajectory, horizontal_trajectories, intersections
             )
-        if len(vertical_trajectories) > 0:
-            get_colinear_intersections(trajectory, vertical_trajectories, intersections)
-        vertical_trajectories.append(trajectory)
+        number_of_intersections = get_colinear_intersections(
+            trajectory, vertical_lines, intersections
+        )
+        vertical_trajectories.append(*trajectory[:3])
         update_position(current_position, next_position)
 
     else:
@@ -157,14 +192,12 @@ def move_robot(
             get_perpendicular_intersections(
                 trajectory, vertical_trajectories, intersections
             )
-        if len(horizontal_trajectories) > 0:
-            get_colinear_intersections(
-                trajectory, horizontal_trajectories, intersections
-            )
-        horizontal_trajectories.append(trajectory)
+        number_of_intersections = get_colinear_intersections(
+            trajectory, horizontal_lines, intersections
+        )
+        horizontal_trajectories.append(*trajectory[:3])
         update_position(current_position, next_position)
 
-    number_of_intersections = len(intersections)
     del intersections
     return number_of_intersections
 
@@ -174,80 +207,145 @@ def update_position(current_position: Coordinates, next_position: Coordinates):
     current_position[1] = next_position[1]
 
 
-def get_next_position(current_position: Coordinates, command: Command) -> Coordinates:
-    direction = DIRECTION_CHANGES[command["direction"]]
-    direction = [item * command["steps"] for item in direction]
+def get_next_position(
+    current_position: Coordinates, direction: int, steps: int
+) -> Coordinates:
+    change_x, change_y = CODE_CHANGES[direction]
 
     next_position = current_position[:]
-    next_position[0] = next_position[0] + direction[0]
-    next_position[1] = next_position[1] + direction[1]
+    next_position[0] = next_position[0] + change_x * steps
+    next_position[1] = next_position[1] + change_y * steps
 
     return next_position
 
 
 def create_horizontal_trajectory(
     current_position: Coordinates, next_position: Coordinates
-) -> Trajectory:
-    vertices = sorted([current_position[0], next_position[0]])
+) -> Segment:
+    start, end = sorted([current_position[0], next_position[0]])
     y_value = current_position[1]
-    direction = "horizontal"
 
-    trajectory = [vertices, y_value, direction]
-
-    return trajectory
+    return start, end, y_value, HORIZONTAL
 
 
 def create_vertical_trajectory(
     current_position: Coordinates, next_position: Coordinates
-) -> Trajectory:
-    vertices = sorted([current_position[1], next_position[1]])
+) -> Segment:
+    start, end = sorted([current_position[1], next_position[1]])
     x_value = current_position[0]
-    direction = "vertical"
-
-    trajectory = [vertices, x_value, direction]
 
-    return trajectory
+    return start, end, x_value, VERTICAL
 
 
 def get_perpendicular_intersections(
-    trajectory, perpendicular_trajectories, intersections
+    trajectory: Segment, perpendicular_trajectories: SegmentStore, intersections
 ) -> None:
-    for p_t in perpendicular_trajectories:
-        if (
-            p_t[0][0] <= trajectory[1] <= p_t[0][1]
-            and trajectory[0][0] <= p_t[1] <= trajectory[0][1]
-        ):
-            if trajectory[2] == "horizontal":
-                intersection = [p_t[1], trajectory[1]]
-                intersections.add(tuple(intersection))
-            else:
-                intersection = [trajectory[1], p_t[1]]
-                intersections.add(tuple(intersection))
-
-
-def get_colinear_intersections(trajectory, trajectories, intersections) -> None:
-    for t in trajectories:
-        if t[1] == trajectory[1]:
-            overlapping = get_overlapping_values(t[0], trajectory[0])
-            values = [trajectory[1]] * len(overlapping)
-            if trajectory[2] == "horizontal":
-                array_of_coordinates = list(zip(overlapping, values))
-            else:
-                array_of_coordinates = list(zip(values, overlapping))
-            intersections.update(array_of_coordinates)
-
-
-def get_overlapping_values(range1, range2) -> list[int]:
-    # Check for valid ranges
-    if range1[0] > range1[1] or range2[0] > range2[1]:
+    # Every intersection lays on the line of the trajectory, so it is recorded
+    # by its value along the trajectory only.
+    start, end, fixed_value, _ = trajectory
+    intersections.update(
+        perpendicular_trajectories.find_crossings(start, end, fixed_value)
+    )
+
+
+def get_colinear_intersections(
+    trajectory: Segment, lines: LineIndex, intersections
+) -> int:
+    """
+    Counts the vertices of a trajectory that were already visited, given the
+    perpendicular intersections found for it, and adds the trajectory to its line.
+
+    Args:
+        trajectory (Segment): The trajectory being walked.
+        lines (LineIndex): The disjoint intervals of every line with the same
+            orientation as the trajectory, keyed by the value of the fixed axis.
+        intersections (set): The perpendicular intersections of the trajectory, by
+            their value along the trajectory.
+
+    Returns:
+        int: The number of vertices of the trajectory that were already visited.
+
+    Example:
+    >>> lines = {5: [[0], [12]]}
+    >>> get_colinear_intersections((8, 20, 5, HORIZONTAL), lines, {15, 9})
+    6
+    >>> lines
+    {5: [[0], [20]]}
+    """
+
+    start, end, fixed_value, _ = trajectory
+    perpendicular_intersections = len(intersections)
+    line = lines.get(fixed_value)
+    if line is not None:
+        for intersection in intersections:
+            if is_covered_by_line(line, intersection):
+                perpendicular_intersections -= 1
+
+    new_vertices = add_interval_to_lines(lines, fixed_value, start, end)
+    colinear_intersections = end - start + 1 - new_vertices
+
+    return colinear_intersections + perpendicular_intersections
+
+
+def add_interval_to_lines(lines: LineIndex, value: int, start: int, end: int) -> int:
+    """
+    Adds the interval [start, end] to the line with the given value and returns
+    how many of its vertices were not covered by the line yet.
+
+    Args:
+        lines (LineIndex): The lines keyed by the value of the fixed axis, each one
+            kept as two sorted lists with the starts and the ends of its intervals.
+        value (int): The value of the fixed axis of the line.
+        start (int): The first vertex of the interval.
+        end (int): The last vertex of the interval.
+
+    Returns:
+        int: The number of vertices newly covered by the line.
+
+    Example:
+    >>> lines = {}
+    >>> add_interval_to_lines(lines, 0, 0, 10)
+    11
+    >>> add_interval_to_lines(lines, 0, 5, 14)
+    4
+    >>> lines
+    {0: [[0], [14]]}
+    """
+
+    if start > end:
         raise ValueError(
             "Invalid range: end point must be greater than or equal to start point"
         )
 
-    # Check for intersection
-    intersection_start = max(range1[0], range2[0])
-    intersection_end = min(range1[1], range2[1])
+    line = lines.get(value)
+    if line is None:
+        lines[value] = [[start], [end]]
+        return end - start + 1
+
+    starts, ends = line
+    # Intervals touching [start, end] are merged as well to keep the line compact.
+    first = bisect_left(ends, start - 1)
+    last = bisect_right(starts, end + 1)
+
+    already_covered = 0
+    for index in range(first, last):
+        overlap = min(ends[index], end) - max(starts[index], start) + 1
+        if overlap > 0:
+            already_covered += overlap
+
+    if first < last:
+        merged_start = min(start, starts[first])
+        merged_end = max(end, ends[last - 1])
+    else:
+        merged_start = start
+        merged_end = end
+    starts[first:last] = [merged_start]
+    ends[first:last] = [merged_end]
+
+    return end - start + 1 - already_covered
 
-    overlapping_values = list(range(intersection_start, intersection_end + 1))
 
-    return overlapping_values
+def is_covered_by_line(line, position: int) -> bool:
+    starts, ends = line
+    index = bisect_right(starts, position) - 1
+    return index >= 0 and position <= ends[index]
@@ -0,0 +1,66 @@
+from custom_types import CODE_CHANGES, Coordinates, Commands
+from command_parsing import parse_commands
+from robot_service_bitmap import TRANSPOSED_CODE_CHANGES, is_mostly_vertical
+from roaring_rows import RoaringRows
+
+
+"""
+This Python code directs a robot to explore a grid keeping the visited locations as compressed rows.
+Only the rows and chunks the robot moves along take memory, and a long move is a single run however many locations it covers.
+"""
+
+
+def execute_robot_instructions(start_position: Coordinates, commands: Commands) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ...     {"direction": "west", "steps": 5},
+    ... ])
+    9
+
+
+    Explanation:
+    - The visited locations are kept in RoaringRows, which splits every row in chunks of 2^16 locations kept as sorted arrays, bitmaps or runs, whichever is the smallest.
+    - A move along a row adds one run per chunk it goes through.
+    - A move across the rows adds one run per chunk to the column it goes along, so it takes no memory in the rows it goes through.
+    - When the walk moves more steps vertically than horizontally the grid is transposed, keeping columns instead, as the bitmap engine does.
+    - The result is the cardinality of the rows and the columns, without the locations found in both.
+    """
+    commands = parse_commands(commands)
+    x, y = start_position
+    changes = CODE_CHANGES
+    if is_mostly_vertical(commands):
+        changes = TRANSPOSED_CODE_CHANGES
+        x, y = y, x
+
+    rows = RoaringRows()
+    rows.add_horizontal_run(y, x, x)
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = changes[direction]
+        if change_y == 0:
+            next_x = x + change_x * steps
+            if x <= next_x:
+                rows.add_horizontal_run(y, x, next_x)
+            else:
+                rows.add_horizontal_run(y, next_x, x)
+            x = next_x
+        else:
+            next_y = y + change_y * steps
+            if y <= next_y:
+                rows.add_vertical_run(x, y, next_y)
+            else:
+                rows.add_vertical_run(x, next_y, y)
+            y = next_y
+
+    return len(rows)
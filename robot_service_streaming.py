@@ -0,0 +1,155 @@
+from typing import AsyncIterable, Iterable, Union
+from bisect import bisect_left, bisect_right, insort
+from custom_types import CODE_CHANGES, Coordinates, Command, ParsedCommands, WalkState
+from command_parsing import parse_command
+from robot_service_refactored_for_large_inputs import (
+    add_interval_to_lines,
+    is_covered_by_line,
+)
+
+
+"""
+This Python code directs a robot to explore a grid one command at a time, keeping a running count of the visited locations.
+Commands can come from any iterable or async iterable and are dropped as soon as they are walked: the only state kept is the union of the trajectories of every row and column.
+"""
+
+
+def execute_robot_instructions(
+    start_position: Coordinates, commands: Union[Iterable[Command], ParsedCommands]
+) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Union[Iterable[Command], ParsedCommands]): Any iterable of
+            commands, such as a generator reading them from a file or a socket, or
+            commands already parsed.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], iter([{"direction": "east", "steps": 2}]))
+    3
+    """
+
+    state = create_walk_state(start_position)
+    if isinstance(commands, ParsedCommands):
+        for direction, steps in zip(commands.directions, commands.steps):
+            walk_move(state, direction, steps)
+    else:
+        for command in commands:
+            walk_command(state, command)
+    return state["visited"]
+
+
+async def execute_robot_instructions_async(
+    start_position: Coordinates, commands: AsyncIterable[Command]
+) -> int:
+    """
+    Executes the commands of an async iterable and returns the total number of
+    visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (AsyncIterable[Command]): Any async iterable of commands.
+
+    Returns:
+        int: The total number of visited locations.
+    """
+
+    state = create_walk_state(start_position)
+    async for command in commands:
+        walk_command(state, command)
+    return state["visited"]
+
+
+def create_walk_state(start_position: Coordinates) -> WalkState:
+    return {
+        "position": list(start_position),
+        "visited": 0,
+        "horizontal_lines": {},
+        "vertical_lines": {},
+        # Sorted values of the lines in use, to find the perpendicular lines a
+        # trajectory goes through without looking at the others.
+        "rows": [],
+        "columns": [],
+    }
+
+
+def walk_command(state: WalkState, command: Command) -> int:
+    """
+    Walks a command, updating the running count of visited locations.
+
+    Args:
+        state (WalkState): The state of the walk, as created by create_walk_state.
+        command (Command): The command to walk.
+
+    Returns:
+        int: The number of locations visited for the first time by the command.
+
+    Example:
+    >>> state = create_walk_state([0, 0])
+    >>> walk_command(state, {"direction": "east", "steps": 2})
+    3
+    >>> walk_command(state, {"direction": "west", "steps": 4})
+    2
+    >>> state["visited"], state["position"]
+    (5, [-2, 0])
+    """
+
+    return walk_move(state, *parse_command(command))
+
+
+def walk_move(state: WalkState, direction: int, steps: int) -> int:
+    change_x, change_y = CODE_CHANGES[direction]
+    x, y = state["position"]
+    next_x = x + change_x * steps
+    next_y = y + change_y * steps
+
+    if change_x == 0:
+        new_vertices = walk_trajectory(
+            state["vertical_lines"],
+            state["columns"],
+            state["horizontal_lines"],
+            state["rows"],
+            x,
+            min(y, next_y),
+            max(y, next_y),
+        )
+    else:
+        new_vertices = walk_trajectory(
+            state["horizontal_lines"],
+            state["rows"],
+            state["vertical_lines"],
+            state["columns"],
+            y,
+            min(x, next_x),
+            max(x, next_x),
+        )
+
+    state["position"][0] = next_x
+    state["position"][1] = next_y
+    state["visited"] += new_vertices
+    return new_vertices
+
+
+def walk_trajectory(
+    lines, line_values, perpendicular_lines, perpendicular_values, value, start, end
+) -> int:
+    line = lines.get(value)
+    perpendicular_intersections = 0
+    first = bisect_left(perpendicular_values, start)
+    last = bisect_right(perpendicular_values, end)
+    for perpendicular_value in perpendicular_values[first:last]:
+        if is_covered_by_line(perpendicular_lines[perpendicular_value], value) and (
+            line is None or not is_covered_by_line(line, perpendicular_value)
+        ):
+            perpendicular_intersections += 1
+
+    if line is None:
+        insort(line_values, value)
+    new_vertices = add_interval_to_lines(lines, value, start, end)
+
+    return new_vertices - perpendicular_intersections
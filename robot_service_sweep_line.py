@@ -0,0 +1,238 @@
+from typing import Dict, List, Tuple, Union
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Commands,
+    CommandsList,
+    ExecutionResult,
+    LineIntervals,
+)
+from command_parsing import parse_commands
+from robot_service_refactored_for_large_inputs import parse_body
+
+
+"""
+This Python code directs a robot to explore a grid without replaying the walk command by command against every previous trajectory.
+All the commands are read first, the trajectories are merged per line and the crossings between horizontal and vertical lines are counted with a sweep over compressed coordinates.
+"""
+
+
+def parse_body_instruct_robot_generate_response(
+    body: Dict[str, Union[Coordinates, CommandsList]]
+) -> ExecutionResult:
+    """
+    Parses the input body, instructs a robot with commands, and generates a response.
+
+    Args:
+        body (Dict[str, Union[Coordinates, CommandsList]]): The input body containing
+            the starting position and a list of commands for the robot.
+
+    Returns:
+        ExecutionResult: A dictionary containing the timestamp, duration of execution,
+            result (total number of visited locations), and the number of commands.
+
+    Example:
+    >>> parse_body_instruct_robot_generate_response({
+    ...     "start": {"x": 0, "y": 0},
+    ...     "commands": [
+    ...         {"direction": "east", "steps": 2},
+    ...         {"direction": "north", "steps": 1},
+    ...     ],
+    ... })
+    {'timestamp': '2024-01-05T00:00:00', 'duration': 0.0, 'result': 4, 'commands': 2}
+    """
+
+    commands, start_position = parse_body(body)
+    result, elapsed_time = instruct_robot_and_time_it(start_position, commands)
+
+    response = {
+        "timestamp": datetime.now().isoformat(),
+        "duration": elapsed_time,
+        "result": result,
+        "commands": len(commands),
+    }
+    return response
+
+
+def instruct_robot_and_time_it(
+    start_position: Coordinates, commands: CommandsList
+) -> Tuple[int, float]:
+    start_time = time.perf_counter()
+    result = execute_robot_instructions(start_position, commands)
+    end_time = time.perf_counter()
+    elapsed_time = end_time - start_time
+
+    return result, elapsed_time
+
+
+def execute_robot_instructions(start_position: Coordinates, commands: Commands) -> int:
+    """
+    Executes the given commands and returns the total number of visited locations.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        int: The total number of visited locations.
+
+    Example:
+    >>> execute_robot_instructions([0, 0], [{"direction": "east", "steps": 2}])
+    3
+
+
+    Explanation:
+    - The whole walk is turned into trajectories before counting anything, grouped by the line they lay on (the row for horizontal ones, the column for vertical ones).
+    - The trajectories of every line are merged into sorted, disjoint intervals, so a vertex can only be covered once by the horizontal lines and once by the vertical lines.
+    - The visited vertices are then the length of every horizontal interval plus the length of every vertical interval minus the vertices covered by both, which are the crossings.
+    - The crossings are counted sweeping the columns from left to right: a horizontal interval is active between its two ends and every vertical interval asks how many active rows fall in its range.
+    - The active rows are kept in a Fenwick tree over the compressed row values, which makes the whole count O(n log n) in the number of commands.
+    """
+    horizontal_lines, vertical_lines = generate_lines(start_position, commands)
+    horizontal_lines = merge_lines(horizontal_lines)
+    vertical_lines = merge_lines(vertical_lines)
+
+    return count_visited_vertices(horizontal_lines, vertical_lines)
+
+
+def generate_lines(
+    start_position: Coordinates, commands: Commands
+) -> Tuple[LineIntervals, LineIntervals]:
+    commands = parse_commands(commands)
+    horizontal_lines = {}
+    vertical_lines = {}
+    x, y = start_position
+
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = CODE_CHANGES[direction]
+        next_x = x + change_x * steps
+        next_y = y + change_y * steps
+
+        if change_x == 0:
+            interval = [y, next_y] if y <= next_y else [next_y, y]
+            vertical_lines.setdefault(x, []).append(interval)
+        else:
+            interval = [x, next_x] if x <= next_x else [next_x, x]
+            horizontal_lines.setdefault(y, []).append(interval)
+
+        x, y = next_x, next_y
+
+    return horizontal_lines, vertical_lines
+
+
+def merge_lines(lines: LineIntervals) -> LineIntervals:
+    return {value: merge_intervals(intervals) for value, intervals in lines.items()}
+
+
+def merge_intervals(intervals: List[List[int]]) -> List[List[int]]:
+    """
+    Merges the intervals of a line into sorted, disjoint intervals.
+
+    Args:
+        intervals (List[List[int]]): Closed intervals, each one given as [start, end].
+
+    Returns:
+        List[List[int]]: The sorted, disjoint intervals covering the same vertices.
+            Intervals that touch each other are merged as well.
+
+    Example:
+    >>> merge_intervals([[4, 6], [0, 2], [3, 3], [8, 9]])
+    [[0, 6], [8, 9]]
+    """
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    return merged
+
+
+def count_visited_vertices(
+    horizontal_lines: LineIntervals, vertical_lines: LineIntervals
+) -> int:
+    total_visited_spots = 0
+    for intervals in horizontal_lines.values():
+        for start, end in intervals:
+            total_visited_spots += end - start + 1
+    for intervals in vertical_lines.values():
+        for start, end in intervals:
+            total_visited_spots += end - start + 1
+
+    return total_visited_spots - count_crossings(horizontal_lines, vertical_lines)
+
+
+def count_crossings(
+    horizontal_lines: LineIntervals, vertical_lines: LineIntervals
+) -> int:
+    """
+    Counts the vertices covered both by a horizontal and by a vertical interval.
+
+    Args:
+        horizontal_lines (LineIntervals): Merged horizontal intervals keyed by row.
+        vertical_lines (LineIntervals): Merged vertical intervals keyed by column.
+
+    Returns:
+        int: The number of crossings.
+
+    Example:
+    >>> count_crossings({0: [[0, 4]], 2: [[0, 4]]}, {1: [[0, 2]], 9: [[0, 2]]})
+    2
+    """
+
+    if not horizontal_lines or not vertical_lines:
+        return 0
+
+    rows = sorted(horizontal_lines)
+    row_indexes = {row: index for index, row in enumerate(rows)}
+
+    # Rows are added at their first column and removed right after their last one,
+    # the updates of a column are sorted before its queries (0 before 1).
+    events = []
+    for row, intervals in horizontal_lines.items():
+        index = row_indexes[row]
+        for start, end in intervals:
+            events.append((start, 0, index, 1))
+            events.append((end + 1, 0, index, -1))
+    for column, intervals in vertical_lines.items():
+        for start, end in intervals:
+            first_row = bisect_left(rows, start)
+            last_row = bisect_right(rows, end)
+            if first_row < last_row:
+                events.append((column, 1, first_row, last_row))
+    events.sort()
+
+    tree = [0] * (len(rows) + 1)
+    crossings = 0
+    for _, kind, first, second in events:
+        if kind == 0:
+            fenwick_update(tree, first, second)
+        else:
+            crossings += fenwick_prefix_sum(tree, second) - fenwick_prefix_sum(
+                tree, first
+            )
+
+    return crossings
+
+
+def fenwick_update(tree: List[int], index: int, delta: int) -> None:
+    index += 1
+    size = len(tree)
+    while index < size:
+        tree[index] += delta
+        index += index & -index
+
+
+def fenwick_prefix_sum(tree: List[int], index: int) -> int:
+    # Sum of the first `index` positions.
+    total = 0
+    while index > 0:
+        total += tree[index]
+        index -= index & -index
+    return total
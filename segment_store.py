@@ -0,0 +1,174 @@
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+"""
+This Python code stores the trajectories of one orientation as three columns of machine integers instead of a nested list per trajectory.
+A trajectory is described by the first (lo) and last (hi) value of its moving axis and the value of its fixed axis.
+The trajectories can be indexed in a bucket grid, so the ones crossing a perpendicular trajectory are found without testing every stored one.
+"""
+
+HORIZONTAL = 0
+VERTICAL = 1
+
+# The grid is rebuilt with larger cells once the mean length of the trajectories
+# exceeds this many cells, so a trajectory keeps spanning only a few of them.
+GRID_GROWTH_FACTOR = 4
+
+
+class SegmentStore:
+    """
+    The trajectories of one orientation, kept as parallel int64 columns.
+
+    Each trajectory takes 24 bytes in the columns, against more than 200 bytes for
+    a list holding a list, an int and a string. The columns are arrays, which grow
+    geometrically as trajectories are appended.
+
+    Example:
+    >>> store = SegmentStore(HORIZONTAL, indexed=True)
+    >>> store.append(0, 10, 5)
+    >>> store.append(-3, 2, 7)
+    >>> len(store), list(store)
+    (2, [(0, 10, 5), (-3, 2, 7)])
+    >>> store.find_crossings(4, 9, 1)
+    [5, 7]
+    """
+
+    __slots__ = ("orientation", "lo", "hi", "fixed", "grid", "total_length")
+
+    def __init__(self, orientation: int, indexed: bool = False):
+        self.orientation = orientation
+        self.lo = array("q")
+        self.hi = array("q")
+        self.fixed = array("q")
+        self.grid: Optional[SegmentGrid] = SegmentGrid(1) if indexed else None
+        self.total_length = 0
+
+    def append(self, lo: int, hi: int, fixed: int) -> None:
+        self.append_to_columns(lo, hi, fixed)
+        if self.grid is None:
+            return
+
+        self.total_length += hi - lo + 1
+        mean_length = self.total_length // len(self.fixed)
+        if mean_length > GRID_GROWTH_FACTOR * self.grid.cell_size:
+            # Cells double until they fit the mean length, so the grid is rebuilt
+            # only a logarithmic number of times.
+            cell_size = self.grid.cell_size
+            while cell_size * 2 <= mean_length:
+                cell_size *= 2
+            self.grid = SegmentGrid(cell_size)
+            for index, segment in enumerate(self):
+                self.grid.add(index, *segment)
+        else:
+            self.grid.add(len(self.fixed) - 1, lo, hi, fixed)
+
+    def append_to_columns(self, lo: int, hi: int, fixed: int) -> None:
+        try:
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.fixed.append(fixed)
+        except OverflowError:
+            # Coordinates beyond int64 are still valid walks, the columns just
+            # become plain lists from then on.
+            del self.lo[len(self.fixed) :]
+            del self.hi[len(self.fixed) :]
+            self.lo = list(self.lo)
+            self.hi = list(self.hi)
+            self.fixed = list(self.fixed)
+            self.append_to_columns(lo, hi, fixed)
+
+    def __len__(self) -> int:
+        return len(self.fixed)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.lo, self.hi, self.fixed)
+
+    def find_crossings(self, lo: int, hi: int, fixed: int) -> List[int]:
+        """
+        Finds the stored trajectories crossing a perpendicular trajectory.
+
+        Args:
+            lo (int): The first value of the moving axis of the perpendicular
+                trajectory, which is the fixed axis of the stored ones.
+            hi (int): The last value of the moving axis of the perpendicular
+                trajectory.
+            fixed (int): The value of the fixed axis of the perpendicular
+                trajectory.
+
+        Returns:
+            List[int]: The fixed value of every stored trajectory crossing it, that
+                is the values along the perpendicular trajectory where they cross.
+        """
+
+        los, his, fixeds = self.lo, self.hi, self.fixed
+        # When most trajectories share the cells of the query, as in dense walks,
+        # scanning the columns is faster than going through the grid.
+        if self.grid is None or self.grid.count_candidates(fixed) * 2 >= len(fixeds):
+            return [
+                s_fixed
+                for s_lo, s_hi, s_fixed in zip(los, his, fixeds)
+                if s_lo <= fixed <= s_hi and lo <= s_fixed <= hi
+            ]
+
+        crossings = []
+        for indexes in self.grid.find_candidates(lo, hi, fixed):
+            for index in indexes:
+                s_fixed = fixeds[index]
+                if los[index] <= fixed <= his[index] and lo <= s_fixed <= hi:
+                    crossings.append(s_fixed)
+        return crossings
+
+
+class SegmentGrid:
+    """
+    Bucket grid over the trajectories of a SegmentStore. Cells are squares of
+    cell_size values, and every trajectory is listed in each cell it goes through.
+
+    Cells are grouped by their coordinate along the moving axis of the trajectories,
+    which is what a perpendicular trajectory has fixed, so a query reads a single
+    group and only the cells of that group it goes through.
+
+    Example:
+    >>> grid = SegmentGrid(4)
+    >>> grid.add(0, 0, 9, 5)
+    >>> grid.add(1, 0, 3, 30)
+    >>> list(grid.find_candidates(0, 40, 8))
+    [[0]]
+    """
+
+    __slots__ = ("cell_size", "cells", "group_sizes")
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self.cells: Dict[int, Dict[int, List[int]]] = {}
+        self.group_sizes: Dict[int, int] = {}
+
+    def add(self, index: int, lo: int, hi: int, fixed: int) -> None:
+        size = self.cell_size
+        fixed_cell = fixed // size
+        for cell in range(lo // size, hi // size + 1):
+            self.cells.setdefault(cell, {}).setdefault(fixed_cell, []).append(index)
+            self.group_sizes[cell] = self.group_sizes.get(cell, 0) + 1
+
+    def count_candidates(self, fixed: int) -> int:
+        return self.group_sizes.get(fixed // self.cell_size, 0)
+
+    def find_candidates(self, lo: int, hi: int, fixed: int) -> Iterator[List[int]]:
+        size = self.cell_size
+        group = self.cells.get(fixed // size)
+        if group is None:
+            return
+        first = lo // size
+        last = hi // size
+        # Long queries over a sparse group are cheaper scanning the cells that
+        # exist than every cell they go through.
+        if last - first + 1 <= len(group):
+            for cell in range(first, last + 1):
+                indexes = group.get(cell)
+                if indexes is not None:
+                    yield indexes
+        else:
+            for cell, indexes in group.items():
+                if first <= cell <= last:
+                    yield indexes
@@ -0,0 +1,89 @@
+from typing import Dict, Tuple, Union
+from multiprocessing import shared_memory
+import numpy as np
+
+
+"""
+This Python code stores tables of int64 columns in shared memory so worker processes can read them, and write their results, without copying anything.
+A table is passed to a worker as a small descriptor holding the name of the shared memory block, the number of rows and the names of the columns.
+"""
+
+SharedTableDescriptor = Dict[str, Union[str, int, Tuple[str, ...]]]
+
+
+def create_shared_table(
+    columns: Dict[str, np.ndarray], rows: int
+) -> Tuple[shared_memory.SharedMemory, SharedTableDescriptor]:
+    """
+    Copies the given columns to a new shared memory block.
+
+    Args:
+        columns (Dict[str, np.ndarray]): The columns of the table, all of them with
+            the given number of rows. Columns given as None are left zeroed, ready
+            to be written by the workers.
+        rows (int): The number of rows of the table.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, SharedTableDescriptor]: The shared memory
+            block, which the caller has to close and unlink, and its descriptor.
+
+    Example:
+    >>> block, descriptor = create_shared_table({"value": np.arange(3)}, 3)
+    >>> attached, table = attach_shared_table(descriptor)
+    >>> table["value"].tolist()
+    [0, 1, 2]
+    >>> del table
+    >>> attached.close(); block.close(); block.unlink()
+    """
+
+    names = tuple(columns)
+    # Shared memory blocks cannot be empty.
+    size = max(1, len(names) * rows * 8)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    descriptor = {"name": block.name, "rows": rows, "columns": names}
+
+    table = get_table_views(block, descriptor)
+    for name, values in columns.items():
+        if values is None:
+            table[name][:] = 0
+        else:
+            table[name][:] = values
+    del table
+
+    return block, descriptor
+
+
+def attach_shared_table(
+    descriptor: SharedTableDescriptor,
+) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """
+    Attaches to a table created by create_shared_table, without copying it.
+
+    Args:
+        descriptor (SharedTableDescriptor): The descriptor of the table.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]: The shared memory
+            block and a view of every column. The views have to be released before
+            closing the block.
+    """
+
+    block = shared_memory.SharedMemory(name=descriptor["name"])
+    return block, get_table_views(block, descriptor)
+
+
+def get_table_views(
+    block: shared_memory.SharedMemory, descriptor: SharedTableDescriptor
+) -> Dict[str, np.ndarray]:
+    rows = descriptor["rows"]
+    return {
+        name: np.ndarray(
+            (rows,), dtype=np.int64, buffer=block.buf, offset=index * rows * 8
+        )
+        for index, name in enumerate(descriptor["columns"])
+    }
+
+
+def release_shared_table(block: shared_memory.SharedMemory) -> None:
+    block.close()
+    block.unlink()
@@ -0,0 +1,284 @@
+from typing import Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import psycopg2
+import psycopg2.extras
+from connection_pool import ConnectionPool
+from migrations import apply_sqlite_migrations, migrate
+from utils import parse_env_variable
+
+
+"""
+This Python code keeps the execution results in a storage backend chosen from the configuration: PostgreSQL, SQLite or memory.
+Backends only connect when the first record is written, so the application starts, and its tests run, without a database.
+"""
+
+DEFAULT_BACKEND = os.getenv("RECORD_STORAGE", "postgres")
+DEFAULT_SQLITE_PATH = os.getenv("RECORD_SQLITE_PATH", "records.sqlite3")
+
+# The schema is migrated when a backend first connects. With RUN_MIGRATIONS=0 it
+# is left to python migrations.py instead.
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "1") == "1"
+
+# Timestamp, commands, result, duration, engine and whether it is approximate.
+RecordValues = Tuple[str, int, int, float, Optional[str], bool]
+
+# The same values preceded by the id of the record.
+RecordRow = Tuple[int, str, int, int, float, Optional[str], bool]
+
+# Errors of the database refusing the values of a record, which writing it again
+# cannot fix. Any other error, such as a missing configuration or a failed
+# migration, comes before any record reaches the database. SQLite refuses
+# integers beyond int64 with an OverflowError.
+REJECTED_RECORD_ERRORS = (
+    psycopg2.DataError,
+    psycopg2.IntegrityError,
+    sqlite3.DataError,
+    sqlite3.IntegrityError,
+    OverflowError,
+)
+
+INSERT_RECORD = """
+INSERT INTO records ("Timestamp", "Commands", "Result", "Duration", "Engine", "Approximate")
+VALUES (%s, %s, %s, %s, %s, %s)
+RETURNING id, "Timestamp", "Commands", "Result", "Duration", "Engine", "Approximate";
+"""
+
+INSERT_RECORDS = """
+INSERT INTO records ("Timestamp", "Commands", "Result", "Duration", "Engine", "Approximate")
+VALUES %s;
+"""
+
+SQLITE_INSERT_RECORD = """
+INSERT INTO records ("Timestamp", "Commands", "Result", "Duration", "Engine", "Approximate")
+VALUES (?, ?, ?, ?, ?, ?);
+"""
+
+SQLITE_SELECT_RECORD = """
+SELECT id, "Timestamp", "Commands", "Result", "Duration", "Engine", "Approximate"
+FROM records WHERE id = ?;
+"""
+
+
+class RecordStorage(ABC):
+    """
+    Interface of the storage backends.
+
+    insert_record writes a record and returns it as stored, with its id, and
+    insert_records writes many of them at once. migrate brings the schema up to
+    date and returns the versions applied.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def migrate(self) -> List[int]:
+        pass
+
+    @abstractmethod
+    def insert_record(self, values: RecordValues) -> RecordRow:
+        pass
+
+    @abstractmethod
+    def insert_records(self, values: List[RecordValues]) -> None:
+        pass
+
+    def info(self) -> Dict[str, object]:
+        return {"backend": self.name}
+
+    def close(self) -> None:
+        pass
+
+
+class PostgresStorage(RecordStorage):
+    """
+    Records in PostgreSQL, written through a pool of connections created on the
+    first write.
+    """
+
+    name = "postgres"
+
+    def __init__(
+        self, url: Optional[str] = None, run_migrations: bool = RUN_MIGRATIONS
+    ):
+        self.url = url
+        self.run_migrations = run_migrations
+        self.pool: Optional[ConnectionPool] = None
+        self.lock = threading.Lock()
+
+    def get_pool(self, run_migrations: Optional[bool] = None) -> ConnectionPool:
+        if run_migrations is None:
+            run_migrations = self.run_migrations
+        with self.lock:
+            if self.pool is None:
+                url = self.url
+                if url is None:
+                    if os.getenv("DATABASE_URL") is None:
+                        raise ValueError("DATABASE_URL is not set")
+                    url = parse_env_variable(os.getenv("DATABASE_URL"))
+                pool = ConnectionPool(lambda: connect_to_postgres(url))
+                if run_migrations:
+                    migrate(pool)
+                self.pool = pool
+            return self.pool
+
+    def migrate(self) -> List[int]:
+        # Migrating on connect would leave nothing for this call to report.
+        return migrate(self.get_pool(run_migrations=False))
+
+    def insert_record(self, values: RecordValues) -> RecordRow:
+        with self.get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(INSERT_RECORD, values)
+                return cursor.fetchone()
+
+    def insert_records(self, values: List[RecordValues]) -> None:
+        with self.get_pool().connection() as connection:
+            with connection.cursor() as cursor:
+                psycopg2.extras.execute_values(
+                    cursor, INSERT_RECORDS, values, page_size=len(values)
+                )
+
+    def info(self) -> Dict[str, object]:
+        if self.pool is None:
+            return {"backend": self.name, "connected": False}
+        return {"backend": self.name, "connected": True, **self.pool.info()}
+
+    def close(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.close_all()
+                self.pool = None
+
+
+def connect_to_postgres(url: str):
+    connection = psycopg2.connect(url)
+    # Every write is a single INSERT, which is atomic on its own, so committing
+    # it separately would only add a round trip.
+    connection.autocommit = True
+    return connection
+
+
+class SQLiteStorage(RecordStorage):
+    """
+    Records in a SQLite file, opened and migrated on the first write. A single
+    connection is shared by every thread, one statement at a time.
+
+    Example:
+    >>> storage = SQLiteStorage(":memory:")
+    >>> storage.insert_record(("2024-01-05T12:34:56", 10, 42, 1.5, "sweep_line", False))
+    (1, '2024-01-05T12:34:56', 10, 42, 1.5, 'sweep_line', False)
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self.connection: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+    def get_connection(self) -> sqlite3.Connection:
+        # Called with the lock held.
+        if self.connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            apply_sqlite_migrations(connection)
+            self.connection = connection
+        return self.connection
+
+    def migrate(self) -> List[int]:
+        with self.lock:
+            if self.connection is None:
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                self.connection = connection
+                return apply_sqlite_migrations(connection)
+            return apply_sqlite_migrations(self.connection)
+
+    def insert_record(self, values: RecordValues) -> RecordRow:
+        with self.lock:
+            connection = self.get_connection()
+            with connection:
+                cursor = connection.execute(SQLITE_INSERT_RECORD, values)
+                row = connection.execute(
+                    SQLITE_SELECT_RECORD, (cursor.lastrowid,)
+                ).fetchone()
+        # SQLite keeps booleans as integers.
+        return row[:-1] + (bool(row[-1]),)
+
+    def insert_records(self, values: List[RecordValues]) -> None:
+        with self.lock:
+            connection = self.get_connection()
+            with connection:
+                connection.executemany(SQLITE_INSERT_RECORD, values)
+
+    def info(self) -> Dict[str, object]:
+        return {
+            "backend": self.name,
+            "connected": self.connection is not None,
+            "path": self.path,
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class MemoryStorage(RecordStorage):
+    """
+    Records kept in a list, for tests and benchmarks of everything but the
+    database.
+
+    Example:
+    >>> storage = MemoryStorage()
+    >>> storage.insert_record(("2024-01-05T12:34:56", 10, 42, 1.5, None, False))
+    (1, '2024-01-05T12:34:56', 10, 42, 1.5, None, False)
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self.rows: List[RecordRow] = []
+        self.lock = threading.Lock()
+
+    def migrate(self) -> List[int]:
+        return []
+
+    def insert_record(self, values: RecordValues) -> RecordRow:
+        with self.lock:
+            row = (len(self.rows) + 1,) + tuple(values)
+            self.rows.append(row)
+        return row
+
+    def insert_records(self, values: List[RecordValues]) -> None:
+        with self.lock:
+            for record_values in values:
+                self.rows.append((len(self.rows) + 1,) + tuple(record_values))
+
+    def info(self) -> Dict[str, object]:
+        with self.lock:
+            return {"backend": self.name, "records": len(self.rows)}
+
+
+STORAGE_BACKENDS = {
+    PostgresStorage.name: PostgresStorage,
+    SQLiteStorage.name: SQLiteStorage,
+    MemoryStorage.name: MemoryStorage,
+}
+
+
+def create_storage(backend: str = DEFAULT_BACKEND) -> RecordStorage:
+    """
+    Creates the storage backend with the given name, without connecting it.
+
+    Example:
+    >>> create_storage("memory").info()
+    {'backend': 'memory', 'records': 0}
+    """
+
+    try:
+        return STORAGE_BACKENDS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {backend}") from None
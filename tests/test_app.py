@@ -0,0 +1,76 @@
+import unittest
+import record_service
+from app import app
+from record_writer import BatchedRecordWriter
+from storage import MemoryStorage
+
+BODY = {
+    "start": {"x": 0, "y": 0},
+    "commands": [
+        {"direction": "east", "steps": 2},
+        {"direction": "north", "steps": 1},
+    ],
+}
+
+
+class TestEnterPath(unittest.TestCase):
+    def setUp(self) -> None:
+        self.storage = record_service.storage
+        self.record_writer = record_service.record_writer
+        self.record_spool = record_service.record_spool
+        record_service.storage = MemoryStorage()
+        record_service.record_writer = None
+        record_service.record_spool = None
+        self.client = app.test_client()
+
+    def tearDown(self) -> None:
+        if record_service.record_writer is not None:
+            record_service.record_writer.close()
+        record_service.storage = self.storage
+        record_service.record_writer = self.record_writer
+        record_service.record_spool = self.record_spool
+
+    def test_inserted_record(self):
+        response = self.client.post("/tibber-developer-test/enter-path", json=BODY)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["id"], 1)
+        self.assertEqual(response.get_json()["Result"], 4)
+
+    def test_queued_record(self):
+        record_service.record_writer = BatchedRecordWriter(
+            record_service.insert_records, flush_interval=0.01
+        )
+
+        response = self.client.post("/tibber-developer-test/enter-path", json=BODY)
+        record_service.record_writer.flush()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertIsNone(response.get_json()["id"])
+        self.assertEqual(response.get_json()["Result"], 4)
+        self.assertEqual(record_service.storage.info()["records"], 1)
+
+    def test_approximate_record(self):
+        response = self.client.post(
+            "/tibber-developer-test/enter-path?mode=approximate", json=BODY
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.get_json()["Approximate"])
+        self.assertEqual(response.get_json()["relative_error"], 0.0)
+
+    def test_exact_record_has_no_relative_error(self):
+        response = self.client.post("/tibber-developer-test/enter-path", json=BODY)
+
+        self.assertNotIn("relative_error", response.get_json())
+
+    def test_unknown_mode(self):
+        response = self.client.post(
+            "/tibber-developer-test/enter-path?mode=fast", json=BODY
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from command_normalization import normalize_commands, fold_run
+from engine_registry import parse_body_instruct_robot_generate_response
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from test_helpers import generate_random_commands
+
+
+class TestCommandNormalization(unittest.TestCase):
+    def test_merges_same_direction_runs(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "east", "steps": 3},
+            {"direction": "north", "steps": 1},
+            {"direction": "north", "steps": 1},
+        ]
+
+        self.assertEqual(
+            normalize_commands(commands),
+            [
+                {"direction": "east", "steps": 5},
+                {"direction": "north", "steps": 2},
+            ],
+        )
+
+    def test_folds_back_and_forth_moves(self):
+        commands = [
+            {"direction": "east", "steps": 5},
+            {"direction": "west", "steps": 3},
+            {"direction": "east", "steps": 1},
+            {"direction": "west", "steps": 4},
+            {"direction": "east", "steps": 2},
+        ]
+
+        self.assertEqual(
+            normalize_commands(commands),
+            [
+                {"direction": "west", "steps": 1},
+                {"direction": "east", "steps": 6},
+                {"direction": "west", "steps": 4},
+            ],
+        )
+
+    def test_drops_commands_without_steps(self):
+        commands = [
+            {"direction": "east", "steps": 1},
+            {"direction": "north", "steps": 0},
+            {"direction": "east", "steps": 1},
+        ]
+
+        self.assertEqual(
+            normalize_commands(commands), [{"direction": "east", "steps": 2}]
+        )
+
+    def test_keeps_the_start_when_every_command_is_dropped(self):
+        commands = [
+            {"direction": "south", "steps": 0},
+            {"direction": "east", "steps": 0},
+        ]
+
+        self.assertEqual(
+            normalize_commands(commands), [{"direction": "south", "steps": 0}]
+        )
+        self.assertEqual(normalize_commands([]), [])
+
+    def test_fold_run(self):
+        self.assertEqual(
+            fold_run("vertical", 0, 7, 2),
+            [
+                {"direction": "north", "steps": 7},
+                {"direction": "south", "steps": 5},
+            ],
+        )
+
+    def test_normalized_commands_visit_the_same_locations(self):
+        for seed in range(300):
+            commands = generate_random_commands(seed, 30, 6)
+            normalized = normalize_commands(commands)
+
+            self.assertLessEqual(len(normalized), len(commands))
+            self.assertEqual(
+                execute_naive_robot_instructions([3, -2], normalized),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_response_reports_the_original_number_of_commands(self):
+        body = {
+            "start": {"x": 0, "y": 0},
+            "commands": [
+                {"direction": "east", "steps": 5},
+                {"direction": "west", "steps": 3},
+                {"direction": "east", "steps": 0},
+            ],
+        }
+
+        response = parse_body_instruct_robot_generate_response(body, "trajectories")
+
+        self.assertEqual(response["commands"], 3)
+        self.assertEqual(response["result"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
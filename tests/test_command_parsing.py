@@ -0,0 +1,66 @@
+import unittest
+from array import array
+from command_parsing import InvalidCommandError, parse_command, parse_commands
+from custom_types import ParsedCommands
+
+
+class TestCommandParsing(unittest.TestCase):
+    def test_parse_commands(self):
+        commands = parse_commands(
+            [
+                {"direction": "east", "steps": 2},
+                {"direction": "south", "steps": 7},
+            ]
+        )
+
+        self.assertEqual(commands.directions, array("b", [0, 3]))
+        self.assertEqual(commands.steps, array("q", [2, 7]))
+        self.assertIs(parse_commands(commands), commands)
+
+    def test_parsed_commands_behave_like_a_list(self):
+        commands = parse_commands(
+            [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ]
+        )
+
+        self.assertEqual(len(commands), 2)
+        self.assertEqual(commands[1], {"direction": "north", "steps": 1})
+        self.assertEqual(
+            commands[:1] * 2 + commands[1:], [commands[0]] * 2 + [commands[1]]
+        )
+
+    def test_steps_beyond_int64(self):
+        commands = parse_commands([{"direction": "east", "steps": 2**64}])
+
+        self.assertEqual(commands, [{"direction": "east", "steps": 2**64}])
+
+    def test_rejects_invalid_commands(self):
+        for command in [
+            {"direction": "up", "steps": 1},
+            {"direction": "east", "steps": -1},
+            {"direction": "east", "steps": 1.5},
+            {"direction": "east", "steps": True},
+            {"direction": "east"},
+            ["east", 1],
+        ]:
+            with self.assertRaises(InvalidCommandError):
+                parse_command(command)
+
+    def test_error_reports_the_position_of_the_command(self):
+        with self.assertRaisesRegex(InvalidCommandError, "Command 1"):
+            parse_commands(
+                [
+                    {"direction": "east", "steps": 1},
+                    {"direction": "east", "steps": "1"},
+                ]
+            )
+
+    def test_empty_commands(self):
+        self.assertEqual(len(parse_commands([])), 0)
+        self.assertIsInstance(parse_commands([]), ParsedCommands)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import random
+import unittest
+from command_periodicity import (
+    find_period,
+    get_overlap_distance,
+    execute_periodic_walk,
+)
+from engine_registry import (
+    PERIODIC_ENGINE,
+    parse_body_instruct_robot_generate_response,
+)
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_sweep_line import execute_robot_instructions
+from walk_cache import walk_cache
+from test_helpers import generate_random_commands
+
+
+class TestCommandPeriodicity(unittest.TestCase):
+    def setUp(self) -> None:
+        walk_cache.clear()
+
+    def test_find_period(self):
+        block = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+            {"direction": "east", "steps": 2},
+            {"direction": "south", "steps": 1},
+        ]
+
+        self.assertEqual(find_period(block * 5), 4)
+        self.assertEqual(find_period(block * 5 + block[:3]), 4)
+        self.assertEqual(find_period(block), 4)
+        self.assertEqual(find_period([]), 0)
+        self.assertEqual(find_period(block * 5, max_period=3), 20)
+
+    def test_find_period_of_long_blocks(self):
+        block = generate_random_commands(1, 500, 9)
+
+        self.assertEqual(find_period(block * 7 + block[:100]), 500)
+        self.assertEqual(find_period(block * 7 + block[:99] + block[:1]), 3600)
+
+    def test_get_overlap_distance(self):
+        self.assertEqual(get_overlap_distance([0, 0], [10, 10]), 0)
+        self.assertEqual(get_overlap_distance([3, 0], [10, 2]), 3)
+        self.assertEqual(get_overlap_distance([3, 1], [10, 2]), 2)
+
+    def test_not_periodic_walk(self):
+        commands = generate_random_commands(0, 30, 6)
+
+        self.assertIsNone(
+            execute_periodic_walk([0, 0], commands, execute_robot_instructions)
+        )
+
+    def test_matches_naive_robot_on_repeated_blocks(self):
+        for seed in range(300):
+            generator = random.Random(seed)
+            block = generate_random_commands(seed, generator.randint(1, 6), 4)
+            commands = block * generator.randint(1, 40)
+            commands += block[: generator.randint(0, len(block) - 1)]
+
+            result = execute_periodic_walk(
+                [3, -2], commands, execute_robot_instructions
+            )
+            if result is not None:
+                self.assertEqual(
+                    result, execute_naive_robot_instructions([3, -2], commands)
+                )
+
+    def test_walks_only_a_small_part_of_the_commands(self):
+        block = [
+            {"direction": "east", "steps": 5},
+            {"direction": "north", "steps": 1},
+            {"direction": "west", "steps": 4},
+        ]
+        commands = block * 1000 + block[:2]
+        walked = []
+
+        def execute(start_position, commands):
+            walked.append(len(commands))
+            return execute_robot_instructions(start_position, commands)
+
+        result = execute_periodic_walk([0, 0], commands, execute)
+
+        self.assertEqual(result, execute_robot_instructions([0, 0], commands))
+        self.assertEqual(len(walked), 2)
+        self.assertLessEqual(sum(walked) * 4, len(commands))
+
+    def test_short_periodic_walk_is_not_extrapolated(self):
+        block = [
+            {"direction": "east", "steps": 5},
+            {"direction": "north", "steps": 1},
+            {"direction": "west", "steps": 4},
+        ]
+
+        self.assertIsNone(
+            execute_periodic_walk([0, 0], block * 10, execute_robot_instructions)
+        )
+
+    def test_long_periodic_walk_is_extrapolated(self):
+        body = {
+            "start": {"x": 0, "y": 0},
+            "commands": [
+                {"direction": "east", "steps": 1000},
+                {"direction": "north", "steps": 3},
+                {"direction": "west", "steps": 999},
+                {"direction": "south", "steps": 2},
+            ]
+            * 50000,
+        }
+
+        response = parse_body_instruct_robot_generate_response(body)
+
+        self.assertEqual(response["engine"], PERIODIC_ENGINE)
+        self.assertEqual(response["commands"], 200000)
+        self.assertEqual(
+            response["result"],
+            execute_robot_instructions([0, 0], body["commands"]),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import threading
+import psycopg2
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query):
+        if not self.connection.answers:
+            raise psycopg2.OperationalError("server closed the connection")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.answers = True
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connections = []
+
+    def connect(self):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+    def test_opens_min_connections_and_reuses_them(self):
+        pool = ConnectionPool(self.connect, 2, 4)
+        self.assertEqual(len(self.connections), 2)
+
+        for _ in range(5):
+            with pool.connection():
+                pass
+
+        self.assertEqual(len(self.connections), 2)
+        info = pool.info()
+        self.assertEqual(info["checkouts"], 5)
+        self.assertEqual((info["size"], info["idle"], info["in_use"]), (2, 2, 0))
+
+    def test_grows_up_to_max_connections_and_times_out(self):
+        pool = ConnectionPool(self.connect, 0, 2, timeout=0.05)
+        first = pool.getconn()
+        second = pool.getconn()
+
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        pool.putconn(second)
+        self.assertEqual(pool.info()["timeouts"], 1)
+        self.assertEqual(len(self.connections), 2)
+
+    def test_waiting_checkout_gets_the_connection_given_back(self):
+        pool = ConnectionPool(self.connect, 1, 1, timeout=5)
+        connection = pool.getconn()
+        checked_out = []
+        waiter = threading.Thread(target=lambda: checked_out.append(pool.getconn()))
+        waiter.start()
+
+        pool.putconn(connection)
+        waiter.join()
+
+        self.assertEqual(checked_out, [connection])
+        self.assertEqual(pool.info()["waits"], 1)
+
+    def test_closed_connection_is_replaced_on_checkout(self):
+        pool = ConnectionPool(self.connect, 1, 1)
+        self.connections[0].closed = 2
+
+        with pool.connection() as connection:
+            self.assertIs(connection, self.connections[1])
+
+        self.assertEqual(pool.info()["reconnects"], 1)
+
+    def test_idle_connection_failing_health_check_is_replaced(self):
+        pool = ConnectionPool(self.connect, 1, 1, health_check_idle=0)
+        self.connections[0].answers = False
+
+        with pool.connection() as connection:
+            self.assertIs(connection, self.connections[1])
+
+        self.assertEqual(self.connections[0].closed, 1)
+
+    def test_connection_broken_while_in_use_is_discarded(self):
+        pool = ConnectionPool(self.connect, 0, 1)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            with pool.connection():
+                raise psycopg2.OperationalError("server closed the connection")
+
+        self.assertEqual(self.connections[0].closed, 1)
+        self.assertEqual(pool.info()["size"], 0)
+        with pool.connection() as connection:
+            self.assertIs(connection, self.connections[1])
+
+    def test_failed_connect_frees_its_slot(self):
+        def connect():
+            raise psycopg2.OperationalError("could not connect to server")
+
+        pool = ConnectionPool(connect, 0, 1)
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.getconn()
+        self.assertEqual(pool.info()["size"], 0)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.connect, 3, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
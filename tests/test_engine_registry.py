@@ -0,0 +1,205 @@
+import unittest
+from engine_registry import (
+    ENGINES,
+    parse_body_instruct_robot_generate_response,
+    register_engine,
+    get_engine,
+    compute_walk_statistics,
+    select_engine,
+)
+from walk_cache import walk_cache
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestEngineRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        walk_cache.clear()
+
+    def test_parse_body_instruct_robot_generate_response(self):
+        body = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ],
+        }
+
+        response = parse_body_instruct_robot_generate_response(body)
+
+        self.assertIn("timestamp", response)
+        self.assertIn("duration", response)
+        self.assertEqual(response["result"], 4)
+        self.assertEqual(response["commands"], 2)
+        self.assertIn(response["engine"], ENGINES)
+
+    def test_parse_body_instruct_robot_generate_response_with_engine(self):
+        body = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ],
+        }
+
+        response = parse_body_instruct_robot_generate_response(body, "sweep_line")
+
+        self.assertEqual(response["result"], 4)
+        self.assertEqual(response["engine"], "sweep_line")
+
+    def test_parse_body_instruct_robot_generate_response_approximate(self):
+        body = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ],
+        }
+
+        response = parse_body_instruct_robot_generate_response(body, mode="approximate")
+
+        self.assertEqual(response["result"], 4)
+        self.assertEqual(response["engine"], "approximate")
+        self.assertTrue(response["approximate"])
+        self.assertEqual(response["relative_error"], 0.0)
+
+    def test_parse_body_instruct_robot_generate_response_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            parse_body_instruct_robot_generate_response(
+                {"start": {"x": 0, "y": 0}, "commands": []}, mode="fast"
+            )
+
+    def test_engines_agree_on_random_walks(self):
+        for seed in range(50):
+            body = {
+                "start": {"x": 3, "y": -2},
+                "commands": generate_random_commands(seed, 30, 6),
+            }
+            results = {
+                name: parse_body_instruct_robot_generate_response(body, name)["result"]
+                for name in ENGINES
+            }
+            self.assertEqual(len(set(results.values())), 1, results)
+
+    def test_engines_agree_without_commands(self):
+        body = {"start": {"x": 0, "y": 0}, "commands": []}
+
+        for name in ENGINES:
+            self.assertEqual(
+                parse_body_instruct_robot_generate_response(body, name)["result"], 0
+            )
+
+    def test_execute_robot_instructions_extensive(self):
+        response = parse_body_instruct_robot_generate_response(LONG_JSON_BODY)
+
+        self.assertEqual(response["result"], 993737501)
+        self.assertEqual(response["engine"], "sweep_line")
+
+    def test_register_engine(self):
+        register_engine("constant", lambda start_position, commands: 42)
+        try:
+            self.assertEqual(get_engine("constant")([0, 0], []), 42)
+        finally:
+            del ENGINES["constant"]
+
+    def test_get_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            get_engine("unknown")
+
+    def test_compute_walk_statistics(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 5},
+            {"direction": "west", "steps": 4},
+        ]
+
+        self.assertEqual(
+            compute_walk_statistics([0, 0], commands),
+            {
+                "commands": 3,
+                "total_steps": 11,
+                "vertical_steps": 5,
+                "max_steps": 5,
+                "width": 5,
+                "height": 6,
+                "min_coordinate": -2,
+                "max_coordinate": 5,
+            },
+        )
+
+    def test_select_engine(self):
+        small_walk = {
+            "commands": 2,
+            "total_steps": 3,
+            "vertical_steps": 1,
+            "max_steps": 2,
+            "width": 3,
+            "height": 2,
+            "min_coordinate": 0,
+            "max_coordinate": 2,
+        }
+        short_steps_walk = {
+            "commands": 50000,
+            "total_steps": 150000,
+            "vertical_steps": 75000,
+            "max_steps": 5,
+            "width": 500,
+            "height": 500,
+            "min_coordinate": 0,
+            "max_coordinate": 500,
+        }
+        long_steps_walk = {
+            "commands": 5000,
+            "total_steps": 10000000,
+            "vertical_steps": 5000000,
+            "max_steps": 4000,
+            "width": 50000,
+            "height": 50000,
+            "min_coordinate": 0,
+            "max_coordinate": 50000,
+        }
+        dense_walk = {
+            "commands": 2000000,
+            "total_steps": 21000000,
+            "vertical_steps": 10500000,
+            "max_steps": 20,
+            "width": 2000,
+            "height": 2000,
+            "min_coordinate": 0,
+            "max_coordinate": 2000,
+        }
+
+        self.assertEqual(select_engine(small_walk), "encoded_set")
+        self.assertEqual(select_engine(short_steps_walk), "numpy_cells")
+        self.assertEqual(select_engine(long_steps_walk), "sweep_line")
+        self.assertEqual(select_engine(dense_walk), "bitmap")
+
+    def test_walks_beyond_int64_are_not_given_to_numpy(self):
+        commands = generate_random_commands(1, 100, 3)
+        body = {"start": {"x": 2**63, "y": 0}, "commands": commands}
+
+        statistics = compute_walk_statistics([2**63, 0], commands)
+        response = parse_body_instruct_robot_generate_response(body)
+
+        self.assertNotIn(select_engine(statistics), ("numpy_cells", "numpy_segments"))
+        self.assertEqual(
+            response["result"],
+            get_engine("sweep_line")([0, 0], commands),
+        )
+
+    def test_parallel_stripes_are_only_used_when_asked_for(self):
+        long_walk = {
+            "commands": 5000000,
+            "total_steps": 10**12,
+            "vertical_steps": 5 * 10**11,
+            "max_steps": 10**6,
+            "width": 10**8,
+            "height": 10**8,
+            "min_coordinate": 0,
+            "max_coordinate": 10**8,
+        }
+
+        self.assertEqual(select_engine(long_walk), "sweep_line")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 
 LONG_JSON_BODY = {
   "start": {
@@ -40006,4 +40007,15 @@ LONG_JSON_BODY = {
       "steps": 99998
     }
   ]
-}
\ No newline at end of file
+}
+
+
+def generate_random_commands(seed: int, number_of_commands: int, max_steps: int):
+    generator = random.Random(seed)
+    return [
+        {
+            "direction": generator.choice(["east", "west", "north", "south"]),
+            "steps": generator.randint(0, max_steps),
+        }
+        for _ in range(number_of_commands)
+    ]
@@ -0,0 +1,56 @@
+import unittest
+from migrations import (
+    INSERT_APPLIED_VERSION,
+    MIGRATIONS,
+    SELECT_APPLIED_VERSIONS,
+    SQLITE_MIGRATIONS,
+    apply_migrations,
+)
+
+
+class RecordingCursor:
+    def __init__(self, applied_versions):
+        self.applied_versions = applied_versions
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        self.statements.append((statement, parameters))
+        if statement == INSERT_APPLIED_VERSION:
+            self.applied_versions.append(parameters[0])
+
+    def fetchall(self):
+        assert self.statements[-1][0] == SELECT_APPLIED_VERSIONS
+        return [(version,) for version in self.applied_versions]
+
+
+class TestMigrations(unittest.TestCase):
+    def test_versions_are_unique_and_increasing(self):
+        versions = [version for version, _, _ in MIGRATIONS]
+
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_sqlite_has_the_same_migrations(self):
+        self.assertEqual(
+            [(version, name) for version, name, _ in SQLITE_MIGRATIONS],
+            [(version, name) for version, name, _ in MIGRATIONS],
+        )
+
+    def test_applies_every_migration_on_an_empty_database(self):
+        cursor = RecordingCursor([])
+
+        applied = apply_migrations(cursor)
+
+        self.assertEqual(applied, [version for version, _, _ in MIGRATIONS])
+        executed = [statement for statement, _ in cursor.statements]
+        for _, _, statement in MIGRATIONS:
+            self.assertIn(statement, executed)
+
+    def test_applies_only_missing_migrations(self):
+        cursor = RecordingCursor([1])
+
+        self.assertEqual(apply_migrations(cursor), [2, 3, 4])
+        self.assertEqual(apply_migrations(RecordingCursor([1, 2, 3, 4])), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,10 @@ import unittest
 import psycopg2
 import os
 from utils import parse_env_variable
+import record_service
+from storage import MemoryStorage, SQLiteStorage
 from record_service import (
     save_result,
-    try_create_record_table,
     try_insert_record,
     verify_insertion,
 )
@@ -16,6 +17,15 @@ CORRECT_RECORD = {
     "duration": 2.5,
 }
 
+APPROXIMATE_RECORD = {
+    "timestamp": "2023-01-01 12:00:00",
+    "commands": 11,
+    "result": 1,
+    "duration": 2.5,
+    "engine": "approximate",
+    "approximate": True,
+}
+
 INCORRECT_RECORD = {
     "commands": 10,
     "result": 1,
@@ -23,7 +33,15 @@ INCORRECT_RECORD = {
 }
 
 
+@unittest.skipUnless(
+    os.getenv("DATABASE_URL") and record_service.storage.name == "postgres",
+    "needs a PostgreSQL database in DATABASE_URL",
+)
 class TestYourModule(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        record_service.storage.migrate()
+
     def setUp(self) -> None:
         url = os.getenv("DATABASE_URL")
         self.url = parse_env_variable(url)
@@ -43,6 +61,14 @@ class TestYourModule(unittest.TestCase):
         self.assertEqual(result[1], 201)
         self.assertIn("id", result[0])
 
+    def test_save_result_approximate(self):
+        result = save_result(APPROXIMATE_RECORD)
+
+        id = result[0]["id"]
+        self.deleteInsertedRecord(id)
+        self.assertEqual(result[1], 201)
+        self.assertTrue(result[0]["Approximate"])
+
     def test_save_result_failure(self):
         with self.assertRaises(Exception) as context:
             save_result(INCORRECT_RECORD)
@@ -52,7 +78,6 @@ class TestYourModule(unittest.TestCase):
     def test_insert_record_correct(self):
         with self.connection as connection:
             with connection.cursor() as cursor:
-                try_create_record_table(cursor)
                 try_insert_record(cursor, CORRECT_RECORD)
                 result = verify_insertion(cursor)
 
@@ -70,5 +95,43 @@ class TestYourModule(unittest.TestCase):
         self.assertEqual(str(context.exception), "'timestamp'")
 
 
+class TestSaveResultWithoutDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.storage = record_service.storage
+
+    def tearDown(self) -> None:
+        record_service.storage.close()
+        record_service.storage = self.storage
+
+    def test_save_result_in_memory(self):
+        record_service.storage = MemoryStorage()
+
+        first = save_result(CORRECT_RECORD)
+        second = save_result(APPROXIMATE_RECORD)
+
+        self.assertEqual(first[1], 201)
+        self.assertEqual((first[0]["id"], second[0]["id"]), (1, 2))
+        self.assertFalse(first[0]["Approximate"])
+        self.assertTrue(second[0]["Approximate"])
+
+    def test_save_result_in_sqlite(self):
+        record_service.storage = SQLiteStorage(":memory:")
+
+        result = save_result(APPROXIMATE_RECORD)
+
+        self.assertEqual(result[1], 201)
+        self.assertEqual(result[0]["id"], 1)
+        self.assertEqual(result[0]["Result"], 1)
+        self.assertTrue(result[0]["Approximate"])
+
+    def test_save_result_failure(self):
+        record_service.storage = MemoryStorage()
+
+        with self.assertRaises(Exception) as context:
+            save_result(INCORRECT_RECORD)
+        self.assertEqual(str(context.exception), "'timestamp'")
+        self.assertEqual(record_service.storage.info()["records"], 0)
+
+
 if __name__ == "__main__":
     unittest.main()
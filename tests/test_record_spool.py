@@ -0,0 +1,162 @@
+import unittest
+import os
+import tempfile
+import threading
+import psycopg2
+from record_spool import RecordSpool, SpoolLockedError, read_offset
+
+
+class TestRecordSpool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "records.spool")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_appended_records_are_replayed(self):
+        batches = []
+        spool = RecordSpool(self.path, batches.append, fsync_interval=0)
+        for result in range(5):
+            spool.append({"result": result})
+
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(
+            [record["result"] for batch in batches for record in batch],
+            list(range(5)),
+        )
+        self.assertEqual(read_offset(self.path + ".offset"), os.path.getsize(self.path))
+
+    def test_concurrent_appends_share_fsyncs(self):
+        spool = RecordSpool(self.path, lambda batch: None, fsync_interval=0.01)
+        threads = [
+            threading.Thread(target=spool.append, args=({"result": result},))
+            for result in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        spool.close()
+
+        info = spool.info()
+        self.assertEqual(info["appended"], 20)
+        self.assertLess(info["fsyncs"], 20)
+
+    def test_records_survive_the_database_being_down(self):
+        database_up = threading.Event()
+        batches = []
+
+        def write_batch(batch):
+            if not database_up.is_set():
+                raise psycopg2.OperationalError("could not connect to server")
+            batches.append(batch)
+
+        spool = RecordSpool(
+            self.path, write_batch, fsync_interval=0, retry_interval=0.01
+        )
+        spool.append({"result": 1})
+        self.assertFalse(spool.wait_until_replayed(0.05))
+        self.assertGreater(spool.info()["replay_failures"], 0)
+
+        database_up.set()
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(batches, [[{"result": 1}]])
+
+    def test_rejected_records_are_dead_lettered(self):
+        database_up = threading.Event()
+        batches = []
+
+        def write_batch(batch):
+            if not database_up.is_set():
+                raise psycopg2.OperationalError("could not connect to server")
+            if any(record["result"] >= 2**31 for record in batch):
+                raise psycopg2.DataError("integer out of range")
+            batches.append(batch)
+
+        spool = RecordSpool(
+            self.path, write_batch, fsync_interval=0, retry_interval=0.01
+        )
+        for result in [1, 2, 2**40, 3, 4, 5]:
+            spool.append({"result": result})
+        # The records are replayed together once the database is up.
+        database_up.set()
+
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(
+            [record["result"] for batch in batches for record in batch],
+            [1, 2, 3, 4, 5],
+        )
+        with open(self.path + ".dead") as dead_letter_file:
+            self.assertEqual(dead_letter_file.read(), '{"result":1099511627776}\n')
+        self.assertEqual(spool.info()["dead_letters"], 1)
+        self.assertEqual(spool.info()["replayed"], 5)
+
+    def test_storage_errors_are_retried(self):
+        configured = threading.Event()
+        batches = []
+
+        def write_batch(batch):
+            if not configured.is_set():
+                raise ValueError("DATABASE_URL is not set")
+            batches.append(batch)
+
+        spool = RecordSpool(
+            self.path, write_batch, fsync_interval=0, retry_interval=0.01
+        )
+        for result in range(4):
+            spool.append({"result": result})
+        self.assertFalse(spool.wait_until_replayed(0.05))
+
+        configured.set()
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(sum(len(batch) for batch in batches), 4)
+        self.assertFalse(os.path.exists(self.path + ".dead"))
+        self.assertEqual(spool.info()["dead_letters"], 0)
+
+    def test_a_spool_file_is_used_by_one_spool_at_a_time(self):
+        spool = RecordSpool(self.path, lambda batch: None, fsync_interval=0)
+
+        with self.assertRaises(SpoolLockedError):
+            RecordSpool(self.path, lambda batch: None, fsync_interval=0)
+
+        spool.close()
+        RecordSpool(self.path, lambda batch: None, fsync_interval=0).close()
+
+    def test_pending_records_are_replayed_after_a_restart(self):
+        def write_batch(batch):
+            raise psycopg2.OperationalError("could not connect to server")
+
+        spool = RecordSpool(self.path, write_batch, fsync_interval=0, retry_interval=10)
+        spool.append({"result": 1})
+        spool.append({"result": 2})
+        spool.close(timeout=0.1)
+        # A crash in the middle of an append leaves a partial line behind.
+        with open(self.path, "ab") as spool_file:
+            spool_file.write(b'{"result":')
+
+        batches = []
+        spool = RecordSpool(self.path, batches.append, fsync_interval=0)
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(batches, [[{"result": 1}, {"result": 2}]])
+
+    def test_replayed_spool_is_compacted(self):
+        spool = RecordSpool(
+            self.path, lambda batch: None, fsync_interval=0, compact_size=1
+        )
+        spool.append({"result": 1})
+
+        self.assertTrue(spool.wait_until_replayed(5))
+        spool.close()
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertEqual(read_offset(self.path + ".offset"), 0)
+        self.assertEqual(spool.info()["compactions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
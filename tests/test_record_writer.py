@@ -0,0 +1,165 @@
+import unittest
+import threading
+import psycopg2
+from record_writer import (
+    MAX_WRITE_ATTEMPTS,
+    BatchedRecordWriter,
+    RecordQueueFullError,
+)
+
+
+class TestBatchedRecordWriter(unittest.TestCase):
+    def test_writes_full_batches(self):
+        batches = []
+        writer = BatchedRecordWriter(batches.append, batch_size=10, flush_interval=0.5)
+        for result in range(25):
+            writer.submit({"result": result})
+        writer.close()
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(
+            [record["result"] for batch in batches for record in batch],
+            list(range(25)),
+        )
+
+    def test_flushes_partial_batches_after_the_interval(self):
+        batches = []
+        writer = BatchedRecordWriter(
+            batches.append, batch_size=100, flush_interval=0.01
+        )
+        writer.submit({"result": 1})
+        writer.flush()
+
+        self.assertEqual(batches, [[{"result": 1}]])
+        info = writer.info()
+        self.assertEqual((info["flushes"], info["flushed_records"]), (1, 1))
+        self.assertEqual(info["queued"], 0)
+        writer.close()
+
+    def test_full_queue_rejects_records(self):
+        release = threading.Event()
+        writer = BatchedRecordWriter(
+            lambda batch: release.wait(),
+            batch_size=1,
+            flush_interval=0.01,
+            queue_size=1,
+            submit_timeout=0.05,
+        )
+        writer.submit({"result": 1})
+        # The first record may already be taken by the writer, filling the
+        # queue takes one more at most.
+        with self.assertRaises(RecordQueueFullError):
+            for result in range(3):
+                writer.submit({"result": result})
+
+        release.set()
+        writer.close()
+        self.assertEqual(writer.info()["rejected"], 1)
+
+    def test_batches_are_retried_while_the_database_is_down(self):
+        attempts = []
+
+        def write_batch(batch):
+            attempts.append(batch)
+            if len(attempts) < 3:
+                raise psycopg2.OperationalError("could not connect to server")
+
+        writer = BatchedRecordWriter(
+            write_batch, batch_size=1, flush_interval=0.01, retry_backoff=0.01
+        )
+        writer.submit({"result": 1})
+        writer.close()
+
+        info = writer.info()
+        self.assertEqual(info["flushed_records"], 1)
+        self.assertEqual(info["failed_flushes"], 2)
+        self.assertEqual(info["dropped_records"], 0)
+
+    def test_batches_are_dropped_when_the_database_stays_down(self):
+        def write_batch(batch):
+            raise psycopg2.OperationalError("could not connect to server")
+
+        writer = BatchedRecordWriter(
+            write_batch, batch_size=2, flush_interval=0.01, retry_backoff=0.001
+        )
+        writer.submit({"result": 1})
+        writer.submit({"result": 2})
+        writer.close()
+
+        info = writer.info()
+        self.assertEqual(info["failed_flushes"], MAX_WRITE_ATTEMPTS)
+        self.assertEqual(info["dropped_records"], 2)
+
+    def test_batches_failing_outside_the_records_are_retried_whole(self):
+        attempts = []
+
+        def write_batch(batch):
+            attempts.append(len(batch))
+            if len(attempts) < 3:
+                raise ValueError("DATABASE_URL is not set")
+
+        writer = BatchedRecordWriter(
+            write_batch, batch_size=2, flush_interval=0.05, retry_backoff=0.01
+        )
+        writer.submit({"result": 1})
+        writer.submit({"result": 2})
+        writer.close()
+
+        self.assertEqual(attempts, [2, 2, 2])
+        info = writer.info()
+        self.assertEqual(info["flushed_records"], 2)
+        self.assertEqual(info["dropped_records"], 0)
+
+    def test_only_rejected_records_are_dropped(self):
+        release = threading.Event()
+        written = []
+
+        def write_batch(batch):
+            release.wait()
+            if any(record["result"] == "invalid" for record in batch):
+                raise psycopg2.DataError("invalid input syntax")
+            written.extend(batch)
+
+        writer = BatchedRecordWriter(write_batch, batch_size=10, flush_interval=0.05)
+        for result in [1, 2, "invalid", 3]:
+            writer.submit({"result": result})
+        release.set()
+        writer.close()
+
+        self.assertEqual([record["result"] for record in written], [1, 2, 3])
+        info = writer.info()
+        self.assertEqual(info["flushed_records"], 3)
+        self.assertEqual(info["dropped_records"], 1)
+
+    def test_records_submitted_while_closing_are_written(self):
+        written = []
+        writer = BatchedRecordWriter(
+            lambda batch: written.extend(batch), batch_size=7, flush_interval=0.001
+        )
+
+        def submit_until_closed():
+            try:
+                while True:
+                    writer.submit({"result": 1})
+            except RuntimeError:
+                pass
+
+        threads = [threading.Thread(target=submit_until_closed) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        writer.close()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(written), writer.info()["submitted"])
+
+    def test_closed_writer_rejects_records(self):
+        writer = BatchedRecordWriter(lambda batch: None)
+        writer.close()
+
+        with self.assertRaises(RuntimeError):
+            writer.submit({"result": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
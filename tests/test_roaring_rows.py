@@ -0,0 +1,90 @@
+import unittest
+import random
+from roaring_rows import (
+    ARRAY_MAX_VALUES,
+    CHUNK_SIZE,
+    ArrayContainer,
+    BitmapContainer,
+    RoaringRows,
+    RunContainer,
+)
+
+
+class TestRoaringRows(unittest.TestCase):
+    def test_matches_a_set_of_locations(self):
+        generator = random.Random(7)
+        rows = RoaringRows()
+        locations = set()
+        for _ in range(500):
+            start = generator.randint(-2 * CHUNK_SIZE, 2 * CHUNK_SIZE)
+            end = start + generator.choice([0, 1, 5, 100, CHUNK_SIZE])
+            fixed = generator.randint(-3, 3)
+            if generator.random() < 0.5:
+                rows.add_horizontal_run(fixed, start, end)
+                locations |= {(x, fixed) for x in range(start, end + 1)}
+            else:
+                end = start + generator.randint(0, 20)
+                rows.add_vertical_run(start, fixed, fixed + end - start)
+                locations |= {(start, y) for y in range(fixed, fixed + end - start + 1)}
+            self.assertEqual(len(rows), len(locations))
+
+        self.assertEqual(len(rows), len(locations))
+        rows.optimize()
+        self.assertEqual(len(rows), len(locations))
+
+    def test_runs_of_a_row_span_chunks(self):
+        rows = RoaringRows()
+
+        rows.add_horizontal_run(0, -1, CHUNK_SIZE)
+
+        self.assertEqual(len(rows), CHUNK_SIZE + 2)
+        self.assertEqual(sorted(rows.rows[0]), [-1, 0, 1])
+        self.assertEqual(rows.get_size(), 8)
+
+    def test_scattered_locations_become_an_array_then_a_bitmap(self):
+        rows = RoaringRows()
+        for x in range(0, 2 * ARRAY_MAX_VALUES, 2):
+            rows.add_vertical_run(x, 0, 0)
+        self.assertIsInstance(rows.rows[0][0], ArrayContainer)
+
+        rows.add_vertical_run(2 * ARRAY_MAX_VALUES, 0, 0)
+        self.assertIsInstance(rows.rows[0][0], BitmapContainer)
+        self.assertEqual(len(rows), ARRAY_MAX_VALUES + 1)
+
+    def test_filled_bitmap_becomes_runs(self):
+        rows = RoaringRows()
+        for x in range(0, 2 * ARRAY_MAX_VALUES + 2, 2):
+            rows.add_vertical_run(x, 0, 0)
+
+        rows.add_horizontal_run(0, 0, CHUNK_SIZE - 1)
+
+        self.assertEqual(len(rows), CHUNK_SIZE)
+        self.assertIsInstance(rows.rows[0][0], RunContainer)
+        self.assertEqual(rows.get_size(), 4)
+
+    def test_runs_across_the_rows_are_kept_in_columns(self):
+        rows = RoaringRows()
+        rows.add_horizontal_run(0, -5, 5)
+        rows.add_horizontal_run(CHUNK_SIZE, -5, 5)
+        rows.add_vertical_run(3, -CHUNK_SIZE, 2 * CHUNK_SIZE - 1)
+
+        self.assertEqual(sorted(rows.rows), [0, CHUNK_SIZE])
+        self.assertEqual(rows.get_size(), 2 * 8 + 3 * 4)
+        self.assertEqual(len(rows), 2 * 11 + 3 * CHUNK_SIZE - 2)
+
+    def test_bitmap_runs_round_trip(self):
+        bitmap = BitmapContainer()
+        for start, end in [(0, 0), (3, 9), (100, 65535)]:
+            bitmap.add_range(start, end)
+
+        runs = bitmap.to_runs()
+
+        self.assertEqual(
+            list(zip(runs.starts, runs.ends)), [(0, 0), (3, 9), (100, 65535)]
+        )
+        self.assertEqual(runs.cardinality, bitmap.cardinality)
+        self.assertEqual(runs.to_bitmap().bits, bitmap.bits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,8 +8,10 @@ from robot_service import (
     update_position,
     generate_trajectory,
     generate_trajectory_2,
+    execute_robot_instructions_encoded,
+    get_bounding_box,
 )
-from test_helpers import LONG_JSON_BODY
+from test_helpers import LONG_JSON_BODY, generate_random_commands
 
 
 class TestRobotMovement(unittest.TestCase):
@@ -186,6 +188,37 @@ class TestRobotMovement(unittest.TestCase):
         result = generate_trajectory_2(current_position, command)
         self.assertEqual(result, [(0, 0), (0, 1), (0, 2)])
 
+    def test_execute_robot_instructions_encoded(self):
+        start_position = [10, 22]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+            {"direction": "south", "steps": 1},
+            {"direction": "west", "steps": 3},
+            {"direction": "north", "steps": 10},
+        ]
+
+        self.assertEqual(
+            execute_robot_instructions_encoded(start_position, commands), 15
+        )
+
+    def test_execute_robot_instructions_encoded_matches_tuples(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions_encoded([3, -2], commands),
+                execute_robot_instructions([3, -2], commands),
+            )
+
+    def test_get_bounding_box(self):
+        commands = [
+            {"direction": "west", "steps": 2},
+            {"direction": "north", "steps": 3},
+            {"direction": "east", "steps": 5},
+        ]
+
+        self.assertEqual(get_bounding_box([0, 0], commands), (-2, 0, 3, 3))
+
 
 if __name__ == "__main__":
     unittest.main()
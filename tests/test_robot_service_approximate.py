@@ -0,0 +1,116 @@
+import unittest
+import numpy as np
+from robot_service_approximate import (
+    estimate_robot_instructions,
+    choose_sampled_rows,
+    cut_vertical_trajectories,
+)
+from robot_service_sweep_line import execute_robot_instructions
+from test_helpers import generate_random_commands
+
+
+class TestRobotMovementApproximate(unittest.TestCase):
+    def test_estimate_robot_instructions(self):
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        self.assertEqual(estimate_robot_instructions([0, 0], commands), (4, 0.0))
+
+    def test_estimate_without_commands(self):
+        self.assertEqual(estimate_robot_instructions([0, 0], []), (0, 0.0))
+
+    def test_exact_when_every_row_is_sampled(self):
+        for seed in range(50):
+            commands = generate_random_commands(seed, 40, 6)
+            self.assertEqual(
+                estimate_robot_instructions([3, -2], commands),
+                (execute_robot_instructions([3, -2], commands), 0.0),
+            )
+
+    def test_estimates_are_within_their_bound(self):
+        misses = 0
+        for seed in range(60):
+            commands = generate_random_commands(seed, 3000, 300)
+            estimate, relative_error = estimate_robot_instructions(
+                [0, 0], commands, sampled_rows=256
+            )
+            result = execute_robot_instructions([0, 0], commands)
+            self.assertGreater(relative_error, 0.0)
+            if abs(estimate - result) > relative_error * estimate:
+                misses += 1
+
+        # The bound holds with a confidence of about 95%, a little less on random
+        # walks, whose few rows with horizontal moves make the counts skewed.
+        self.assertLessEqual(misses, 6)
+
+    def assertWithinBound(self, commands, sampled_rows):
+        estimate, relative_error = estimate_robot_instructions(
+            [0, 0], commands, sampled_rows=sampled_rows
+        )
+        result = execute_robot_instructions([0, 0], commands)
+
+        self.assertGreater(relative_error, 0.0)
+        self.assertLessEqual(abs(estimate - result), relative_error * estimate)
+
+    def test_walk_going_up_and_down_the_same_rows(self):
+        commands = [
+            {"direction": "north", "steps": 10},
+            {"direction": "south", "steps": 10},
+        ] * 1000
+
+        estimate, relative_error = estimate_robot_instructions(
+            [0, 0], commands, sampled_rows=2
+        )
+
+        # Every row is the same, which must not be taken for an exact count.
+        self.assertEqual(estimate, 11)
+        self.assertGreater(relative_error, 0.0)
+
+    def test_zig_zag_is_within_its_bound(self):
+        commands = [
+            {"direction": "north", "steps": 1000},
+            {"direction": "east", "steps": 1},
+            {"direction": "south", "steps": 1000},
+            {"direction": "east", "steps": 1},
+        ] * 500
+
+        for sampled_rows in (2, 7, 64, 333):
+            self.assertWithinBound(commands, sampled_rows)
+
+    def test_spiral_is_within_its_bound(self):
+        commands = []
+        for turn in range(1, 300):
+            commands += [
+                {"direction": "east", "steps": 2 * turn},
+                {"direction": "north", "steps": 2 * turn},
+                {"direction": "west", "steps": 2 * turn + 1},
+                {"direction": "south", "steps": 2 * turn + 1},
+            ]
+
+        for sampled_rows in (2, 7, 64, 333):
+            self.assertWithinBound(commands, sampled_rows)
+
+    def test_sampled_rows_stay_in_their_stratum(self):
+        strata = np.arange(15)
+
+        rows = choose_sampled_rows(strata, 7, 100)
+
+        np.testing.assert_array_equal(rows // 7, strata)
+        np.testing.assert_array_equal(rows, choose_sampled_rows(strata, 7, 100))
+        # The last stratum only has the rows 98 and 99.
+        self.assertIn(rows[-1], (98, 99))
+
+    def test_cut_vertical_trajectories(self):
+        rows, columns = cut_vertical_trajectories(
+            np.array([3]), np.array([0]), np.array([40]), 10, 41
+        )
+
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(np.all((rows >= 0) & (rows <= 40)))
+        self.assertTrue(np.all(columns == 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_bitmap import execute_robot_instructions, count_bits
+from test_helpers import generate_random_commands
+
+
+class TestRobotMovementBitmap(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 40, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_transposes_mostly_vertical_walks(self):
+        commands = [
+            {"direction": "north", "steps": 100000},
+            {"direction": "east", "steps": 1},
+            {"direction": "south", "steps": 100000},
+        ]
+
+        self.assertEqual(execute_robot_instructions([-5, 7], commands), 200002)
+
+    def test_count_bits(self):
+        self.assertEqual(count_bits(0), 0)
+        self.assertEqual(count_bits(0b1011), 3)
+        self.assertEqual(count_bits((1 << 1000) - 1), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
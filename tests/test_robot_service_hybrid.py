@@ -0,0 +1,62 @@
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_hybrid import (
+    execute_robot_instructions,
+    choose_step_threshold,
+    count_uncovered,
+)
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestRobotMovementHybrid(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_execute_robot_instructions_extensive(self):
+        self.assertEqual(
+            execute_robot_instructions([-100000, -100000], LONG_JSON_BODY["commands"]),
+            993737501,
+        )
+
+    def test_matches_naive_robot_for_every_threshold(self):
+        for seed in range(50):
+            commands = generate_random_commands(seed, 40, 6)
+            expected = execute_naive_robot_instructions([3, -2], commands)
+            for threshold in (-1, 0, 2, 4, None, 6):
+                self.assertEqual(
+                    execute_robot_instructions([3, -2], commands, threshold), expected
+                )
+
+    def test_jitter_around_long_moves(self):
+        commands = []
+        for seed in range(5):
+            commands += generate_random_commands(seed, 200, 3)
+            commands.append({"direction": "east", "steps": 5000})
+
+        self.assertEqual(
+            execute_robot_instructions([0, 0], commands),
+            execute_naive_robot_instructions([0, 0], commands),
+        )
+
+    def test_choose_step_threshold(self):
+        self.assertEqual(choose_step_threshold([1, 2, 1, 3, 100000, 2, 150000]), 3)
+        self.assertEqual(choose_step_threshold([100000, 200000]), -1)
+        self.assertEqual(choose_step_threshold([1, 1, 1]), 1)
+        self.assertEqual(choose_step_threshold([]), -1)
+
+    def test_count_uncovered(self):
+        self.assertEqual(
+            count_uncovered({0, 1, 2}, 3, 0, 0, {1: ([0], [5])}, {0: ([2], [2])}), 1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_numpy import (
+    parse_body_instruct_robot_generate_response,
+    execute_robot_instructions,
+    merge_trajectories,
+)
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestRobotMovementNumpy(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_execute_robot_instructions_extensive(self):
+        self.assertEqual(
+            parse_body_instruct_robot_generate_response(LONG_JSON_BODY)["result"],
+            993737501,
+        )
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands, block_size=16),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_merge_trajectories(self):
+        rows, starts, ends = merge_trajectories(
+            np.array([5, 5, 1, 5]), np.array([4, 0, 0, 9]), np.array([6, 4, 1, 9])
+        )
+
+        self.assertEqual(rows.tolist(), [1, 5, 5])
+        self.assertEqual(starts.tolist(), [0, 0, 9])
+        self.assertEqual(ends.tolist(), [1, 6, 9])
+
+    def test_execute_robot_instructions_out_of_int64_range(self):
+        with self.assertRaises(ValueError):
+            execute_robot_instructions(
+                [2**62, 0], [{"direction": "east", "steps": 1}]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
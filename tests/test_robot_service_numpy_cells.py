@@ -0,0 +1,68 @@
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_numpy_cells import (
+    parse_body_instruct_robot_generate_response,
+    execute_robot_instructions,
+)
+from test_helpers import generate_random_commands
+
+
+class TestRobotMovementNumpyCells(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_parse_and_instruct_robot_long_distance(self):
+        JSON_BODY = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+                {"direction": "south", "steps": 1},
+                {"direction": "west", "steps": 3},
+                {"direction": "north", "steps": 10},
+                {"direction": "south", "steps": 10},
+                {"direction": "west", "steps": 10},
+                {"direction": "north", "steps": 1},
+                {"direction": "east", "steps": 10},
+            ],
+        }
+        self.assertEqual(
+            parse_body_instruct_robot_generate_response(JSON_BODY)["result"], 35
+        )
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(100):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_matches_naive_robot_when_spilling_to_disk(self):
+        for seed in range(100):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands, memory_budget=7),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_execute_robot_instructions_out_of_int64_range(self):
+        commands = [
+            {"direction": "east", "steps": 2**40},
+            {"direction": "north", "steps": 2**40},
+        ]
+
+        with self.assertRaises(ValueError):
+            execute_robot_instructions([0, 0], commands)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_parallel import (
+    execute_robot_instructions,
+    choose_stripe_boundaries,
+    count_shared_stripe,
+    select_stripe,
+)
+from shared_segments import (
+    attach_shared_table,
+    create_shared_table,
+    release_shared_table,
+)
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestRobotMovementParallel(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands, workers=2)
+
+        self.assertEqual(result, 4)
+
+    def test_execute_robot_instructions_extensive(self):
+        self.assertEqual(
+            execute_robot_instructions(
+                [-100000, -100000], LONG_JSON_BODY["commands"], workers=3
+            ),
+            993737501,
+        )
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(30):
+            commands = generate_random_commands(seed, 40, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands, workers=2),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_choose_stripe_boundaries(self):
+        table = {
+            "line": np.arange(8),
+            "start": np.zeros(8, dtype=np.int64),
+            "end": np.ones(8, dtype=np.int64),
+            "parallel": np.ones(8, dtype=np.int64),
+        }
+
+        self.assertEqual(choose_stripe_boundaries(table, 4), [2, 4, 6])
+        self.assertEqual(
+            choose_stripe_boundaries(dict(table, line=np.full(8, 5)), 4), []
+        )
+
+    def test_select_stripe_clips_perpendicular_trajectories(self):
+        table = {
+            "line": np.array([0, 5, 2]),
+            "start": np.array([0, 0, 0]),
+            "end": np.array([4, 4, 9]),
+            "parallel": np.array([1, 1, 0]),
+        }
+
+        self.assertEqual(select_stripe(table, None, 2), ({0: [[0, 4]]}, {2: [[0, 2]]}))
+        self.assertEqual(select_stripe(table, 3, 6), ({5: [[0, 4]]}, {2: [[3, 6]]}))
+        self.assertEqual(select_stripe(table, 7, None), ({}, {2: [[7, 9]]}))
+
+    def test_count_shared_stripe_writes_to_shared_output(self):
+        table_block, table = create_shared_table(
+            {
+                "line": np.array([0, 5, 2]),
+                "start": np.array([0, 0, 0]),
+                "end": np.array([4, 4, 9]),
+                "parallel": np.array([1, 1, 0]),
+            },
+            3,
+        )
+        output_block, output = create_shared_table({"count": None}, 2)
+        try:
+            count_shared_stripe((table, output, 1, 3, None))
+
+            attached, counts = attach_shared_table(output)
+            self.assertEqual(counts["count"].tolist(), [0, 11])
+            del counts
+            attached.close()
+        finally:
+            release_shared_table(table_block)
+            release_shared_table(output_block)
+
+    def test_falls_back_for_coordinates_too_large_for_int64(self):
+        commands = [
+            {"direction": "east", "steps": 2**63},
+            {"direction": "north", "steps": 1},
+        ]
+
+        self.assertEqual(
+            execute_robot_instructions([0, 0], commands, workers=2), 2**63 + 2
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
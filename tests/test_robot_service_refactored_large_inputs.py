@@ -4,8 +4,10 @@ from robot_service_refactored_for_large_inputs import (
     parse_body_instruct_robot_generate_response,
     parse_body,
     execute_robot_instructions,
+    add_interval_to_lines,
 )
-from test_helpers import LONG_JSON_BODY
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from test_helpers import LONG_JSON_BODY, generate_random_commands
 
 
 class TestRobotMovementRefactor(unittest.TestCase):
@@ -139,6 +141,57 @@ class TestRobotMovementRefactor(unittest.TestCase):
             parse_body_instruct_robot_generate_response(JSON_BODY)["result"], 300005
         )
 
+    def test_parse_and_instruct_robot_retraced_corridor(self):
+        JSON_BODY = {
+            "start": {"x": 0, "y": 0},
+            "commands": [
+                {"direction": "east", "steps": 100000},
+                {"direction": "west", "steps": 100000},
+            ]
+            * 50,
+        }
+        self.assertEqual(
+            parse_body_instruct_robot_generate_response(JSON_BODY)["result"], 100001
+        )
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_spatial_index_matches_naive_robot(self):
+        for seed in range(100):
+            commands = generate_random_commands(seed, 60, 6)
+            commands += generate_random_commands(seed, 5, 300)
+            for spatial_index in (False, True):
+                self.assertEqual(
+                    execute_robot_instructions([3, -2], commands, spatial_index),
+                    execute_naive_robot_instructions([3, -2], commands),
+                )
+
+    def test_execute_robot_instructions_beyond_int64(self):
+        commands = [
+            {"direction": "east", "steps": 2**64},
+            {"direction": "north", "steps": 1},
+            {"direction": "west", "steps": 2**64},
+            {"direction": "south", "steps": 1},
+        ]
+
+        self.assertEqual(execute_robot_instructions([0, 0], commands), 2**65 + 2)
+
+    def test_add_interval_to_lines(self):
+        lines = {}
+
+        self.assertEqual(add_interval_to_lines(lines, 7, 0, 10), 11)
+        self.assertEqual(add_interval_to_lines(lines, 7, 20, 30), 11)
+        self.assertEqual(add_interval_to_lines(lines, 7, 5, 25), 9)
+        self.assertEqual(add_interval_to_lines(lines, 7, 31, 31), 1)
+        self.assertEqual(add_interval_to_lines(lines, 8, 0, 0), 1)
+        self.assertEqual(lines, {7: [[0], [31]], 8: [[0], [0]]})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import tracemalloc
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_roaring import execute_robot_instructions
+from test_helpers import generate_random_commands
+
+
+class TestRobotMovementRoaring(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 40, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_long_moves_across_chunks(self):
+        commands = [
+            {"direction": "west", "steps": 500000},
+            {"direction": "north", "steps": 1},
+            {"direction": "east", "steps": 1000000},
+            {"direction": "south", "steps": 1},
+        ]
+
+        self.assertEqual(execute_robot_instructions([0, 0], commands), 1500003)
+
+    def test_long_moves_across_the_rows_take_little_memory(self):
+        # The final move along the row keeps the walk from being transposed, so
+        # the moves across go through 100001 rows each.
+        commands = [
+            {"direction": direction, "steps": steps}
+            for _ in range(5)
+            for direction, steps in [
+                ("north", 100000),
+                ("east", 3),
+                ("south", 100000),
+                ("east", 3),
+            ]
+        ] + [{"direction": "east", "steps": 2000000}]
+
+        tracemalloc.start()
+        try:
+            result = execute_robot_instructions([0, 0], commands)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(result, 10 * 100001 + 9 * 2 + 3 + 2000000)
+        self.assertLess(peak, 2**20)
+
+
+if __name__ == "__main__":
+    unittest.main()
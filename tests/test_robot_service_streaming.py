@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_streaming import (
+    execute_robot_instructions,
+    execute_robot_instructions_async,
+    create_walk_state,
+    walk_command,
+)
+from test_helpers import generate_random_commands
+
+
+class TestRobotMovementStreaming(unittest.TestCase):
+    def test_execute_robot_instructions_from_generator(self):
+        commands = (
+            {"direction": direction, "steps": 2}
+            for direction in ["east", "north", "west", "south"]
+        )
+
+        self.assertEqual(execute_robot_instructions([0, 0], commands), 8)
+
+    def test_execute_robot_instructions_async(self):
+        async def generate_commands():
+            for direction in ["east", "north", "west", "south"]:
+                yield {"direction": direction, "steps": 2}
+
+        result = asyncio.run(
+            execute_robot_instructions_async([0, 0], generate_commands())
+        )
+
+        self.assertEqual(result, 8)
+
+    def test_execute_robot_instructions_no_commands(self):
+        self.assertEqual(execute_robot_instructions([0, 0], iter([])), 0)
+
+    def test_walk_command_running_count(self):
+        state = create_walk_state([10, 22])
+
+        self.assertEqual(walk_command(state, {"direction": "east", "steps": 2}), 3)
+        self.assertEqual(walk_command(state, {"direction": "north", "steps": 1}), 1)
+        self.assertEqual(walk_command(state, {"direction": "south", "steps": 1}), 0)
+        self.assertEqual(walk_command(state, {"direction": "west", "steps": 3}), 1)
+        self.assertEqual(state["visited"], 5)
+        self.assertEqual(state["position"], [9, 22])
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], iter(commands)),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from robot_service_refactored_for_large_inputs import (
+    execute_robot_instructions as execute_refactored_robot_instructions,
+)
+from robot_service_sweep_line import (
+    parse_body_instruct_robot_generate_response,
+    execute_robot_instructions,
+    merge_intervals,
+    count_crossings,
+)
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestRobotMovementSweepLine(unittest.TestCase):
+    def test_execute_robot_instructions(self):
+        start_position = [0, 0]
+        commands = [
+            {"direction": "east", "steps": 2},
+            {"direction": "north", "steps": 1},
+        ]
+
+        result = execute_robot_instructions(start_position, commands)
+
+        self.assertEqual(result, 4)
+
+    def test_parse_body_instruct_robot_generate_response(self):
+        body = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ],
+        }
+
+        response = parse_body_instruct_robot_generate_response(body)
+
+        self.assertIn("timestamp", response)
+        self.assertIn("duration", response)
+        self.assertEqual(response["result"], 4)
+        self.assertEqual(response["commands"], 2)
+
+    def test_execute_robot_instructions_no_commands(self):
+        self.assertEqual(
+            execute_robot_instructions([0, 0], []),
+            execute_refactored_robot_instructions([0, 0], []),
+        )
+
+    def test_parse_and_instruct_robot_longer_distance(self):
+        JSON_BODY = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+                {"direction": "south", "steps": 1},
+                {"direction": "west", "steps": 3},
+                {"direction": "north", "steps": 100000},
+                {"direction": "south", "steps": 100000},
+                {"direction": "west", "steps": 100000},
+                {"direction": "north", "steps": 1},
+                {"direction": "east", "steps": 100000},
+            ],
+        }
+        self.assertEqual(
+            parse_body_instruct_robot_generate_response(JSON_BODY)["result"], 300005
+        )
+
+    def test_execute_robot_instructions_extensive(self):
+        self.assertEqual(
+            parse_body_instruct_robot_generate_response(LONG_JSON_BODY)["result"],
+            993737501,
+        )
+
+    def test_matches_naive_robot_on_random_walks(self):
+        for seed in range(200):
+            commands = generate_random_commands(seed, 30, 6)
+            self.assertEqual(
+                execute_robot_instructions([3, -2], commands),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_merge_intervals(self):
+        self.assertEqual(
+            merge_intervals([[4, 6], [0, 2], [3, 3], [8, 9]]), [[0, 6], [8, 9]]
+        )
+
+    def test_count_crossings(self):
+        horizontal_lines = {0: [[0, 4]], 2: [[0, 4]]}
+        vertical_lines = {1: [[0, 2]], 9: [[0, 2]]}
+
+        self.assertEqual(count_crossings(horizontal_lines, vertical_lines), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
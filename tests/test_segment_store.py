@@ -0,0 +1,59 @@
+import unittest
+from array import array
+from segment_store import HORIZONTAL, VERTICAL, SegmentGrid, SegmentStore
+
+
+class TestSegmentStore(unittest.TestCase):
+    def test_append_keeps_int64_columns(self):
+        store = SegmentStore(VERTICAL)
+        store.append(0, 10, 5)
+        store.append(-3, 2, 7)
+
+        self.assertEqual(store.orientation, VERTICAL)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(list(store), [(0, 10, 5), (-3, 2, 7)])
+        self.assertIsInstance(store.lo, array)
+        self.assertEqual(store.lo.itemsize, 8)
+
+    def test_append_beyond_int64(self):
+        store = SegmentStore(HORIZONTAL)
+        store.append(0, 10, 5)
+        store.append(0, 2**64, 5)
+
+        self.assertEqual(list(store), [(0, 10, 5), (0, 2**64, 5)])
+
+    def test_find_crossings_with_and_without_grid(self):
+        for indexed in (False, True):
+            store = SegmentStore(VERTICAL, indexed)
+            store.append(0, 10, 5)
+            store.append(-3, 2, 7)
+            store.append(20, 30, 6)
+
+            self.assertEqual(sorted(store.find_crossings(4, 9, 1)), [5, 7])
+            self.assertEqual(store.find_crossings(4, 9, 25), [6])
+            self.assertEqual(store.find_crossings(8, 9, 1), [])
+
+    def test_grid_grows_with_the_mean_length(self):
+        store = SegmentStore(HORIZONTAL, indexed=True)
+        store.append(0, 1, 0)
+        self.assertEqual(store.grid.cell_size, 1)
+
+        store.append(0, 1000, 1)
+
+        self.assertEqual(store.grid.cell_size, 256)
+        self.assertEqual(store.find_crossings(0, 5, 700), [1])
+
+    def test_grid_find_candidates(self):
+        grid = SegmentGrid(4)
+        grid.add(0, 0, 9, 5)
+        grid.add(1, 0, 3, 30)
+        grid.add(2, -8, -5, 5)
+
+        self.assertEqual(list(grid.find_candidates(0, 40, 8)), [[0]])
+        self.assertEqual(list(grid.find_candidates(0, 40, 1)), [[0], [1]])
+        self.assertEqual(list(grid.find_candidates(0, 6, -6)), [[2]])
+        self.assertEqual(grid.count_candidates(1), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+import threading
+from storage import (
+    MemoryStorage,
+    PostgresStorage,
+    RecordStorage,
+    SQLiteStorage,
+    create_storage,
+)
+
+VALUES = ("2024-01-05T12:34:56", 10, 42, 1.5, "sweep_line", False)
+
+
+class TestStorage(unittest.TestCase):
+    def test_backends_implement_the_interface(self):
+        with self.assertRaises(TypeError):
+            RecordStorage()
+
+        class IncompleteStorage(RecordStorage):
+            def migrate(self):
+                return []
+
+        with self.assertRaises(TypeError):
+            IncompleteStorage()
+
+    def test_create_storage(self):
+        self.assertIsInstance(create_storage("memory"), MemoryStorage)
+        self.assertIsInstance(create_storage("sqlite"), SQLiteStorage)
+        self.assertIsInstance(create_storage("postgres"), PostgresStorage)
+        with self.assertRaises(ValueError):
+            create_storage("mysql")
+
+    def test_postgres_storage_connects_lazily(self):
+        storage = PostgresStorage(url="postgresql://nowhere.invalid/records")
+
+        self.assertEqual(storage.info(), {"backend": "postgres", "connected": False})
+
+    def test_memory_storage(self):
+        storage = MemoryStorage()
+
+        self.assertEqual(storage.insert_record(VALUES), (1,) + VALUES)
+        storage.insert_records([VALUES, VALUES])
+        self.assertEqual(storage.info()["records"], 3)
+
+    def test_memory_storage_from_many_threads(self):
+        storage = MemoryStorage()
+        threads = [
+            threading.Thread(target=storage.insert_record, args=(VALUES,))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(row[0] for row in storage.rows), list(range(1, 21)))
+
+    def test_sqlite_storage_connects_and_migrates_lazily(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.sqlite3")
+            storage = SQLiteStorage(path)
+            self.assertFalse(os.path.exists(path))
+
+            self.assertEqual(storage.insert_record(VALUES), (1,) + VALUES)
+            storage.insert_records([VALUES, VALUES])
+            self.assertEqual(storage.migrate(), [])
+            storage.close()
+
+            storage = SQLiteStorage(path)
+            self.assertEqual(storage.insert_record(VALUES)[0], 4)
+            storage.close()
+
+    def test_sqlite_storage_migrate(self):
+        storage = SQLiteStorage(":memory:")
+
+        self.assertEqual(storage.migrate(), [1, 2, 3, 4])
+        self.assertEqual(storage.migrate(), [])
+        storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from engine_registry import CACHE_ENGINE, parse_body_instruct_robot_generate_response
+from walk_cache import WalkCache, hash_commands, walk_cache
+from test_helpers import LONG_JSON_BODY
+
+
+class TestWalkCache(unittest.TestCase):
+    def setUp(self) -> None:
+        walk_cache.clear()
+
+    def test_hash_commands_ignores_extra_keys(self):
+        self.assertEqual(
+            hash_commands([{"direction": "east", "steps": 2}]),
+            hash_commands([{"direction": "east", "steps": 2, "comment": "patrol"}]),
+        )
+
+    def test_hash_commands_depends_on_order(self):
+        self.assertNotEqual(
+            hash_commands(
+                [{"direction": "east", "steps": 2}, {"direction": "north", "steps": 1}]
+            ),
+            hash_commands(
+                [{"direction": "north", "steps": 1}, {"direction": "east", "steps": 2}]
+            ),
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = WalkCache(max_entries=2)
+        cache.put(b"first", 1)
+        cache.put(b"second", 2)
+        cache.get(b"first")
+        cache.put(b"third", 3)
+
+        self.assertEqual(cache.get(b"first"), 1)
+        self.assertIsNone(cache.get(b"second"))
+        self.assertEqual(cache.get(b"third"), 3)
+        self.assertEqual(
+            cache.info(),
+            {
+                "hits": 3,
+                "misses": 1,
+                "evictions": 1,
+                "entries": 2,
+                "max_entries": 2,
+            },
+        )
+
+    def test_same_commands_from_another_start_hit_the_cache(self):
+        body = {
+            "start": {"x": 10, "y": 22},
+            "commands": [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+            ],
+        }
+        moved_body = dict(body, start={"x": -500, "y": 7})
+
+        first_response = parse_body_instruct_robot_generate_response(body)
+        second_response = parse_body_instruct_robot_generate_response(moved_body)
+
+        self.assertNotEqual(first_response["engine"], CACHE_ENGINE)
+        self.assertEqual(second_response["engine"], CACHE_ENGINE)
+        self.assertEqual(second_response["result"], 4)
+        self.assertEqual(second_response["commands"], 2)
+        self.assertIn("timestamp", second_response)
+        self.assertEqual(walk_cache.info()["hits"], 1)
+        self.assertEqual(walk_cache.info()["misses"], 1)
+
+    def test_cached_extensive_walk(self):
+        parse_body_instruct_robot_generate_response(LONG_JSON_BODY)
+        response = parse_body_instruct_robot_generate_response(LONG_JSON_BODY)
+
+        self.assertEqual(response["result"], 993737501)
+        self.assertEqual(response["engine"], CACHE_ENGINE)
+        self.assertLess(response["duration"], 0.1)
+
+    def test_explicit_engine_bypasses_the_cache(self):
+        body = {
+            "start": {"x": 0, "y": 0},
+            "commands": [{"direction": "east", "steps": 2}],
+        }
+        parse_body_instruct_robot_generate_response(body)
+
+        response = parse_body_instruct_robot_generate_response(body, "sweep_line")
+
+        self.assertEqual(response["engine"], "sweep_line")
+        self.assertEqual(response["result"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
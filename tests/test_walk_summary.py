@@ -0,0 +1,60 @@
+import json
+import unittest
+from robot_service import execute_robot_instructions as execute_naive_robot_instructions
+from walk_summary import (
+    WalkSummary,
+    summarize_commands,
+    split_into_chunks,
+)
+from test_helpers import LONG_JSON_BODY, generate_random_commands
+
+
+class TestWalkSummary(unittest.TestCase):
+    def test_merged_chunks_match_the_whole_walk(self):
+        for seed in range(100):
+            commands = generate_random_commands(seed, 30, 6)
+            chunks = split_into_chunks([3, -2], commands, 4)
+
+            summary = summarize_commands(*chunks[0])
+            for chunk in chunks[1:]:
+                summary = summary.merge(summarize_commands(*chunk))
+            whole = summarize_commands([3, -2], commands)
+
+            self.assertEqual(summary.horizontal_lines, whole.horizontal_lines)
+            self.assertEqual(summary.vertical_lines, whole.vertical_lines)
+            self.assertEqual(summary.end, whole.end)
+            self.assertEqual(summary.commands, 30)
+            self.assertEqual(
+                summary.count_visited_locations(),
+                execute_naive_robot_instructions([3, -2], commands),
+            )
+
+    def test_serialization_round_trip(self):
+        summary = summarize_commands(
+            [10, 22],
+            [
+                {"direction": "east", "steps": 2},
+                {"direction": "north", "steps": 1},
+                {"direction": "west", "steps": 3},
+            ],
+        )
+
+        restored = WalkSummary.from_dict(json.loads(json.dumps(summary.to_dict())))
+
+        self.assertEqual(restored.horizontal_lines, summary.horizontal_lines)
+        self.assertEqual(restored.vertical_lines, summary.vertical_lines)
+        self.assertEqual(restored.start, [10, 22])
+        self.assertEqual(restored.end, [9, 23])
+        self.assertEqual(restored.count_visited_locations(), 7)
+
+    def test_walk_without_commands_visits_nothing(self):
+        self.assertEqual(summarize_commands([0, 0], []).count_visited_locations(), 0)
+
+    def test_count_visited_locations_extensive(self):
+        summary = summarize_commands([-100000, -100000], LONG_JSON_BODY["commands"])
+
+        self.assertEqual(summary.count_visited_locations(), 993737501)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+from typing import Dict, Optional
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from array import array
+from custom_types import Commands
+from command_parsing import parse_commands
+
+
+"""
+This Python code keeps the results of the latest walks in memory.
+The number of visited locations only depends on the commands, not on the starting position, so walks are keyed by a hash of their commands alone and the same patrol started anywhere else hits the cache.
+"""
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("WALK_CACHE_MAX_ENTRIES", "1024"))
+
+
+def hash_commands(commands: Commands) -> bytes:
+    """
+    Hashes a list of commands, ignoring anything but their directions and steps.
+
+    Args:
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        bytes: A 16 bytes digest of the commands.
+
+    Example:
+    >>> hash_commands([{"direction": "east", "steps": 2}]).hex()
+    '6b72d12cd962711ba8fb3586adeb64b7'
+    """
+
+    commands = parse_commands(commands)
+    digest = hashlib.blake2b(digest_size=16)
+    # The arrays are hashed as they are in memory, one byte per direction and
+    # eight per steps, so the lengths alone tell where the directions end.
+    digest.update(commands.directions.tobytes())
+    if isinstance(commands.steps, array):
+        digest.update(commands.steps.tobytes())
+    else:
+        digest.update(",".join(map(str, commands.steps)).encode())
+    return digest.digest()
+
+
+class WalkCache:
+    """
+    Thread safe least recently used cache of walk results keyed by the hash of
+    their commands.
+
+    Example:
+    >>> cache = WalkCache(max_entries=1)
+    >>> cache.put(b"walk", 4)
+    >>> cache.get(b"walk"), cache.get(b"other")
+    (4, None)
+    >>> cache.info()
+    {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'max_entries': 1}
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[bytes, int]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> Optional[int]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+            }
+
+
+walk_cache = WalkCache()
@@ -0,0 +1,196 @@
+from typing import Dict, List, Tuple, Union
+from custom_types import (
+    CODE_CHANGES,
+    Coordinates,
+    Commands,
+    LineIntervals,
+    ParsedCommands,
+)
+from command_parsing import parse_commands
+from robot_service_sweep_line import (
+    count_visited_vertices,
+    generate_lines,
+    merge_intervals,
+    merge_lines,
+)
+
+
+"""
+This Python code summarizes a walk, or any contiguous part of it, as the disjoint intervals visited on every row and every column.
+Summaries of different parts of a walk merge into the summary of the whole walk, so parts summarized separately, or as they arrive, combine without walking them again.
+This is not an engine: counting the locations needs the crossings of every row with every column of the whole summary, which cannot be split between the parts, so summarizing them separately only adds the cost of merging to the sweep line.
+"""
+
+SerializedWalkSummary = Dict[str, Union[Coordinates, int, Dict[str, List[List[int]]]]]
+
+
+class WalkSummary:
+    """
+    The rows and columns visited by a contiguous part of a walk, as sorted,
+    disjoint intervals per line, together with where that part starts and ends.
+
+    Example:
+    >>> first = summarize_commands([0, 0], [{"direction": "east", "steps": 2}])
+    >>> second = summarize_commands([2, 0], [{"direction": "west", "steps": 4}])
+    >>> merged = first.merge(second)
+    >>> merged.horizontal_lines, merged.end, merged.count_visited_locations()
+    ({0: [[-2, 2]]}, [-2, 0], 5)
+    """
+
+    __slots__ = ("horizontal_lines", "vertical_lines", "start", "end", "commands")
+
+    def __init__(
+        self,
+        horizontal_lines: LineIntervals,
+        vertical_lines: LineIntervals,
+        start: Coordinates,
+        end: Coordinates,
+        commands: int,
+    ):
+        self.horizontal_lines = horizontal_lines
+        self.vertical_lines = vertical_lines
+        self.start = start
+        self.end = end
+        self.commands = commands
+
+    def merge(self, other: "WalkSummary") -> "WalkSummary":
+        """
+        Merges the summary of the part of the walk right after this one.
+
+        Args:
+            other (WalkSummary): The summary of the following part of the walk.
+
+        Returns:
+            WalkSummary: The summary of both parts together.
+        """
+
+        return WalkSummary(
+            merge_line_unions(self.horizontal_lines, other.horizontal_lines),
+            merge_line_unions(self.vertical_lines, other.vertical_lines),
+            self.start,
+            other.end,
+            self.commands + other.commands,
+        )
+
+    def count_visited_locations(self) -> int:
+        # Without commands the robot has not walked any trajectory.
+        if self.commands == 0:
+            return 0
+        return count_visited_vertices(self.horizontal_lines, self.vertical_lines)
+
+    def to_dict(self) -> SerializedWalkSummary:
+        return {
+            "start": self.start,
+            "end": self.end,
+            "commands": self.commands,
+            "horizontal_lines": {
+                str(row): intervals for row, intervals in self.horizontal_lines.items()
+            },
+            "vertical_lines": {
+                str(column): intervals
+                for column, intervals in self.vertical_lines.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: SerializedWalkSummary) -> "WalkSummary":
+        return cls(
+            {
+                int(row): intervals
+                for row, intervals in data["horizontal_lines"].items()
+            },
+            {
+                int(column): intervals
+                for column, intervals in data["vertical_lines"].items()
+            },
+            list(data["start"]),
+            list(data["end"]),
+            data["commands"],
+        )
+
+
+def summarize_commands(start_position: Coordinates, commands: Commands) -> WalkSummary:
+    """
+    Summarizes the walk of the given commands from the given position.
+
+    Args:
+        start_position (Coordinates): The position the commands start from.
+        commands (Commands): A list of commands for the robot, parsed or not.
+
+    Returns:
+        WalkSummary: The summary of the walk.
+
+    Example:
+    >>> summary = summarize_commands([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ... ])
+    >>> summary.horizontal_lines, summary.vertical_lines, summary.end
+    ({0: [[0, 2]]}, {2: [[0, 1]]}, [2, 1])
+    """
+
+    commands = parse_commands(commands)
+    horizontal_lines, vertical_lines = generate_lines(start_position, commands)
+    return WalkSummary(
+        merge_lines(horizontal_lines),
+        merge_lines(vertical_lines),
+        list(start_position),
+        move_position(start_position, commands),
+        len(commands),
+    )
+
+
+def merge_line_unions(
+    lines: LineIntervals, other_lines: LineIntervals
+) -> LineIntervals:
+    merged = dict(lines)
+    for value, intervals in other_lines.items():
+        if value in merged:
+            merged[value] = merge_intervals(merged[value] + intervals)
+        else:
+            merged[value] = intervals
+    return merged
+
+
+def move_position(start_position: Coordinates, commands: ParsedCommands) -> Coordinates:
+    x, y = start_position
+    for direction, steps in zip(commands.directions, commands.steps):
+        change_x, change_y = CODE_CHANGES[direction]
+        x += change_x * steps
+        y += change_y * steps
+    return [x, y]
+
+
+def split_into_chunks(
+    start_position: Coordinates, commands: Commands, chunks: int
+) -> List[Tuple[Coordinates, ParsedCommands]]:
+    """
+    Splits the commands into contiguous chunks, each one with the position it
+    starts from.
+
+    Args:
+        start_position (Coordinates): The starting position of the robot.
+        commands (Commands): A list of commands for the robot, parsed or not.
+        chunks (int): The number of chunks wanted.
+
+    Returns:
+        List[Tuple[Coordinates, ParsedCommands]]: The start and commands of every
+            chunk.
+
+    Example:
+    >>> split_into_chunks([0, 0], [
+    ...     {"direction": "east", "steps": 2},
+    ...     {"direction": "north", "steps": 1},
+    ... ], 2)
+    [([0, 0], ParsedCommands([{'direction': 'east', 'steps': 2}])), ([2, 0], ParsedCommands([{'direction': 'north', 'steps': 1}]))]
+    """
+
+    commands = parse_commands(commands)
+    size = max(1, -(-len(commands) // chunks))
+    result = []
+    position = list(start_position)
+    for first in range(0, len(commands), size):
+        chunk = commands[first : first + size]
+        result.append((position, chunk))
+        position = move_position(position, chunk)
+    return result